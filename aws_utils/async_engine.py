@@ -0,0 +1,255 @@
+import asyncio
+import inspect
+
+from botocore.exceptions import ClientError
+
+from aws_utils.batch_write import BATCH_WRITE_LIMIT, MAX_RETRIES, dedupe_batch
+from aws_utils.clients import DEFAULT_MAX_IN_FLIGHT
+from aws_utils.dead_letter import UNPROCESSED
+from aws_utils.profiling import operation_stage, stage
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+except ImportError:
+    AioConfig = None
+    get_session = None
+
+
+class AsyncEngine:
+    """
+    asyncio execution core for bulk DynamoDB work, built on aiobotocore.
+
+    A single client with a connection pool of max_in_flight connections is shared by
+    all coroutines, and a semaphore caps the number of requests in flight, so one
+    process can keep thousands of requests going without a thread per request.
+
+    Use as an async context manager:
+
+        async with AsyncEngine(aws_endpoint) as engine:
+            await engine.scan(table_name, handle_page)
+
+    Args:
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        region (str, optional): AWS region name. Defaults to None.
+        max_in_flight (int, optional): Maximum concurrent requests. Defaults to 256.
+    """
+
+    def __init__(self, aws_endpoint=None, region=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        if get_session is None:
+            raise ImportError("The async engine requires aiobotocore. Install it with: pip install 'aws-utils[async]'")
+        self.aws_endpoint = aws_endpoint
+        self.region = region
+        self.max_in_flight = max_in_flight
+        self.client = None
+        self._client_context = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._client_context = get_session().create_client(
+            'dynamodb',
+            endpoint_url=self.aws_endpoint,
+            region_name=self.region,
+            config=AioConfig(max_pool_connections=self.max_in_flight)
+        )
+        self.client = await self._client_context.__aenter__()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self._client_context.__aexit__(exc_type, exc, traceback)
+        self.client = None
+
+    async def call(self, operation, **params):
+        """Run one client operation (e.g. 'scan') once a request slot is free."""
+        async with self._semaphore:
+            with stage(operation_stage(operation)):
+                return await getattr(self.client, operation)(**params)
+
+    async def scan(self, table_name, page_handler, total_segments=16, **scan_kwargs):
+        """
+        Parallel-scan a table with one coroutine per segment.
+
+        Args:
+            table_name (str): Name of the DynamoDB table
+            page_handler (callable): Called with each page's items; may be a coroutine function
+            total_segments (int, optional): Number of scan segments. Defaults to 16.
+            **scan_kwargs: Extra parameters passed to scan (e.g. ProjectionExpression)
+
+        Returns:
+            int: Total number of items scanned
+        """
+        async def scan_segment(segment):
+            params = dict(scan_kwargs, TableName=table_name)
+            if total_segments > 1:
+                params['Segment'] = segment
+                params['TotalSegments'] = total_segments
+            scanned = 0
+            while True:
+                response = await self.call('scan', **params)
+                items = response.get('Items', [])
+                scanned += len(items)
+                if items:
+                    result = page_handler(items)
+                    if inspect.isawaitable(result):
+                        await result
+                if not response.get('LastEvaluatedKey'):
+                    return scanned
+                params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        counts = await asyncio.gather(*(scan_segment(segment) for segment in range(total_segments)))
+        return sum(counts)
+
+    async def write_batch(self, table_name, requests, max_retries=MAX_RETRIES):
+        """
+        Send up to 25 write requests, retrying unprocessed items with backoff.
+
+        Returns:
+            list: Requests still unprocessed after all retries
+        """
+        pending = {table_name: requests}
+        for attempt in range(max_retries + 1):
+            response = await self.call('batch_write_item', RequestItems=pending)
+            pending = response.get('UnprocessedItems') or {}
+            if not pending:
+                return []
+            if attempt < max_retries:
+                with stage('backoff'):
+                    await asyncio.sleep(min(0.05 * 2 ** attempt, 5))
+        return pending.get(table_name, [])
+
+    async def write_individually(self, table_name, requests, dead_letter=None):
+        """
+        Write requests one by one with PutItem/DeleteItem, like batch_write.write_individually.
+
+        Used when BatchWriteItem rejects a whole batch because of one invalid item, so the
+        valid items still go through and only the bad ones are dead-lettered.
+
+        Returns:
+            tuple: (written, failed) item counts
+        """
+        written = 0
+        failed = 0
+        for request in requests:
+            try:
+                if 'PutRequest' in request:
+                    await self.call('put_item', TableName=table_name, Item=request['PutRequest']['Item'])
+                else:
+                    await self.call('delete_item', TableName=table_name, Key=request['DeleteRequest']['Key'])
+                written += 1
+            except ClientError as e:
+                failed += 1
+                if dead_letter:
+                    dead_letter.write(table_name, [request], e.response['Error']['Code'], e.response['Error']['Message'])
+        return written, failed
+
+    async def write_all(self, table_name, requests, progress=None, dead_letter=None, dedupe=None, stats=None):
+        """
+        Write a stream of PutRequest/DeleteRequest dicts as concurrent 25-item batches.
+
+        At most max_in_flight batches are pending at a time, so arbitrarily large
+        inputs are written without queueing them all in memory.
+
+        Args:
+            table_name (str): Name of the DynamoDB table
+            requests (iterable): Low-level write requests
+            progress (callable, optional): Called with the number of items written by each batch
+            dead_letter (DeadLetterWriter, optional): Records requests that could not be written
+            dedupe (str, optional): 'last' or 'first': resend a rejected batch without its repeated keys
+                (see batch_write.dedupe_batch)
+            stats (dict, optional): Incremented with the number of dropped 'duplicates'
+
+        Returns:
+            tuple: (written, failed) item counts
+        """
+        totals = {'written': 0, 'failed': 0}
+
+        async def send(batch):
+            try:
+                unprocessed = await self.write_batch(table_name, batch)
+            except ClientError as e:
+                error = e.response['Error']
+                if error['Code'] == 'ValidationException' and len(batch) > 1:
+                    if dedupe:
+                        unique = dedupe_batch(table_name, batch, dedupe, self.aws_endpoint, stats)
+                        if len(unique) < len(batch):
+                            return await send(unique)
+                    done, lost = await self.write_individually(table_name, batch, dead_letter)
+                    totals['written'] += done
+                    totals['failed'] += lost
+                    if progress and done:
+                        progress(done)
+                    return
+                print(f"Error writing batch of {len(batch)} items: {error['Message']}")
+                totals['failed'] += len(batch)
+                if dead_letter:
+                    dead_letter.write(table_name, batch, error['Code'], error['Message'])
+                return
+            except Exception as e:
+                # Connection errors, timeouts and the like: the batch is lost, not written
+                print(f"Error writing batch of {len(batch)} items: {type(e).__name__}: {e}")
+                totals['failed'] += len(batch)
+                if dead_letter:
+                    dead_letter.write(table_name, batch, type(e).__name__, str(e))
+                return
+            if unprocessed and dead_letter:
+                dead_letter.write(table_name, unprocessed, UNPROCESSED)
+            done = len(batch) - len(unprocessed)
+            totals['written'] += done
+            totals['failed'] += len(unprocessed)
+            if progress and done:
+                progress(done)
+
+        pending = set()
+        batch = []
+        for request in requests:
+            batch.append(request)
+            if len(batch) == BATCH_WRITE_LIMIT:
+                pending.add(asyncio.ensure_future(send(batch)))
+                batch = []
+                if len(pending) >= self.max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+        if batch:
+            pending.add(asyncio.ensure_future(send(batch)))
+        if pending:
+            await asyncio.gather(*pending)
+        return totals['written'], totals['failed']
+
+    async def update_items(self, updates):
+        """
+        Run many (conditional) UpdateItem calls concurrently.
+
+        Args:
+            updates (iterable): update_item parameter dicts (TableName, Key, UpdateExpression, ...)
+
+        Returns:
+            dict: Counts of updated, condition_failed and failed updates
+        """
+        stats = {'updated': 0, 'condition_failed': 0, 'failed': 0}
+
+        async def update(params):
+            try:
+                await self.call('update_item', **params)
+                stats['updated'] += 1
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    stats['condition_failed'] += 1
+                else:
+                    print(f"Error updating item {params.get('Key')}: {e.response['Error']['Message']}")
+                    stats['failed'] += 1
+            except Exception as e:
+                print(f"Error updating item {params.get('Key')}: {type(e).__name__}: {e}")
+                stats['failed'] += 1
+
+        pending = set()
+        for params in updates:
+            pending.add(asyncio.ensure_future(update(params)))
+            if len(pending) >= self.max_in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        if pending:
+            await asyncio.gather(*pending)
+        return stats
@@ -0,0 +1,253 @@
+import time
+
+from aws_utils.clients import get_client
+from aws_utils.dead_letter import UNPROCESSED
+from aws_utils.profiling import stage, timed
+from aws_utils.serializer import serialize_item
+from aws_utils.table_metadata import get_table_metadata, key_token
+
+BATCH_WRITE_LIMIT = 25
+MAX_RETRIES = 8
+DEDUPE_POLICIES = ('last', 'first')
+
+
+def send_batch(client, table_name, requests, max_retries=MAX_RETRIES):
+    """
+    Send up to 25 write requests with BatchWriteItem, retrying unprocessed items with backoff.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the DynamoDB table
+        requests (list): Low-level PutRequest/DeleteRequest dicts
+        max_retries (int, optional): Retries for unprocessed items. Defaults to 8.
+
+    Returns:
+        list: Requests still unprocessed after all retries (empty on success)
+    """
+    pending = {table_name: requests}
+    for attempt in range(max_retries + 1):
+        response = client.batch_write_item(RequestItems=pending)
+        pending = response.get('UnprocessedItems') or {}
+        if not pending:
+            return []
+        if attempt < max_retries:
+            with stage('backoff'):
+                time.sleep(min(0.05 * 2 ** attempt, 5))
+    return pending.get(table_name, [])
+
+
+def _request_token(request, key_attributes):
+    if 'PutRequest' in request:
+        body = request['PutRequest']['Item']
+    else:
+        body = request['DeleteRequest']['Key']
+    if any(name not in body for name in key_attributes):
+        return None
+    return key_token(body, key_attributes)
+
+
+def dedupe_requests(requests, key_attributes, policy='last', stats=None):
+    """
+    Drop repeated keys within each consecutive batch of 25 write requests.
+
+    BatchWriteItem rejects a whole batch that touches the same key twice. With the
+    'last' policy a repeated key replaces the earlier request in its batch (what
+    sequential puts would leave behind); with 'first' the repeat is dropped. The output
+    keeps batch alignment, so consumers must chunk it into batches of 25 from the start.
+    Repeats in different batches are all written, so "last wins" across batches only
+    holds when the batches are written one after another, in input order.
+
+    Args:
+        requests (iterable): PutRequest/DeleteRequest dicts
+        key_attributes (list): Key attribute names of the table
+        policy (str, optional): 'last' or 'first'. Defaults to 'last'.
+        stats (dict, optional): Incremented with the number of dropped 'duplicates'. Defaults to None.
+
+    Yields:
+        dict: Requests with unique keys within each batch
+    """
+    if policy not in DEDUPE_POLICIES:
+        raise ValueError(f"Unknown dedupe policy '{policy}'. Use one of: {', '.join(DEDUPE_POLICIES)}")
+    stats = stats if stats is not None else {}
+    stats.setdefault('duplicates', 0)
+    batch = []
+    positions = {}
+    for request in requests:
+        token = _request_token(request, key_attributes)
+        position = positions.get(token) if token is not None else None
+        if position is not None:
+            stats['duplicates'] += 1
+            if policy == 'last':
+                batch[position] = request
+            continue
+        if token is not None:
+            positions[token] = len(batch)
+        batch.append(request)
+        if len(batch) == BATCH_WRITE_LIMIT:
+            yield from batch
+            batch = []
+            positions = {}
+    yield from batch
+
+
+def dedupe_batch(table_name, batch, policy, aws_endpoint=None, stats=None):
+    """
+    Drop repeated keys from one batch that BatchWriteItem rejected.
+
+    The key attributes are only looked up once a batch is rejected, so writes
+    without repeated keys never call DescribeTable.
+
+    Returns:
+        list: The batch without repeated keys (as long as the batch when no key repeats)
+    """
+    key_attributes = get_table_metadata(table_name, aws_endpoint)['key_attributes']
+    return list(dedupe_requests(batch, key_attributes, policy, stats))
+
+
+def write_individually(client, table_name, requests, dead_letter=None):
+    """
+    Write requests one by one with PutItem/DeleteItem, to isolate the items of a rejected batch.
+
+    BatchWriteItem rejects a whole batch when a single item is invalid (e.g. too large
+    or with a bad key), so this lets the valid items through and only dead-letters the bad ones.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    from botocore.exceptions import ClientError
+
+    written = 0
+    failed = 0
+    for request in requests:
+        try:
+            if 'PutRequest' in request:
+                client.put_item(TableName=table_name, Item=request['PutRequest']['Item'])
+            else:
+                client.delete_item(TableName=table_name, Key=request['DeleteRequest']['Key'])
+            written += 1
+        except ClientError as e:
+            failed += 1
+            if dead_letter:
+                dead_letter.write(table_name, [request], e.response['Error']['Code'], e.response['Error']['Message'])
+    return written, failed
+
+
+def write_requests(table_name, requests, aws_endpoint=None, rate_limiter=None, progress=None, dead_letter=None,
+                   dedupe=None, stats=None):
+    """
+    Write a stream of low-level write requests in batches of 25.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        requests (iterable): PutRequest/DeleteRequest dicts, consumed lazily
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        rate_limiter (RateLimiter, optional): Shared limiter capping items written per second. Defaults to None.
+        progress (callable, optional): Called with the number of items written by each batch. Defaults to None.
+        dead_letter (DeadLetterWriter, optional): Records requests that could not be written. Defaults to None.
+        dedupe (str, optional): 'last' or 'first': resend a rejected batch without its repeated keys
+            (see dedupe_batch). Defaults to None.
+        stats (dict, optional): Incremented with the number of dropped 'duplicates'. Defaults to None.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    from botocore.exceptions import ClientError
+
+    client = get_client('dynamodb', aws_endpoint)
+    written = 0
+    failed = 0
+
+    def flush(batch):
+        if rate_limiter:
+            rate_limiter.acquire(len(batch))
+        try:
+            unprocessed = send_batch(client, table_name, batch)
+        except ClientError as e:
+            error = e.response['Error']
+            if error['Code'] == 'ValidationException' and len(batch) > 1:
+                if dedupe:
+                    unique = dedupe_batch(table_name, batch, dedupe, aws_endpoint, stats)
+                    if len(unique) < len(batch):
+                        return flush(unique)
+                done, lost = write_individually(client, table_name, batch, dead_letter)
+                if progress and done:
+                    progress(done)
+                return done, lost
+            print(f"Error writing batch of {len(batch)} items: {error['Message']}")
+            if dead_letter:
+                dead_letter.write(table_name, batch, error['Code'], error['Message'])
+            return 0, len(batch)
+        if unprocessed:
+            print(f"Error: {len(unprocessed)} items still unprocessed after {MAX_RETRIES} retries")
+            if dead_letter:
+                dead_letter.write(table_name, unprocessed, UNPROCESSED)
+        done = len(batch) - len(unprocessed)
+        if progress and done:
+            progress(done)
+        return done, len(unprocessed)
+
+    batch = []
+    for request in requests:
+        batch.append(request)
+        if len(batch) == BATCH_WRITE_LIMIT:
+            done, lost = flush(batch)
+            written += done
+            failed += lost
+            batch = []
+    if batch:
+        done, lost = flush(batch)
+        written += done
+        failed += lost
+
+    return written, failed
+
+
+def put_items(table_name, items, aws_endpoint=None, serialized=False, rate_limiter=None, progress=None,
+              dead_letter=None, dedupe=None):
+    """
+    Put items with client.batch_write_item, serializing them with the fast serializer.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        items (iterable): Plain items, or low-level items when serialized is True
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        serialized (bool, optional): Items are already in low-level format (e.g. from a scan). Defaults to False.
+        rate_limiter (RateLimiter, optional): Shared limiter capping items written per second. Defaults to None.
+        progress (callable, optional): Called with the number of items written by each batch. Defaults to None.
+        dead_letter (DeadLetterWriter, optional): Records items that could not be written. Defaults to None.
+        dedupe (str, optional): Drop repeated keys within a batch, keeping the 'last' or 'first'
+            occurrence (see dedupe_requests). Only batches that BatchWriteItem rejects are
+            deduped, so the table's key schema is not looked up otherwise. Defaults to None.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    if serialized:
+        requests = ({'PutRequest': {'Item': item}} for item in items)
+    else:
+        serialize = timed('serialize', serialize_item)
+        requests = ({'PutRequest': {'Item': serialize(item)}} for item in items)
+    stats = {'duplicates': 0}
+    written, failed = write_requests(table_name, requests, aws_endpoint, rate_limiter, progress, dead_letter,
+                                     dedupe, stats)
+    if stats['duplicates']:
+        print(f"Dropped {stats['duplicates']} duplicate keys ({dedupe} occurrence kept)")
+    return written, failed
+
+
+def delete_keys(table_name, keys, aws_endpoint=None, rate_limiter=None, progress=None):
+    """
+    Delete items by low-level primary key with client.batch_write_item.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        keys (iterable): Low-level key dicts, e.g. {'id': {'S': 'abc'}}
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        rate_limiter (RateLimiter, optional): Shared limiter capping items written per second. Defaults to None.
+        progress (callable, optional): Called with the number of items deleted by each batch. Defaults to None.
+
+    Returns:
+        tuple: (deleted, failed) item counts
+    """
+    requests = ({'DeleteRequest': {'Key': key}} for key in keys)
+    return write_requests(table_name, requests, aws_endpoint, rate_limiter, progress)
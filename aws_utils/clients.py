@@ -0,0 +1,187 @@
+import threading
+import time
+
+# boto3 and botocore are imported when the first session or client is built, so
+# commands start fast and `-h` never pays for them
+
+# Matches the largest default worker count of the bulk tools
+DEFAULT_MAX_POOL_CONNECTIONS = 32
+
+# Requests in flight (and pool connections) of the asyncio engine
+DEFAULT_MAX_IN_FLIGHT = 256
+
+_lock = threading.Lock()
+_sessions = {}
+_clients = {}
+_event_handlers = []
+_local = threading.local()
+
+
+def get_session(region=None, profile=None):
+    """
+    Get the shared boto3 session for a region/profile pair, creating it once.
+
+    Args:
+        region (str, optional): AWS region name. Defaults to None (boto3 default resolution).
+        profile (str, optional): AWS profile name. Defaults to None (boto3 default resolution).
+
+    Returns:
+        boto3.session.Session: Cached session
+    """
+    key = (region, profile)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            import boto3.session
+            session = boto3.session.Session(region_name=region, profile_name=profile)
+            for event_name, handler in _event_handlers:
+                session.events.register(event_name, handler, unique_id=_handler_id(event_name, handler))
+            _sessions[key] = session
+        return session
+
+
+def _handler_id(event_name, handler):
+    return f"aws_utils-{event_name}-{id(handler)}"
+
+
+def register_event_handler(event_name, handler):
+    """
+    Register a botocore event handler (e.g. 'after-call.dynamodb') on every shared client.
+
+    Handlers are added to the cached sessions and clients, and to any created later,
+    so instrumentation sees all requests however early the clients were built.
+
+    Args:
+        event_name (str): botocore event name
+        handler (callable): Event handler
+    """
+    # A unique id makes registering on a client that shares its session's emitter a no-op
+    unique_id = _handler_id(event_name, handler)
+    with _lock:
+        _event_handlers.append((event_name, handler))
+        for session in _sessions.values():
+            session.events.register(event_name, handler, unique_id=unique_id)
+        for client, _ in _clients.values():
+            client.meta.events.register(event_name, handler, unique_id=unique_id)
+
+
+def unregister_event_handler(event_name, handler):
+    """Remove a handler added with register_event_handler."""
+    unique_id = _handler_id(event_name, handler)
+    with _lock:
+        if (event_name, handler) in _event_handlers:
+            _event_handlers.remove((event_name, handler))
+        for session in _sessions.values():
+            session.events.unregister(event_name, handler, unique_id=unique_id)
+        for client, _ in _clients.values():
+            client.meta.events.unregister(event_name, handler, unique_id=unique_id)
+
+
+class LatencyHook:
+    """
+    Time every DynamoDB API call on the shared clients and pass each latency to a callback.
+
+    The time runs from botocore's before-call to after-call (or after-call-error) event,
+    so it includes botocore's own retries and parsing the response. Metrics, the profiler
+    and the benchmarks all measure request latency through this hook.
+
+    Args:
+        callback (callable): Called with the operation name (e.g. 'BatchWriteItem') and the seconds it took
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        # Several hooks may time the same call, so each keeps its start time under its own key
+        self._context_key = f"aws_utils_latency_{id(self)}"
+        self._handlers = [
+            ('before-call.dynamodb', self._before_call),
+            ('after-call.dynamodb', self._after_call),
+            ('after-call-error.dynamodb', self._after_call),
+        ]
+
+    def _before_call(self, context, **kwargs):
+        context[self._context_key] = time.perf_counter()
+
+    def _after_call(self, event_name, context, **kwargs):
+        # after-call-error has no model, so the operation comes from the event name
+        started = context.pop(self._context_key, None)
+        if started is not None:
+            self.callback(event_name.rsplit('.', 1)[-1], time.perf_counter() - started)
+
+    def register(self):
+        """Start timing the requests of every shared client."""
+        for event_name, handler in self._handlers:
+            register_event_handler(event_name, handler)
+        return self
+
+    def unregister(self):
+        for event_name, handler in self._handlers:
+            unregister_event_handler(event_name, handler)
+
+
+def _config(max_pool_connections):
+    from botocore.config import Config
+    return Config(max_pool_connections=max_pool_connections)
+
+
+def get_client(service='dynamodb', aws_endpoint=None, region=None, profile=None, max_pool_connections=None):
+    """
+    Get a shared, thread-safe boto3 client.
+
+    Clients are cached per service, endpoint, region and profile, so every call site
+    reuses the same connection pool instead of building a new client each time.
+    Asking for a larger pool than the cached client has replaces it with a bigger one.
+
+    Args:
+        service (str, optional): AWS service name. Defaults to 'dynamodb'.
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        region (str, optional): AWS region name. Defaults to None.
+        profile (str, optional): AWS profile name. Defaults to None.
+        max_pool_connections (int, optional): Connection pool size, should match the number of
+            threads using the client. Defaults to DEFAULT_MAX_POOL_CONNECTIONS.
+
+    Returns:
+        botocore.client.BaseClient: Cached client
+    """
+    pool_size = max(max_pool_connections or 0, DEFAULT_MAX_POOL_CONNECTIONS)
+    session = get_session(region, profile)
+    key = (service, aws_endpoint, region, profile)
+    with _lock:
+        cached = _clients.get(key)
+        if cached is not None and cached[1] >= pool_size:
+            return cached[0]
+        # Session methods are not thread-safe, so clients are built under the lock
+        client = session.client(service, endpoint_url=aws_endpoint, config=_config(pool_size))
+        _clients[key] = (client, pool_size)
+        return client
+
+
+def get_resource(service='dynamodb', aws_endpoint=None, region=None, profile=None, max_pool_connections=None):
+    """
+    Get a boto3 resource for the calling thread.
+
+    boto3 resources are not thread-safe, so each thread gets its own cached instance,
+    all built from the shared session.
+
+    Args:
+        service (str, optional): AWS service name. Defaults to 'dynamodb'.
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        region (str, optional): AWS region name. Defaults to None.
+        profile (str, optional): AWS profile name. Defaults to None.
+        max_pool_connections (int, optional): Connection pool size. Defaults to DEFAULT_MAX_POOL_CONNECTIONS.
+
+    Returns:
+        boto3.resources.base.ServiceResource: Cached resource
+    """
+    resources = getattr(_local, 'resources', None)
+    if resources is None:
+        resources = _local.resources = {}
+    key = (service, aws_endpoint, region, profile)
+    resource = resources.get(key)
+    if resource is None:
+        pool_size = max(max_pool_connections or 0, DEFAULT_MAX_POOL_CONNECTIONS)
+        session = get_session(region, profile)
+        with _lock:
+            resource = session.resource(service, endpoint_url=aws_endpoint, config=_config(pool_size))
+        resources[key] = resource
+    return resource
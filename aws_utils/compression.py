@@ -0,0 +1,135 @@
+import bz2
+import gzip
+import io
+import queue
+import threading
+
+MAGIC_BYTES = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+
+CHUNK_SIZE = 1 << 20
+
+
+def detect_compression(file_path):
+    """
+    Detect the compression of a file from its first bytes, regardless of its extension.
+
+    Args:
+        file_path (str): Path to the file
+
+    Returns:
+        str or None: 'gzip', 'bz2' or 'zstd', or None for an uncompressed file
+    """
+    with open(file_path, 'rb') as file:
+        head = file.read(4)
+    for compression, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_decompressed(file_path, compression):
+    if compression == 'gzip':
+        return gzip.open(file_path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(file_path, 'rb')
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(f"{file_path} is zstd-compressed, which requires zstandard. Install it with: pip install zstandard")
+    return zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), read_across_frames=True, closefd=True)
+
+
+class ThreadedReader(io.RawIOBase):
+    """
+    Binary stream that reads (and decompresses) another stream on a background thread.
+
+    Chunks are handed over through a bounded queue, so decompression overlaps with
+    whatever parses the data in the calling thread.
+
+    Args:
+        stream: Binary stream to read, closed when done
+        chunk_size (int, optional): Bytes per read. Defaults to 1 MiB.
+        queue_size (int, optional): Chunks buffered ahead of the reader. Defaults to 8.
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, queue_size=8):
+        super().__init__()
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._chunk = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _put(self, chunk):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self):
+        try:
+            with self._stream as stream:
+                while True:
+                    chunk = stream.read(self._chunk_size)
+                    if not chunk or not self._put(chunk):
+                        break
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._chunk:
+            if self._eof:
+                return 0
+            chunk = self._queue.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                self._eof = True
+                return 0
+            self._chunk = memoryview(chunk)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self):
+        self._stop.set()
+        super().close()
+
+
+def open_input(file_path, encoding=None, newline=None):
+    """
+    Open an input file as text, transparently decompressing gzip, bz2 or zstd files.
+
+    Compressed files are decompressed in a stream on a background thread, so they
+    never need to be unpacked to disk. zstd support requires the optional zstandard
+    package.
+
+    Args:
+        file_path (str): Path to the file
+        encoding (str, optional): Text encoding. Defaults to None (locale default, like open).
+        newline (str, optional): Newline handling, as for open; use '' for CSV. Defaults to None.
+
+    Returns:
+        io.TextIOBase: Text stream to read from
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, 'r', encoding=encoding, newline=newline)
+    reader = ThreadedReader(_open_decompressed(file_path, compression))
+    return io.TextIOWrapper(io.BufferedReader(reader, CHUNK_SIZE), encoding=encoding, newline=newline)
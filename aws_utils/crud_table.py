@@ -0,0 +1,378 @@
+import argparse
+import csv
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from aws_utils.batch_write import delete_keys, put_items
+from aws_utils.clients import get_client
+from aws_utils.compression import open_input
+from aws_utils.metrics import add_metrics_arguments, command_metrics, table_item_count
+from aws_utils.profiling import add_profile_arguments, profile_command
+from aws_utils.scan_table import count_items
+from aws_utils.serializer import deserialize_item, dump_json, serialize_item
+from aws_utils.table_metadata import get_table_metadata, key_token
+from aws_utils.update_item_key_value import BATCH_GET_LIMIT, batch_get_items
+from aws_utils.wipe_table import delete_all_keys
+
+DEFAULT_WORKERS = 8
+
+
+def json_argument(value):
+    """argparse type for JSON object arguments, e.g. --key '{"id": "abc"}'."""
+    try:
+        parsed = json.loads(value, parse_float=Decimal)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid JSON: {e}")
+    if not isinstance(parsed, dict):
+        raise argparse.ArgumentTypeError("expected a JSON object")
+    return parsed
+
+
+def load_records(path):
+    """
+    Read JSON objects (keys or items) from a file, or from stdin when path is '-'.
+
+    Accepts a JSON array or JSON lines; compressed files are decompressed on the fly.
+    Floats are parsed as Decimal, which DynamoDB numbers require.
+
+    Args:
+        path (str): Path to the file, or '-' for stdin
+
+    Returns:
+        list: Plain JSON objects
+    """
+    if path == '-':
+        content = sys.stdin.read()
+    else:
+        with open_input(path) as file:
+            content = file.read()
+    if content.lstrip().startswith('['):
+        return json.loads(content, parse_float=Decimal)
+    return [json.loads(line, parse_float=Decimal) for line in content.splitlines() if line.strip()]
+
+
+def unique_keys(records, key_attributes, keep='first'):
+    """
+    Drop repeated keys, which BatchGetItem and BatchWriteItem reject within one call.
+
+    Args:
+        records (list): Low-level keys or items
+        key_attributes (list): Key attribute names of the table
+        keep (str, optional): 'first' keeps the first record of a key, 'last' puts the last
+            record in the first one's place. Defaults to 'first'.
+
+    Returns:
+        list: Records with unique keys; records missing a key attribute are all kept
+    """
+    unique = {}
+    for position, record in enumerate(records):
+        if any(name not in record for name in key_attributes):
+            # Let the write fail and report it
+            unique[position] = record
+            continue
+        token = key_token(record, key_attributes)
+        if keep == 'last' or token not in unique:
+            unique[token] = record
+    return list(unique.values())
+
+
+def _chunks(records, size):
+    return [records[start:start + size] for start in range(0, len(records), size)]
+
+
+def _run_parallel(function, chunks, workers):
+    """Run function over chunks on a thread pool sharing the pooled client; return the results in order."""
+    if len(chunks) <= 1 or workers <= 1:
+        return [function(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, chunks))
+
+
+def load_data_from_csv(csv_file):
+    with open_input(csv_file, newline='') as file:
+        reader = csv.DictReader(file)
+        items = [row for row in reader]
+    return items
+
+
+def insert_from_csv(table_name, csv_file, aws_endpoint=None, workers=DEFAULT_WORKERS, progress=None):
+    """Put every row of a CSV file as an item (all values as strings)."""
+    return batch_put_entries(table_name, load_data_from_csv(csv_file), aws_endpoint, workers, progress)
+
+
+def create_table_entry(table_name, item_data, aws_endpoint=None):
+    client = get_client('dynamodb', aws_endpoint)
+    return client.put_item(TableName=table_name, Item=serialize_item(item_data))
+
+
+def read_table_entry(table_name, key_data, aws_endpoint=None, consistent_read=False):
+    client = get_client('dynamodb', aws_endpoint)
+    response = client.get_item(TableName=table_name, Key=serialize_item(key_data), ConsistentRead=consistent_read)
+    item = response.get('Item')
+    return deserialize_item(item) if item else None
+
+
+def update_table_entry(table_name, key_data, update_data, aws_endpoint=None):
+    """
+    Set attributes of an item (creating it if missing) and return the updated item.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        key_data (dict): Primary key, plain values
+        update_data (dict): Attributes to set, plain values
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+
+    Returns:
+        dict: The item after the update
+
+    Raises:
+        ValueError: If update_data is empty
+    """
+    if not update_data:
+        raise ValueError("update_data must set at least one attribute")
+    names = {f"#u{i}": name for i, name in enumerate(update_data)}
+    values = {f":u{i}": value for i, value in enumerate(update_data.values())}
+    client = get_client('dynamodb', aws_endpoint)
+    response = client.update_item(
+        TableName=table_name,
+        Key=serialize_item(key_data),
+        UpdateExpression="SET " + ", ".join(f"#u{i} = :u{i}" for i in range(len(update_data))),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=serialize_item(values),
+        ReturnValues='ALL_NEW',
+    )
+    return deserialize_item(response.get('Attributes', {}))
+
+
+def delete_table_entry(table_name, key_data, aws_endpoint=None):
+    client = get_client('dynamodb', aws_endpoint)
+    return client.delete_item(TableName=table_name, Key=serialize_item(key_data))
+
+
+def delete_all_table_entries(table_name, aws_endpoint=None, total_segments=DEFAULT_WORKERS, progress=None):
+    """
+    Delete every item with wipe_table's keys-only parallel scan (see delete_all_keys),
+    then count the table again.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Parallel scan segments, each deleting its pages. Defaults to 8.
+        progress (callable, optional): Called with the number of items deleted by each batch. Defaults to None.
+
+    Returns:
+        tuple: (deleted, failed, remaining) item counts
+    """
+    metadata = get_table_metadata(table_name, aws_endpoint)
+    deleted, failed = delete_all_keys(table_name, metadata, aws_endpoint, total_segments, progress)
+    remaining = count_items(table_name, aws_endpoint, total_segments, consistent_read=True)
+    return deleted, failed, remaining
+
+
+def batch_get_entries(table_name, keys, aws_endpoint=None, workers=DEFAULT_WORKERS, progress=None):
+    """
+    Fetch many items by key with BatchGetItem (100 keys per call) across a thread pool.
+
+    Keys that stay unprocessed after all retries (e.g. under sustained throttling) were
+    neither found nor confirmed missing, so they are returned on their own.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        keys (list): Primary keys, plain values, e.g. [{'id': 'abc'}]
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        workers (int, optional): Concurrent BatchGetItem calls. Defaults to 8.
+        progress (callable, optional): Called with the number of keys looked up by each call. Defaults to None.
+
+    Returns:
+        tuple: (items found as plain dicts, keys that were not found, keys left unprocessed)
+    """
+    key_attributes = get_table_metadata(table_name, aws_endpoint)['key_attributes']
+    keys = unique_keys([serialize_item(key) for key in keys], key_attributes)
+    client = get_client('dynamodb', aws_endpoint, max_pool_connections=workers)
+
+    def fetch(chunk):
+        unprocessed = []
+        found = batch_get_items(client, table_name, chunk, unprocessed=unprocessed)
+        if progress:
+            progress(len(chunk) - len(unprocessed))
+        return found, unprocessed
+
+    results = _run_parallel(fetch, _chunks(keys, BATCH_GET_LIMIT), workers)
+    found = [item for items, _ in results for item in items]
+    unprocessed = [key for _, chunk_keys in results for key in chunk_keys]
+    seen_tokens = {key_token(item, key_attributes) for item in found + unprocessed}
+    missing = [deserialize_item(key) for key in keys if key_token(key, key_attributes) not in seen_tokens]
+    return [deserialize_item(item) for item in found], missing, [deserialize_item(key) for key in unprocessed]
+
+
+def batch_put_entries(table_name, items, aws_endpoint=None, workers=DEFAULT_WORKERS, progress=None):
+    """
+    Put many items with BatchWriteItem (25 per call) across a thread pool.
+
+    Items with the same key are deduplicated before the items are split between the
+    threads, so the last one wins, in the position of the first.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        items (list): Items, plain values
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        workers (int, optional): Concurrent batch writers. Defaults to 8.
+        progress (callable, optional): Called with the number of items written by each batch. Defaults to None.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    key_attributes = get_table_metadata(table_name, aws_endpoint)['key_attributes']
+    requests = unique_keys([serialize_item(item) for item in items], key_attributes, keep='last')
+    if len(requests) < len(items):
+        print(f"Dropped {len(items) - len(requests)} duplicate keys (last occurrence kept)", file=sys.stderr)
+    get_client('dynamodb', aws_endpoint, max_pool_connections=workers)
+    lock = threading.Lock()
+    totals = [0, 0]
+
+    def put(chunk):
+        written, failed = put_items(table_name, chunk, aws_endpoint, serialized=True, progress=progress)
+        with lock:
+            totals[0] += written
+            totals[1] += failed
+
+    _run_parallel(put, _chunks(requests, max(len(requests) // workers + 1, 1)), workers)
+    return tuple(totals)
+
+
+def batch_delete_entries(table_name, keys, aws_endpoint=None, workers=DEFAULT_WORKERS, progress=None):
+    """
+    Delete many items by key with BatchWriteItem (25 per call) across a thread pool.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        keys (list): Primary keys, plain values, e.g. [{'id': 'abc'}]
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        workers (int, optional): Concurrent batch writers. Defaults to 8.
+        progress (callable, optional): Called with the number of items deleted by each batch. Defaults to None.
+
+    Returns:
+        tuple: (deleted, failed) item counts
+    """
+    key_attributes = get_table_metadata(table_name, aws_endpoint)['key_attributes']
+    keys = unique_keys([serialize_item(key) for key in keys], key_attributes)
+    get_client('dynamodb', aws_endpoint, max_pool_connections=workers)
+    lock = threading.Lock()
+    totals = [0, 0]
+
+    def delete(chunk):
+        deleted, failed = delete_keys(table_name, chunk, aws_endpoint, progress=progress)
+        with lock:
+            totals[0] += deleted
+            totals[1] += failed
+
+    _run_parallel(delete, _chunks(keys, max(len(keys) // workers + 1, 1)), workers)
+    return tuple(totals)
+
+
+def _write_lines(path, records):
+    output = sys.stdout if path in (None, '-') else open(path, 'w')
+    try:
+        for record in records:
+            output.write(dump_json(record) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='CRUD operations for DynamoDB table.')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-t', '--table_name', type=str, required=True, help='Name of the table.')
+    common.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional).')
+    add_profile_arguments(common)
+    batch = argparse.ArgumentParser(add_help=False)
+    batch.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS, help=f'Concurrent batch calls (default: {DEFAULT_WORKERS}).')
+    add_metrics_arguments(batch)
+
+    subparsers = parser.add_subparsers(dest='operation', help='Operation to perform')
+    create_parser = subparsers.add_parser('create', parents=[common], help='Put one item')
+    create_parser.add_argument('--item_data', type=json_argument, required=True, help='Item as a JSON object, e.g. \'{"id": "a", "n": 1}\'.')
+    read_parser = subparsers.add_parser('read', parents=[common], help='Get one item by key')
+    read_parser.add_argument('--key_data', type=json_argument, required=True, help='Primary key as a JSON object, e.g. \'{"id": "a"}\'.')
+    read_parser.add_argument('--consistent', action='store_true', help='Use a strongly consistent read.')
+    update_parser = subparsers.add_parser('update', parents=[common], help='Set attributes of one item')
+    update_parser.add_argument('--key_data', type=json_argument, required=True, help='Primary key as a JSON object.')
+    update_parser.add_argument('--update_data', type=json_argument, required=True, help='Attributes to set, as a JSON object.')
+    delete_parser = subparsers.add_parser('delete', parents=[common], help='Delete one item by key')
+    delete_parser.add_argument('--key_data', type=json_argument, required=True, help='Primary key as a JSON object.')
+    subparsers.add_parser('delete_all', parents=[common, batch], help='Delete all items (parallel keys-only scan, -w segments)')
+    insert_parser = subparsers.add_parser('insert', parents=[common, batch], help='Put every row of a CSV file')
+    insert_parser.add_argument('--csv_file', type=str, required=True, help='Path to the CSV file to load data from.')
+    batch_get_parser = subparsers.add_parser('batch-get', parents=[common, batch], help='Get many items by key (BatchGetItem)')
+    batch_get_parser.add_argument('-k', '--keys', type=str, default='-', help='JSON lines or JSON array of keys, - for stdin (default: -).')
+    batch_get_parser.add_argument('-o', '--output', type=str, help='Write found items as JSON lines to this file (default: stdout).')
+    batch_get_parser.add_argument('--missing', type=str, help='Write the keys that were not found as JSON lines to this file.')
+    batch_get_parser.add_argument('--unprocessed', type=str, help='Write the keys left unprocessed after all retries as JSON lines to this file.')
+    batch_put_parser = subparsers.add_parser('batch-put', parents=[common, batch], help='Put many items (BatchWriteItem)')
+    batch_put_parser.add_argument('-i', '--items', type=str, default='-', help='JSON lines or JSON array of items, - for stdin (default: -).')
+    batch_delete_parser = subparsers.add_parser('batch-delete', parents=[common, batch], help='Delete many items by key (BatchWriteItem)')
+    batch_delete_parser.add_argument('-k', '--keys', type=str, default='-', help='JSON lines or JSON array of keys, - for stdin (default: -).')
+
+    args = parser.parse_args(argv)
+    if args.operation is None:
+        parser.print_help()
+        return 1
+    if args.operation == 'update' and not args.update_data:
+        update_parser.error("--update_data must set at least one attribute")
+
+    failed = 0
+    with profile_command('crud_table', args):
+        if args.operation == 'create':
+            create_table_entry(args.table_name, args.item_data, args.aws_endpoint)
+        elif args.operation == 'read':
+            print(dump_json(read_table_entry(args.table_name, args.key_data, args.aws_endpoint, args.consistent)))
+        elif args.operation == 'update':
+            print(dump_json(update_table_entry(args.table_name, args.key_data, args.update_data, args.aws_endpoint)))
+        elif args.operation == 'delete':
+            delete_table_entry(args.table_name, args.key_data, args.aws_endpoint)
+        elif args.operation == 'delete_all':
+            with command_metrics('crud_table', args, total=table_item_count(args.table_name, args.aws_endpoint)) as metrics:
+                deleted, failed, remaining = delete_all_table_entries(args.table_name, args.aws_endpoint, args.workers,
+                                                                      metrics.add)
+            print(f"Deleted {deleted} items ({failed} failed), {remaining} items remaining", file=sys.stderr)
+            failed = failed or remaining
+        elif args.operation == 'insert':
+            with command_metrics('crud_table', args) as metrics:
+                written, failed = insert_from_csv(args.table_name, args.csv_file, args.aws_endpoint, args.workers, metrics.add)
+            print(f"Inserted {written} items ({failed} failed)", file=sys.stderr)
+        elif args.operation == 'batch-get':
+            keys = load_records(args.keys)
+            with command_metrics('crud_table', args, total=len(keys)) as metrics:
+                items, missing, unprocessed = batch_get_entries(args.table_name, keys, args.aws_endpoint, args.workers,
+                                                                metrics.add)
+            _write_lines(args.output, items)
+            if args.missing:
+                _write_lines(args.missing, missing)
+            if args.unprocessed and unprocessed:
+                _write_lines(args.unprocessed, unprocessed)
+            print(f"Found {len(items)} items, {len(missing)} keys not found, {len(unprocessed)} keys unprocessed",
+                  file=sys.stderr)
+            failed = len(unprocessed)
+        elif args.operation == 'batch-put':
+            items = load_records(args.items)
+            with command_metrics('crud_table', args, total=len(items)) as metrics:
+                written, failed = batch_put_entries(args.table_name, items, args.aws_endpoint, args.workers, metrics.add)
+            print(f"Wrote {written} items ({failed} failed)", file=sys.stderr)
+        elif args.operation == 'batch-delete':
+            keys = load_records(args.keys)
+            with command_metrics('crud_table', args, total=len(keys)) as metrics:
+                deleted, failed = batch_delete_entries(args.table_name, keys, args.aws_endpoint, args.workers, metrics.add)
+            print(f"Deleted {deleted} items ({failed} failed)", file=sys.stderr)
+
+    if failed:
+        print('Operation completed with failures.', file=sys.stderr)
+        return 1
+    print('Operation completed.', file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import base64
+import contextlib
+import json
+import os
+import threading
+import time
+from itertools import groupby
+
+# Error code recorded for requests still unprocessed after all BatchWriteItem retries
+UNPROCESSED = 'Unprocessed'
+MAX_MESSAGE_LENGTH = 200
+
+
+def default_dead_letter_path(table_name):
+    """
+    Default dead-letter file of an import into `table_name`, one per run.
+
+    The file name carries the start time of the run, so --retry-dlq only replays the
+    failures of that run instead of everything ever appended for the table.
+    """
+    return os.path.join('.', 'tmp', 'dlq', f"{table_name}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+
+
+def _encode_binary(value):
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _restore_binary(value):
+    """Turn base64 strings of B/BS attribute values back into bytes."""
+    (value_type, raw), = value.items()
+    if value_type == 'B':
+        return {'B': base64.b64decode(raw)}
+    if value_type == 'BS':
+        return {'BS': [base64.b64decode(v) for v in raw]}
+    if value_type == 'M':
+        return {'M': {k: _restore_binary(v) for k, v in raw.items()}}
+    if value_type == 'L':
+        return {'L': [_restore_binary(v) for v in raw]}
+    return value
+
+
+class DeadLetterWriter:
+    """
+    Append failed write requests to a JSONL dead-letter file.
+
+    Each line holds the table, an error code (the DynamoDB error code, or 'Unprocessed'
+    for items BatchWriteItem kept returning), a short message and the low-level write
+    request, so it can be replayed exactly with retry_dead_letters. Writes are
+    thread-safe, and every call appends its lines with a single write in append mode,
+    so worker processes can share one file.
+
+    Args:
+        path (str): Path of the dead-letter file; parent directories are created
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, table_name, requests, error_code, message=''):
+        """
+        Record failed write requests.
+
+        Args:
+            table_name (str): Name of the DynamoDB table
+            requests (list): Low-level PutRequest/DeleteRequest dicts
+            error_code (str): DynamoDB error code or UNPROCESSED
+            message (str, optional): Error message, truncated to 200 characters. Defaults to ''.
+        """
+        if not requests:
+            return
+        message = message[:MAX_MESSAGE_LENGTH]
+        lines = ''.join(
+            json.dumps({'table': table_name, 'error': error_code, 'message': message, 'request': request},
+                       separators=(',', ':'), default=_encode_binary) + '\n'
+            for request in requests
+        )
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._file = open(self.path, 'ab', buffering=0)
+            self._file.write(lines.encode('utf-8'))
+            self.count += len(requests)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def open_dead_letter(path):
+    """Return a DeadLetterWriter for `path`, or a context yielding None when path is None."""
+    if path is None:
+        return contextlib.nullcontext()
+    return DeadLetterWriter(path)
+
+
+def load_dead_letters(path):
+    """
+    Read the records of a dead-letter file.
+
+    Args:
+        path (str): Path of the dead-letter file
+
+    Yields:
+        dict: Records with table, error, message and request (binary values restored)
+    """
+    with open(path, 'r') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for kind, body in record['request'].items():
+                field = 'Item' if kind == 'PutRequest' else 'Key'
+                body[field] = {k: _restore_binary(v) for k, v in body[field].items()}
+            yield record
+
+
+def retry_dead_letters(path, aws_endpoint=None, table_name=None):
+    """
+    Replay the requests of a dead-letter file.
+
+    Requests that fail again are written to a new dead-letter file that then
+    replaces the original, so the file always holds exactly the items still missing;
+    it is removed once everything went through.
+
+    Args:
+        path (str): Path of the dead-letter file
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        table_name (str, optional): Write to this table instead of the recorded one. Defaults to None.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    # Imported here, since batch_write records its failures with this module
+    from aws_utils.batch_write import write_requests
+
+    retry_path = f"{path}.retry"
+    written = 0
+    failed = 0
+    records = load_dead_letters(path)
+    with DeadLetterWriter(retry_path) as dead_letter:
+        # Consecutive records of the same table are replayed as one lazy stream
+        for target, group in groupby(records, key=lambda record: table_name or record['table']):
+            requests = (record['request'] for record in group)
+            done, lost = write_requests(target, requests, aws_endpoint, dead_letter=dead_letter)
+            written += done
+            failed += lost
+
+    if dead_letter.count:
+        os.replace(retry_path, path)
+    else:
+        os.remove(path)
+    return written, failed
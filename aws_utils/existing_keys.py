@@ -0,0 +1,121 @@
+import hashlib
+import math
+import threading
+
+from aws_utils.clients import get_client
+from aws_utils.scan_table import parallel_scan
+from aws_utils.table_metadata import get_table_metadata, key_projection, key_token, typed_key
+from aws_utils.update_item_key_value import BATCH_GET_LIMIT, batch_get_items
+
+
+class BloomFilter:
+    """
+    Pure-Python bloom filter for set membership with a bounded false-positive rate.
+
+    Membership tests never give false negatives, so "not in the filter" means the
+    key was never added.
+
+    Args:
+        capacity (int): Expected number of entries
+        error_rate (float, optional): Target false-positive rate. Defaults to 0.001.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, token):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(token, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, token):
+        for position in self._positions(token):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, token):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(token))
+
+
+def build_key_filter(table_name, aws_endpoint=None, total_segments=8, error_rate=0.001):
+    """
+    Load the keys of every existing item into a bloom filter, with a keys-only parallel scan.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 8.
+        error_rate (float, optional): Target false-positive rate. Defaults to 0.001.
+
+    Returns:
+        BloomFilter: Filter of existing key tokens (see key_token)
+    """
+    metadata = get_table_metadata(table_name, aws_endpoint)
+    key_attributes = metadata['key_attributes']
+    # ItemCount is only refreshed every few hours, so leave headroom
+    key_filter = BloomFilter(int(metadata['item_count'] * 1.2) + 1000, error_rate)
+    lock = threading.Lock()
+
+    def add_page(items):
+        tokens = [key_token(item, key_attributes) for item in items]
+        with lock:
+            for token in tokens:
+                key_filter.add(token)
+
+    scanned = parallel_scan(table_name, add_page, aws_endpoint, total_segments, **key_projection(metadata))
+    print(f"Loaded {scanned} existing keys of {table_name}")
+    return key_filter
+
+
+def filter_existing(table_name, items, key_filter, aws_endpoint=None, stats=None):
+    """
+    Drop plain items whose key already exists in the table.
+
+    Items missing from the bloom filter are new and pass straight through. Possible
+    matches are confirmed with BatchGetItem, 100 keys per call, so a false positive
+    never causes a new item to be skipped. Keys get the table's attribute types first
+    (see table_metadata.typed_key), so string values from a CSV file match numeric keys.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        items (iterable): Plain items
+        key_filter (BloomFilter): Filter from build_key_filter
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        stats (dict, optional): Incremented with the number of 'skipped' items. Defaults to None.
+
+    Yields:
+        dict: Items whose key does not exist yet
+    """
+    metadata = get_table_metadata(table_name, aws_endpoint)
+    key_attributes = metadata['key_attributes']
+    client = get_client('dynamodb', aws_endpoint)
+    stats = stats if stats is not None else {}
+    stats.setdefault('skipped', 0)
+    candidates = {}
+
+    def confirm():
+        keys = [typed_key(item, metadata) for item in candidates.values()]
+        found = {key_token(item, key_attributes) for item in batch_get_items(client, table_name, keys, key_attributes)}
+        stats['skipped'] += len(found)
+        missing = [item for token, item in candidates.items() if token not in found]
+        candidates.clear()
+        return missing
+
+    for item in items:
+        if any(name not in item for name in key_attributes):
+            # Let the write fail and reach the dead-letter file
+            yield item
+            continue
+        token = key_token(typed_key(item, metadata), key_attributes)
+        if token not in key_filter:
+            yield item
+            continue
+        candidates[token] = item
+        if len(candidates) == BATCH_GET_LIMIT:
+            yield from confirm()
+    if candidates:
+        yield from confirm()
@@ -0,0 +1,97 @@
+import argparse
+import csv
+import sys
+import threading
+from decimal import Decimal
+
+from aws_utils.profiling import add_profile_arguments, profile_command
+from aws_utils.scan_table import parallel_scan
+from aws_utils.serializer import deserialize_item, dump_json
+
+
+def csv_value(value):
+    """Render one attribute as a CSV cell: strings and numbers as they are, null as empty, the rest as JSON."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, Decimal):
+        return str(value)
+    if value is None:
+        return ''
+    return dump_json(value)
+
+
+def export_dynamodb_to_csv(table_name, output_file, aws_endpoint=None, total_segments=4, snapshot=False,
+                           snapshot_ttl=3600, refresh_snapshot=False, watermark_field='updated_at'):
+    """
+    Export every item of a DynamoDB table to a CSV file.
+
+    The table is read with a parallel scan, or from its local snapshot (see
+    snapshot_cache.cached_scan), so repeated exports within the TTL never touch DynamoDB.
+    The columns are all attribute names, in the order they are first seen, so items with
+    attributes the first item lacks keep them.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        output_file (str): Path of the CSV file to write
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 4.
+        snapshot (bool, optional): Read the items from the table's local snapshot. Defaults to False.
+        snapshot_ttl (float, optional): Seconds a snapshot is used without refreshing. Defaults to 3600.
+        refresh_snapshot (bool, optional): Rescan the whole table into the snapshot first. Defaults to False.
+        watermark_field (str, optional): Attribute for incremental snapshot refreshes, None to always
+            rescan fully. Defaults to 'updated_at'.
+
+    Returns:
+        int: Number of items exported (no file is written for an empty table)
+    """
+    items = []
+    lock = threading.Lock()
+
+    def add_page(page):
+        rows = [deserialize_item(item) for item in page]
+        with lock:
+            items.extend(rows)
+
+    if snapshot or refresh_snapshot:
+        # Imported here, so exports without a snapshot do not load sqlite3
+        from aws_utils.snapshot_cache import cached_scan
+        add_page(cached_scan(table_name, aws_endpoint, snapshot_ttl, refresh_snapshot, watermark_field,
+                             total_segments)['Items'])
+    else:
+        parallel_scan(table_name, add_page, aws_endpoint, total_segments)
+    if not items:
+        return 0
+
+    fieldnames = list(dict.fromkeys(name for item in items for name in item))
+    with open(output_file, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for item in items:
+            writer.writerow({name: csv_value(value) for name, value in item.items()})
+    return len(items)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a DynamoDB table to a CSV file")
+    parser.add_argument("-t", "--table", type=str, help="Name of the table to export from", required=True)
+    parser.add_argument("-o", "--output", type=str, help="Path of the CSV file to write to", required=True)
+    parser.add_argument("-e", "--aws_endpoint", type=str, help="AWS endpoint URL (optional)")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel scan segments (default: 4)")
+    parser.add_argument("--snapshot", action="store_true", help="Read from a local SQLite snapshot of the table, refreshed when older than --snapshot-ttl")
+    parser.add_argument("--snapshot-ttl", type=float, default=3600, help="Seconds a snapshot is used without refreshing (default: 3600)")
+    parser.add_argument("--refresh-snapshot", action="store_true", help="Rescan the whole table into the snapshot (also picks up deleted items)")
+    parser.add_argument("--watermark-field", default="updated_at", help='Attribute for incremental snapshot refreshes, "" to always rescan fully (default: updated_at)')
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('export_to_csv', args):
+        exported = export_dynamodb_to_csv(args.table, args.output, args.aws_endpoint, args.segments, args.snapshot,
+                                          args.snapshot_ttl, args.refresh_snapshot, args.watermark_field or None)
+    if not exported:
+        print(f"Table {args.table} is empty, nothing exported")
+        return 0
+    print(f"Export complete! {exported} items written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
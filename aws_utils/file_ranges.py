@@ -0,0 +1,83 @@
+import mmap
+import os
+
+
+def _map(file):
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def split_line_ranges(file_path, parts, start=0):
+    """
+    Split a line-oriented file into byte ranges that start and end on line boundaries.
+
+    Args:
+        file_path (str): Path to the file
+        parts (int): Number of ranges wanted; small files may get fewer
+        start (int, optional): Byte offset to start from, e.g. after a CSV header. Defaults to 0.
+
+    Returns:
+        list: (start, end) byte offsets covering the file from `start` to its end
+    """
+    size = os.path.getsize(file_path)
+    if size <= start:
+        return []
+    parts = max(1, min(parts, size - start))
+
+    boundaries = [start]
+    with open(file_path, 'rb') as file, _map(file) as data:
+        for i in range(1, parts):
+            offset = start + (size - start) * i // parts
+            if offset <= boundaries[-1]:
+                continue
+            # Move to the start of the next line
+            newline = data.find(b'\n', offset - 1)
+            if newline == -1 or newline + 1 >= size:
+                break
+            if newline + 1 > boundaries[-1]:
+                boundaries.append(newline + 1)
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def iter_range_lines(file_path, start, end):
+    """
+    Yield the lines of a byte range produced by split_line_ranges, decoded as UTF-8.
+
+    The file is memory-mapped, so several workers can read their own ranges of one
+    large file concurrently without sharing a file position or copying whole ranges.
+
+    Args:
+        file_path (str): Path to the file
+        start (int): First byte of the range (a line start)
+        end (int): Byte offset where the range ends (a line start or the file size)
+
+    Yields:
+        str: Each line, including its newline
+    """
+    with open(file_path, 'rb') as file, _map(file) as data:
+        position = start
+        while position < end:
+            newline = data.find(b'\n', position, end)
+            line_end = end if newline == -1 else newline + 1
+            yield data[position:line_end].decode('utf-8')
+            position = line_end
+
+
+def header_end(file_path):
+    """Return the byte offset just after the first line of a file (e.g. a CSV header)."""
+    with open(file_path, 'rb') as file:
+        file.readline()
+        return file.tell()
+
+
+def has_quotes(file_path):
+    """
+    Check whether a file contains a double quote anywhere.
+
+    Quoted CSV fields may contain newlines, so only quote-free CSV files can be split
+    on line boundaries.
+    """
+    if os.path.getsize(file_path) == 0:
+        return False
+    with open(file_path, 'rb') as file, _map(file) as data:
+        return data.find(b'"') != -1
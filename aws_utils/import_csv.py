@@ -0,0 +1,119 @@
+import csv
+import argparse
+import sys
+
+from aws_utils.batch_write import DEDUPE_POLICIES, put_items
+from aws_utils.clients import DEFAULT_MAX_IN_FLIGHT
+from aws_utils.compression import detect_compression, open_input
+from aws_utils.dead_letter import default_dead_letter_path, open_dead_letter
+from aws_utils.file_ranges import has_quotes, header_end, iter_range_lines, split_line_ranges
+from aws_utils.import_json import report_dead_letters, retry_dlq, write_items
+from aws_utils.metrics import add_metrics_arguments, command_metrics
+from aws_utils.process_pool import DEFAULT_PROCESSES, report_progress, run_in_processes
+from aws_utils.profiling import add_profile_arguments, profile_command
+
+def _import_csv_range(table_name, csv_file, start, end, fieldnames, columns_to_keep, aws_endpoint, dead_letter_path, dedupe):
+    """Worker process task: parse and write the CSV records of one byte range."""
+    rows = csv.reader(iter_range_lines(csv_file, start, end))
+    items = ({col: value for col, value in zip(fieldnames, row) if col in columns_to_keep} for row in rows if row)
+    with open_dead_letter(dead_letter_path) as dead_letter:
+        return put_items(table_name, items, aws_endpoint, progress=report_progress, dead_letter=dead_letter, dedupe=dedupe)
+
+def import_csv_processes(table_name, csv_file, fieldnames, columns_to_keep, aws_endpoint=None, processes=None,
+                         dead_letter_path=None, dedupe=None, progress=None):
+    """
+    Import an unquoted CSV file with a pool of worker processes, each reading its own byte range.
+
+    Records are split on line boundaries after the header, which is only safe when no
+    field is quoted (quoted fields may contain newlines), and every worker memory-maps
+    the file, parses its records and writes them itself.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        csv_file (str): Path to the CSV file
+        fieldnames (list): Column names from the header
+        columns_to_keep (list): Columns to import
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        processes (int, optional): Number of worker processes. Defaults to the CPU count.
+        dead_letter_path (str, optional): Dead-letter file the workers append failed items to. Defaults to None.
+        dedupe (str, optional): 'last' or 'first' to drop repeated keys within a batch. Defaults to None.
+        progress (callable, optional): Called in the parent with item counts reported by the workers. Defaults to None.
+
+    Returns:
+        tuple: (written, failed). A range that stopped with an error counts as one failure,
+        as it is not known how many of its items were left unwritten.
+    """
+    processes = processes or DEFAULT_PROCESSES
+    ranges = split_line_ranges(csv_file, processes * 4, start=header_end(csv_file))
+    tasks = [(table_name, csv_file, start, end, fieldnames, set(columns_to_keep), aws_endpoint, dead_letter_path, dedupe)
+             for start, end in ranges]
+    totals = run_in_processes(_import_csv_range, tasks, processes, progress=progress)
+    if totals['failed'] or totals['errors']:
+        print(f"Warning: {totals['failed']} items could not be imported into {table_name}, {totals['errors']} ranges failed")
+    return totals['written'], totals['failed'] + totals['errors']
+
+def filter_and_import_csv_to_dynamodb(table_name, csv_file, columns_to_keep=None, aws_endpoint=None,
+                                      use_async=False, max_in_flight=DEFAULT_MAX_IN_FLIGHT, processes=None,
+                                      dead_letter_path=None, dedupe=None, skip_existing=False, progress=None):
+    with open_input(csv_file, newline='') as file:
+        csv_reader = csv.DictReader(file)
+        
+        # If columns_to_keep is None, use all columns
+        if columns_to_keep is None:
+            columns_to_keep = csv_reader.fieldnames
+        else:
+            # Validate that all specified columns exist in the CSV
+            all_columns = csv_reader.fieldnames
+            for column in columns_to_keep:
+                if column not in all_columns:
+                    raise ValueError(f"Column '{column}' not found in CSV. Available columns: {', '.join(all_columns)}")
+
+        # Unquoted files are split into byte ranges that the workers read themselves
+        if processes and not skip_existing and detect_compression(csv_file) is None and not has_quotes(csv_file):
+            return import_csv_processes(table_name, csv_file, csv_reader.fieldnames, columns_to_keep, aws_endpoint,
+                                        processes, dead_letter_path, dedupe, progress)
+        
+        # Rows are streamed into the batch writes instead of being loaded up front
+        items = ({col: row[col] for col in columns_to_keep} for row in csv_reader)
+        return write_items(table_name, items, aws_endpoint, use_async, max_in_flight, processes, dead_letter_path,
+                           dedupe, skip_existing, progress)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import filtered CSV data to DynamoDB")
+    parser.add_argument("-t", "--table", type=str, help="Name of the DynamoDB table (optional with --retry-dlq, which uses the recorded tables)")
+    parser.add_argument("-f", "--file", type=str, help="Path to the CSV file (may be gzip, bz2 or zstd compressed)")
+    parser.add_argument("-k", "--keep", type=str, nargs='*', help="Columns to keep (space-separated). If not specified, all columns will be kept.", default=None)
+    parser.add_argument("-e", "--aws_endpoint", type=str, help="AWS endpoint URL (optional)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Write on the asyncio engine (requires aiobotocore)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT, help=f"Maximum concurrent requests in async mode (default: {DEFAULT_MAX_IN_FLIGHT})")
+    parser.add_argument("-P", "--processes", type=int, help="Import with this many worker processes (unquoted files are split into byte ranges)")
+    parser.add_argument("--dlq", type=str, help="Dead-letter file for items that could not be written (default: ./tmp/dlq/<table>-<time>.jsonl, one per run)")
+    parser.add_argument("--dedupe", choices=DEDUPE_POLICIES + ('off',), default='last', help="Which row wins when a key repeats within a batch of 25 (default: last). Batches are written in input order only on the serial path; with --async or -P, repeats in different batches race")
+    parser.add_argument("--skip-existing", action="store_true", help="Skip rows whose key already exists in the table (loads existing keys with a keys-only scan)")
+    parser.add_argument("--retry-dlq", type=str, metavar="DLQ_FILE", help="Retry the items of a dead-letter file instead of importing a file")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('import_csv', args):
+        if args.retry_dlq:
+            _, failed = retry_dlq(args.retry_dlq, args.aws_endpoint, args.table)
+            return 1 if failed else 0
+        if not args.table or not args.file:
+            parser.error("-t/--table and -f/--file are required unless --retry-dlq is given")
+
+        dead_letter_path = args.dlq or default_dead_letter_path(args.table)
+        dedupe = None if args.dedupe == 'off' else args.dedupe
+        with command_metrics('import_csv', args) as metrics:
+            _, failed = filter_and_import_csv_to_dynamodb(args.table, args.file, args.keep, args.aws_endpoint,
+                                                          args.use_async, args.max_in_flight, args.processes,
+                                                          dead_letter_path, dedupe, args.skip_existing, metrics.add)
+        report_dead_letters(dead_letter_path)
+        if failed:
+            print(f"Filtered import finished with {failed} failures")
+            return 1
+        print("Filtered import complete!")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+import os
+import sys
+import json
+import queue
+import argparse
+import threading
+from decimal import Decimal
+
+from aws_utils.batch_write import DEDUPE_POLICIES, put_items
+from aws_utils.clients import DEFAULT_MAX_IN_FLIGHT
+from aws_utils.compression import detect_compression, open_input
+from aws_utils.dead_letter import default_dead_letter_path, open_dead_letter, retry_dead_letters
+from aws_utils.existing_keys import build_key_filter, filter_existing
+from aws_utils.file_ranges import iter_range_lines, split_line_ranges
+from aws_utils.metrics import add_metrics_arguments, command_metrics
+from aws_utils.process_pool import DEFAULT_PROCESSES, report_progress, run_in_processes
+from aws_utils.profiling import add_profile_arguments, profile_command, timed
+from aws_utils.serializer import serialize_item
+
+def import_items(table_name, items, aws_endpoint=None, rate_limiter=None, progress=None, dead_letter=None, dedupe=None):
+    """
+    Write an iterable of items to a DynamoDB table with BatchWriteItem.
+
+    Items are consumed lazily, so generators of any size can be imported, and are
+    serialized with the fast serializer instead of a resource batch writer.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        items (iterable): Items with plain JSON values (str, int, float/Decimal, bool, list, dict, None)
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        rate_limiter (RateLimiter, optional): Shared limiter capping items written per second. Defaults to None.
+        progress (callable, optional): Called with the number of items written by each batch. Defaults to None.
+        dead_letter (DeadLetterWriter, optional): Records items that could not be written. Defaults to None.
+        dedupe (str, optional): 'last' or 'first' to drop repeated keys within a batch. Defaults to None.
+
+    Returns:
+        int: Number of items written
+    """
+    written, failed = put_items(table_name, items, aws_endpoint, rate_limiter=rate_limiter, progress=progress,
+                                dead_letter=dead_letter, dedupe=dedupe)
+    if failed:
+        print(f"Warning: {failed} items could not be imported into {table_name}")
+    return written
+
+def import_items_parallel(table_name, items, aws_endpoint=None, writers=4, queue_size=10000,
+                          rate_limiter=None, progress=None, dead_letter=None, dedupe=None):
+    """
+    Write an iterable of items to a DynamoDB table from several batch writer threads.
+
+    The calling thread keeps consuming items (e.g. from a converter or a pipe) while
+    the writer threads drain a bounded queue, so producing and writing overlap.
+    All writers share the pooled client.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        items (iterable): Items with plain JSON values
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        writers (int, optional): Number of batch writer threads. Defaults to 4.
+        queue_size (int, optional): Maximum items buffered between producer and writers. Defaults to 10000.
+        rate_limiter (RateLimiter, optional): Shared limiter capping items written per second. Defaults to None.
+        progress (callable, optional): Progress callback, see import_items. Must be thread-safe.
+        dead_letter (DeadLetterWriter, optional): Records items that could not be written. Defaults to None.
+        dedupe (str, optional): 'last' or 'first' to drop repeated keys within a batch. Defaults to None.
+
+    Returns:
+        int: Number of items written
+    """
+    pending = queue.Queue(maxsize=queue_size)
+    done = object()
+    results = []
+    errors = []
+
+    def drain():
+        while True:
+            item = pending.get()
+            if item is done:
+                return
+            yield item
+
+    def write():
+        try:
+            results.append(import_items(table_name, drain(), aws_endpoint, rate_limiter, progress, dead_letter, dedupe))
+        except Exception as e:
+            errors.append(e)
+            # Keep consuming so the producer never blocks on a full queue
+            for _ in drain():
+                pass
+
+    threads = [threading.Thread(target=write, daemon=True) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for item in items:
+            pending.put(item)
+    finally:
+        for _ in threads:
+            pending.put(done)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return sum(results)
+
+async def import_items_async(table_name, items, aws_endpoint=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT, progress=None,
+                             dead_letter=None, dedupe=None):
+    """
+    Write an iterable of items on the asyncio engine, with many batches in flight at once.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        items (iterable): Items with plain JSON values
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        max_in_flight (int, optional): Maximum concurrent requests. Defaults to 256.
+        progress (callable, optional): Progress callback, see import_items. Defaults to None.
+        dead_letter (DeadLetterWriter, optional): Records items that could not be written. Defaults to None.
+        dedupe (str, optional): 'last' or 'first' to drop repeated keys within a batch. Defaults to None.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    from aws_utils.async_engine import AsyncEngine
+
+    async with AsyncEngine(aws_endpoint, max_in_flight=max_in_flight) as engine:
+        serialize = timed('serialize', serialize_item)
+        requests = ({'PutRequest': {'Item': serialize(item)}} for item in items)
+        stats = {'duplicates': 0}
+        written, failed = await engine.write_all(table_name, requests, progress, dead_letter, dedupe, stats)
+    if stats['duplicates']:
+        print(f"Dropped {stats['duplicates']} duplicate keys ({dedupe} occurrence kept)")
+    if failed:
+        print(f"Warning: {failed} items could not be imported into {table_name}")
+    return written, failed
+
+def _import_item_chunk(table_name, items, aws_endpoint, dead_letter_path, dedupe):
+    """Worker process task: serialize and write a chunk of items."""
+    with open_dead_letter(dead_letter_path) as dead_letter:
+        return put_items(table_name, items, aws_endpoint, progress=report_progress, dead_letter=dead_letter, dedupe=dedupe)
+
+def _import_jsonl_range(table_name, json_file, start, end, keys_to_keep, aws_endpoint, dead_letter_path, dedupe):
+    """Worker process task: parse, filter and write the JSONL lines of one byte range."""
+    def parse():
+        offset = start
+        for line in iter_range_lines(json_file, start, end):
+            if line.strip():
+                try:
+                    item = json.loads(line, parse_float=Decimal)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Error decoding JSON in line at byte {offset}: {e}")
+                yield filter_item(item, keys_to_keep)
+            offset += len(line.encode('utf-8'))
+
+    with open_dead_letter(dead_letter_path) as dead_letter:
+        return put_items(table_name, parse(), aws_endpoint, progress=report_progress, dead_letter=dead_letter, dedupe=dedupe)
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def import_items_processes(table_name, items, aws_endpoint=None, processes=None, chunk_size=1000, dead_letter_path=None,
+                           dedupe=None, progress=None):
+    """
+    Write items from a pool of worker processes, each with its own client.
+
+    The parent only reads the input and hands out chunks, while serialization and
+    BatchWriteItem calls run in the workers, across all cores.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        items (iterable): Items with plain JSON values
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        processes (int, optional): Number of worker processes. Defaults to the CPU count.
+        chunk_size (int, optional): Items per task sent to a worker. Defaults to 1000.
+        dead_letter_path (str, optional): Dead-letter file the workers append failed items to. Defaults to None.
+        dedupe (str, optional): 'last' or 'first' to drop repeated keys within a batch. Defaults to None.
+        progress (callable, optional): Called in the parent with item counts reported by the workers. Defaults to None.
+
+    Returns:
+        tuple: (written, failed). A chunk that stopped with an error counts as one failure,
+        as it is not known how many of its items were left unwritten.
+    """
+    tasks = ((table_name, chunk, aws_endpoint, dead_letter_path, dedupe) for chunk in _chunks(items, chunk_size))
+    totals = run_in_processes(_import_item_chunk, tasks, processes, progress=progress)
+    if totals['failed'] or totals['errors']:
+        print(f"Warning: {totals['failed']} items could not be imported into {table_name}, {totals['errors']} chunks failed")
+    return totals['written'], totals['failed'] + totals['errors']
+
+def import_jsonl_processes(table_name, json_file, keys_to_keep=None, aws_endpoint=None, processes=None,
+                           dead_letter_path=None, dedupe=None, progress=None):
+    """
+    Import a JSONL file with a pool of worker processes, each owning a byte range of it.
+
+    Ranges are aligned to line boundaries, and each worker reads, parses, filters,
+    serializes and writes its own lines, so nothing goes through the parent.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        json_file (str): Path to the JSONL file
+        keys_to_keep (list, optional): Keys to keep. Defaults to None (all keys).
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        processes (int, optional): Number of worker processes. Defaults to the CPU count.
+        dead_letter_path (str, optional): Dead-letter file the workers append failed items to. Defaults to None.
+        dedupe (str, optional): 'last' or 'first' to drop repeated keys within a batch. Defaults to None.
+        progress (callable, optional): Called in the parent with item counts reported by the workers. Defaults to None.
+
+    Returns:
+        tuple: (written, failed). A range that stopped with an error counts as one failure,
+        as it is not known how many of its items were left unwritten.
+    """
+    processes = processes or DEFAULT_PROCESSES
+    # Several ranges per process, so a slow range does not leave other cores idle
+    ranges = split_line_ranges(json_file, processes * 4)
+    tasks = [(table_name, json_file, start, end, keys_to_keep, aws_endpoint, dead_letter_path, dedupe)
+             for start, end in ranges]
+    totals = run_in_processes(_import_jsonl_range, tasks, processes, progress=progress)
+    if totals['failed'] or totals['errors']:
+        print(f"Warning: {totals['failed']} items could not be imported into {table_name}, {totals['errors']} ranges failed")
+    return totals['written'], totals['failed'] + totals['errors']
+
+def write_items(table_name, items, aws_endpoint=None, use_async=False, max_in_flight=DEFAULT_MAX_IN_FLIGHT, processes=None,
+                dead_letter_path=None, dedupe=None, skip_existing=False, progress=None):
+    """
+    Import items with import_items, or on the asyncio engine or a process pool when asked to.
+
+    With skip_existing, items whose key is already in the table are dropped first,
+    using a bloom filter of the existing keys (see existing_keys.filter_existing).
+    `progress` is called with the number of items written by each batch, whatever the mode.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    stats = {'skipped': 0}
+    if skip_existing:
+        key_filter = build_key_filter(table_name, aws_endpoint)
+        items = filter_existing(table_name, items, key_filter, aws_endpoint, stats)
+
+    if processes:
+        written, failed = import_items_processes(table_name, items, aws_endpoint, processes,
+                                                 dead_letter_path=dead_letter_path, dedupe=dedupe, progress=progress)
+    else:
+        with open_dead_letter(dead_letter_path) as dead_letter:
+            if use_async:
+                import asyncio
+                written, failed = asyncio.run(import_items_async(table_name, items, aws_endpoint, max_in_flight,
+                                                                 progress, dead_letter, dedupe))
+            else:
+                written, failed = put_items(table_name, items, aws_endpoint, progress=progress, dead_letter=dead_letter,
+                                            dedupe=dedupe)
+                if failed:
+                    print(f"Warning: {failed} items could not be imported into {table_name}")
+
+    if skip_existing:
+        print(f"Skipped {stats['skipped']} items that already exist in {table_name}")
+    return written, failed
+
+def report_dead_letters(dead_letter_path):
+    """Tell the user where failed items went and how to retry them."""
+    if dead_letter_path and os.path.exists(dead_letter_path):
+        print(f"Failed items were written to {dead_letter_path}. Retry them with --retry-dlq {dead_letter_path}")
+
+def filter_item(item, keys_to_keep):
+    """Keep only the given keys of an item, or all of them when keys_to_keep is None."""
+    if keys_to_keep is None:
+        return item
+    return {key: item.get(key) for key in keys_to_keep if key in item}
+
+def warn_missing_keys(item, keys_to_keep):
+    """Warn about keys to keep that the first item does not have."""
+    all_keys = set(item.keys())
+    for key in keys_to_keep:
+        if key not in all_keys:
+            print(f"Warning: Key '{key}' not found in the first JSON item. Available keys: {', '.join(all_keys)}")
+
+def first_jsonl_item(json_file):
+    """Parse the first non-empty line of a JSONL file, or return None."""
+    with open_input(json_file) as file:
+        for line in file:
+            if line.strip():
+                return json.loads(line, parse_float=Decimal)
+    return None
+
+def filter_and_import_json_to_dynamodb(table_name, json_file, keys_to_keep=None, is_jsonl=False, aws_endpoint=None,
+                                       use_async=False, max_in_flight=DEFAULT_MAX_IN_FLIGHT, processes=None,
+                                       dead_letter_path=None, dedupe=None, skip_existing=False, progress=None):
+    # Compressed files cannot be split into byte ranges, so they are read in one stream, and
+    # skipping existing keys needs the bloom filter of the parent process
+    if is_jsonl and processes and not skip_existing and detect_compression(json_file) is None:
+        first_item = first_jsonl_item(json_file) if keys_to_keep is not None else None
+        if first_item is not None:
+            warn_missing_keys(first_item, keys_to_keep)
+        return import_jsonl_processes(table_name, json_file, keys_to_keep, aws_endpoint, processes, dead_letter_path,
+                                      dedupe, progress)
+
+    # Load JSON data; floats are parsed as Decimal, which boto3 requires
+    parse = timed('deserialize', json.loads)
+    items = []
+    with open_input(json_file) as file:
+        if is_jsonl:
+            # Process JSONL format (each line is a JSON object)
+            for line_num, line in enumerate(file, 1):
+                try:
+                    if line.strip():  # Skip empty lines
+                        item = parse(line, parse_float=Decimal)
+                        items.append(item)
+                except json.JSONDecodeError as e:
+                    print(f"Error decoding JSON at line {line_num}: {e}")
+                    print(f"Problematic line: {line.strip()}")
+                    sys.exit(1)
+        else:
+            # Process regular JSON format
+            try:
+                data = json.load(file, parse_float=Decimal)
+                # Handle different JSON structures (single object or array of objects)
+                if isinstance(data, dict):
+                    items = [data]
+                elif isinstance(data, list):
+                    items = data
+                else:
+                    print(f"Unsupported JSON structure. Expected object or array, got {type(data).__name__}")
+                    sys.exit(1)
+            except json.JSONDecodeError as e:
+                print(f"Error decoding JSON: {e}")
+                sys.exit(1)
+
+    if not items:
+        print("Warning: No valid JSON items found in the file.")
+        sys.exit(1)
+
+    # Filter keys if specified
+    transform = timed('transform', filter_item)
+    filtered_items = []
+    for item in items:
+        if keys_to_keep is None:
+            # Keep all keys
+            filtered_items.append(item)
+        else:
+            # Validate that specified keys exist in at least one item
+            if filtered_items == []:  # Only check the first time
+                warn_missing_keys(item, keys_to_keep)
+
+            # Filter the item
+            filtered_items.append(transform(item, keys_to_keep))
+
+    # Batch write items to DynamoDB
+    return write_items(table_name, filtered_items, aws_endpoint, use_async, max_in_flight, processes, dead_letter_path,
+                       dedupe, skip_existing, progress)
+
+def retry_dlq(dead_letter_path, aws_endpoint=None, table_name=None):
+    """Retry a dead-letter file and report the outcome; the CLI side of --retry-dlq. Returns (written, failed)."""
+    written, failed = retry_dead_letters(dead_letter_path, aws_endpoint, table_name)
+    print(f"Retried dead letters: {written} items written, {failed} still failing")
+    report_dead_letters(dead_letter_path)
+    return written, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import filtered JSON data to DynamoDB")
+    parser.add_argument("-t", "--table", type=str, help="Name of the DynamoDB table (optional with --retry-dlq, which uses the recorded tables)")
+    parser.add_argument("-f", "--file", type=str, help="Path to the JSON file (may be gzip, bz2 or zstd compressed)")
+    parser.add_argument("-k", "--keep", type=str, nargs='*', help="Keys to keep (space-separated). If not specified, all keys will be kept.", default=None)
+    parser.add_argument("--jsonl", action="store_true", help="Treat input as JSONL format (one JSON object per line)")
+    parser.add_argument("-e", "--aws_endpoint", type=str, help="AWS endpoint URL (optional)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Write on the asyncio engine (requires aiobotocore)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT, help=f"Maximum concurrent requests in async mode (default: {DEFAULT_MAX_IN_FLIGHT})")
+    parser.add_argument("-P", "--processes", type=int, help="Import with this many worker processes (JSONL files are split into byte ranges)")
+    parser.add_argument("--dlq", type=str, help="Dead-letter file for items that could not be written (default: ./tmp/dlq/<table>-<time>.jsonl, one per run)")
+    parser.add_argument("--dedupe", choices=DEDUPE_POLICIES + ('off',), default='last', help="Which item wins when a key repeats within a batch of 25 (default: last). Batches are written in input order only on the serial path; with --async or -P, repeats in different batches race")
+    parser.add_argument("--skip-existing", action="store_true", help="Skip items whose key already exists in the table (loads existing keys with a keys-only scan)")
+    parser.add_argument("--retry-dlq", type=str, metavar="DLQ_FILE", help="Retry the items of a dead-letter file instead of importing a file")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('import_json', args):
+        if args.retry_dlq:
+            _, failed = retry_dlq(args.retry_dlq, args.aws_endpoint, args.table)
+            return 1 if failed else 0
+        if not args.table or not args.file:
+            parser.error("-t/--table and -f/--file are required unless --retry-dlq is given")
+
+        dead_letter_path = args.dlq or default_dead_letter_path(args.table)
+        dedupe = None if args.dedupe == 'off' else args.dedupe
+        with command_metrics('import_json', args) as metrics:
+            _, failed = filter_and_import_json_to_dynamodb(args.table, args.file, args.keep, args.jsonl, args.aws_endpoint,
+                                               args.use_async, args.max_in_flight, args.processes, dead_letter_path,
+                                               dedupe, args.skip_existing, metrics.add)
+        report_dead_letters(dead_letter_path)
+        if failed:
+            print(f"Filtered import finished with {failed} failures")
+            return 1
+        print("Filtered import complete!")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
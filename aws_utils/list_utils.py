@@ -1,25 +1,37 @@
 #!/usr/bin/env python3
 
 import argparse
-import pkg_resources
 import sys
-from colorama import Fore, Style
+
+from aws_utils.runner import add_run_arguments, run
+
+DISTRIBUTION = 'aws-utils'
 
 def get_console_scripts():
-    """Get all console scripts from the entry points"""
-    scripts = []
-    for entry_point in pkg_resources.iter_entry_points(group='console_scripts'):
-        if entry_point.dist.key == 'aws-utils':
-            scripts.append(entry_point.name)
-    return sorted(scripts)
-
-def main():
+    """Get the console scripts of this package from its installed metadata"""
+    # Reads only this distribution's entry_points.txt, instead of scanning every
+    # installed distribution the way pkg_resources.iter_entry_points does
+    from importlib.metadata import PackageNotFoundError, distribution
+    try:
+        entry_points = distribution(DISTRIBUTION).entry_points
+    except PackageNotFoundError:
+        return []
+    return sorted(entry_point.name for entry_point in entry_points if entry_point.group == 'console_scripts')
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='List all available AWS utility commands')
     # argparse already provides -h/--help by default, so we don't need to add it
-    
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run', help='Run a script of commands (or stdin) in one process with warm clients')
+    add_run_arguments(run_parser)
+
     # Parse args - this will automatically handle the -h flag
-    parser.parse_args()
-    
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        return run(args.script, args.keep_going, not args.quiet)
+
+    from colorama import Fore, Style
     scripts = get_console_scripts()
     
     print(f"{Fore.CYAN}Available AWS Utility Commands:{Style.RESET_ALL}")
@@ -30,4 +42,4 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,346 @@
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+from aws_utils.clients import LatencyHook, register_event_handler, unregister_event_handler
+from aws_utils.table_metadata import get_table_metadata
+
+# Upper bounds of the request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+THROTTLE_CODES = ('ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded')
+
+READ_OPERATIONS = ('Scan', 'Query', 'GetItem', 'BatchGetItem', 'TransactGetItems')
+
+# Operations that accept ReturnConsumedCapacity
+CAPACITY_OPERATIONS = READ_OPERATIONS + (
+    'PutItem', 'UpdateItem', 'DeleteItem', 'BatchWriteItem', 'TransactWriteItems',
+    'ExecuteStatement', 'BatchExecuteStatement', 'ExecuteTransaction',
+)
+
+PROGRESS_INTERVAL = 1.0
+BAR_WIDTH = 30
+
+COUNTERS = ('items', 'requests', 'bytes_sent', 'bytes_received', 'read_capacity_units', 'write_capacity_units',
+            'throttles', 'retries', 'unprocessed', 'errors')
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Metrics:
+    """
+    Counters, a request latency histogram and a progress bar for one command run.
+
+    Items are counted by the tools (pass `metrics.add` wherever a `progress` callback
+    is accepted). Requests, bytes, consumed RCU/WCU, throttles, retries and latencies
+    are collected from the shared boto3 clients once `instrument()` is called.
+    Progress is printed at most once per `interval` seconds, as a bar with an ETA
+    when the total is known (e.g. a table's ItemCount).
+
+    Args:
+        command (str): Command name, used in the summary and Prometheus labels
+        total (int, optional): Expected number of items, for the percentage and ETA. Defaults to None.
+        interval (float, optional): Minimum seconds between progress updates. Defaults to 1.
+        stream (file, optional): Where progress is written. Defaults to sys.stderr.
+        quiet (bool, optional): Only collect, never print progress. Defaults to False.
+    """
+
+    def __init__(self, command, total=None, interval=PROGRESS_INTERVAL, stream=None, quiet=False):
+        self.command = command
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.quiet = quiet
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.started = time.time()
+        self.finished = None
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+        self._handlers = []
+        self._latency_hook = LatencyHook(lambda operation, seconds: self.observe_latency(seconds))
+        self._is_tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+
+    # Counting
+
+    def add(self, items=1, **counters):
+        """Count processed items (and optionally other counters), then maybe show progress."""
+        with self._lock:
+            self.counters['items'] += items
+            for name, value in counters.items():
+                self.counters[name] += value
+        self.report()
+
+    def increment(self, name, value=1):
+        """Increase one counter, e.g. increment('errors')."""
+        with self._lock:
+            self.counters[name] += value
+
+    def observe_latency(self, seconds):
+        """Record one request latency in the histogram."""
+        index = len(LATENCY_BUCKETS)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                index = i
+                break
+        with self._lock:
+            self.latency_buckets[index] += 1
+            self.latency_sum += seconds
+
+    def latency_percentile(self, fraction):
+        """Approximate a latency percentile (in seconds) from the histogram bucket bounds."""
+        with self._lock:
+            buckets = list(self.latency_buckets)
+        count = sum(buckets)
+        if not count:
+            return None
+        rank = fraction * count
+        seen = 0
+        for i, bucket in enumerate(buckets):
+            seen += bucket
+            if seen >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+    # botocore instrumentation
+
+    def _before_parameter_build(self, params, model, **kwargs):
+        if model.name in CAPACITY_OPERATIONS:
+            params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+    def _before_send(self, request, **kwargs):
+        body = request.body
+        if body:
+            self.increment('bytes_sent', len(body))
+
+    def _after_call(self, http_response, parsed, model, **kwargs):
+        capacity = parsed.get('ConsumedCapacity')
+        units = 0
+        if isinstance(capacity, list):
+            units = sum(entry.get('CapacityUnits', 0) for entry in capacity)
+        elif capacity:
+            units = capacity.get('CapacityUnits', 0)
+        unprocessed = sum(len(requests) for requests in (parsed.get('UnprocessedItems') or {}).values())
+        unprocessed += sum(len(request['Keys']) for request in (parsed.get('UnprocessedKeys') or {}).values())
+
+        with self._lock:
+            self.counters['requests'] += 1
+            self.counters['retries'] += parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            self.counters['bytes_received'] += len(http_response.content or b'')
+            self.counters['unprocessed'] += unprocessed
+            if model.name in READ_OPERATIONS:
+                self.counters['read_capacity_units'] += units
+            else:
+                self.counters['write_capacity_units'] += units
+
+    def _needs_retry(self, response=None, **kwargs):
+        if response is None:
+            return None
+        code = response[1].get('Error', {}).get('Code')
+        if code in THROTTLE_CODES:
+            self.increment('throttles')
+        return None
+
+    def instrument(self, capacity=True):
+        """
+        Start collecting request metrics from every shared boto3 client.
+
+        Args:
+            capacity (bool, optional): Ask DynamoDB for the consumed capacity of every request
+                (ReturnConsumedCapacity=TOTAL), for the RCU/WCU counters. Defaults to True.
+        """
+        self._handlers = []
+        if capacity:
+            self._handlers.append(('before-parameter-build.dynamodb', self._before_parameter_build))
+        self._handlers += [
+            ('before-send.dynamodb', self._before_send),
+            ('after-call.dynamodb', self._after_call),
+            ('needs-retry.dynamodb', self._needs_retry),
+        ]
+        for event_name, handler in self._handlers:
+            register_event_handler(event_name, handler)
+        self._latency_hook.register()
+        return self
+
+    def uninstrument(self):
+        for event_name, handler in self._handlers:
+            unregister_event_handler(event_name, handler)
+        self._handlers = []
+        self._latency_hook.unregister()
+
+    # Output
+
+    def progress_line(self):
+        """Build the progress line: bar and percentage when the total is known, rate and ETA."""
+        items = self.counters['items']
+        elapsed = max((self.finished or time.time()) - self.started, 1e-9)
+        rate = items / elapsed
+        parts = [f"{self.command}:"]
+        if self.total:
+            fraction = min(items / self.total, 1.0)
+            filled = int(BAR_WIDTH * fraction)
+            parts.append(f"[{'#' * filled}{'-' * (BAR_WIDTH - filled)}] {fraction:>4.0%} {items}/{self.total}")
+        else:
+            parts.append(f"{items} items")
+        parts.append(f"{rate:,.0f} items/s")
+        if self.total and rate > 0 and items < self.total:
+            parts.append(f"ETA {_format_duration((self.total - items) / rate)}")
+        if self.counters['throttles']:
+            parts.append(f"{self.counters['throttles']} throttled")
+        return " ".join(parts)
+
+    def report(self, force=False):
+        """Print the progress line if `interval` seconds passed since the last one."""
+        if self.quiet:
+            return
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+        line = self.progress_line()
+        if self._is_tty:
+            self.stream.write(f"\r{line}\033[K")
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def finish(self):
+        """Stop the clock, print the last progress line and stop collecting request metrics."""
+        self.finished = time.time()
+        self.uninstrument()
+        if not self.quiet:
+            self.report(force=True)
+            if self._is_tty:
+                self.stream.write("\n")
+        return self.summary()
+
+    def summary(self):
+        """Return all metrics as a JSON-serializable dict."""
+        duration = (self.finished or time.time()) - self.started
+        with self._lock:
+            counters = dict(self.counters)
+            buckets = list(self.latency_buckets)
+            latency_sum = self.latency_sum
+        p50 = self.latency_percentile(0.5)
+        p99 = self.latency_percentile(0.99)
+        return {
+            'command': self.command,
+            'started_at': self.started,
+            'duration_seconds': round(duration, 3),
+            'items_per_second': round(counters['items'] / duration, 1) if duration > 0 else None,
+            'total': self.total,
+            'counters': counters,
+            'latency': {
+                'buckets': {str(bound): count for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), buckets)},
+                'count': sum(buckets),
+                'sum_seconds': round(latency_sum, 6),
+                'p50_seconds': p50 if p50 != float('inf') else None,
+                'p99_seconds': p99 if p99 != float('inf') else None,
+            },
+        }
+
+    def write_json(self, path):
+        """Write the summary as JSON."""
+        _write_atomic(path, json.dumps(self.summary(), indent=2))
+
+    def write_prometheus(self, path):
+        """
+        Write the metrics in the Prometheus text format, e.g. for node_exporter's textfile collector.
+
+        The file is replaced atomically, so a collector never reads a partial file.
+        """
+        summary = self.summary()
+        label = f'command="{self.command}"'
+        lines = []
+
+        def metric(name, metric_type, help_text, value, labels=label):
+            lines.append(f"# HELP aws_utils_{name} {help_text}")
+            lines.append(f"# TYPE aws_utils_{name} {metric_type}")
+            lines.append(f"aws_utils_{name}{{{labels}}} {value}")
+
+        for name in COUNTERS:
+            metric(f"{name}_total", 'counter', name.replace('_', ' ').capitalize(), summary['counters'][name])
+        metric('duration_seconds', 'gauge', 'Duration of the run', summary['duration_seconds'])
+        metric('last_run_timestamp_seconds', 'gauge', 'End of the run', round(self.finished or time.time(), 3))
+
+        lines.append("# HELP aws_utils_request_latency_seconds DynamoDB request latency")
+        lines.append("# TYPE aws_utils_request_latency_seconds histogram")
+        cumulative = 0
+        for bound, count in summary['latency']['buckets'].items():
+            cumulative += count
+            lines.append(f'aws_utils_request_latency_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f"aws_utils_request_latency_seconds_sum{{{label}}} {summary['latency']['sum_seconds']}")
+        lines.append(f"aws_utils_request_latency_seconds_count{{{label}}} {summary['latency']['count']}")
+
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+
+def _write_atomic(path, content):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as file:
+        file.write(content)
+    os.replace(temp_path, path)
+
+
+def add_metrics_arguments(parser):
+    """Add the shared --metrics-json/--prometheus-file/--quiet options to a command's parser."""
+    parser.add_argument('--metrics-json', type=str, help='Write a JSON summary of items, capacity, throttles and latency to this file')
+    parser.add_argument('--prometheus-file', type=str, help='Write the metrics in Prometheus text format to this file (textfile collector)')
+    parser.add_argument('--quiet', action='store_true', help='Do not show the progress bar')
+
+
+def start_metrics(command, args, total=None):
+    """
+    Create and instrument a Metrics instance for a command from its parsed arguments.
+
+    Consumed capacity is only requested when a metrics file will be written, so a plain
+    run sends the same requests as it would without metrics.
+    """
+    capacity = bool(args.metrics_json or args.prometheus_file)
+    return Metrics(command, total=total, quiet=args.quiet).instrument(capacity)
+
+
+def finish_metrics(metrics, args):
+    """Finish a Metrics instance and write the outputs requested on the command line."""
+    summary = metrics.finish()
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+    if args.prometheus_file:
+        metrics.write_prometheus(args.prometheus_file)
+    return summary
+
+
+@contextlib.contextmanager
+def command_metrics(command, args, total=None):
+    """
+    Collect metrics for the body of a command's main(), see start_metrics and finish_metrics.
+
+    The botocore handlers are removed and the outputs written even when the body
+    raises or exits, so a failed command never leaves the shared clients instrumented.
+    """
+    metrics = start_metrics(command, args, total)
+    try:
+        yield metrics
+    finally:
+        finish_metrics(metrics, args)
+
+
+def table_item_count(table_name, aws_endpoint=None):
+    """Approximate item count of a table (ItemCount, refreshed by DynamoDB every ~6 hours), for ETAs."""
+    try:
+        return get_table_metadata(table_name, aws_endpoint)['item_count'] or None
+    except Exception:
+        return None
@@ -0,0 +1,311 @@
+import argparse
+import json
+import sys
+import threading
+from decimal import Decimal, InvalidOperation
+
+from aws_utils.clients import get_client
+from aws_utils.profiling import add_profile_arguments, profile_command, timed
+from aws_utils.scan_table import parallel_scan
+from aws_utils.serializer import get_type_serializer
+from aws_utils.table_metadata import extract_key, get_table_metadata
+
+TRUE_STRINGS = ('true', 't', 'yes', 'y', '1')
+SUPPORTED_TYPES = ('S', 'N', 'BOOL')
+
+
+def _to_decimal(value):
+    """Recursively replace floats with Decimals so values can be serialized for DynamoDB."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _to_decimal(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_decimal(v) for v in value]
+    return value
+
+
+def load_spec(spec_file):
+    """
+    Load and validate a schema migration spec from a JSON or YAML file.
+
+    The spec supports four sections, all optional:
+
+        rename:   {"old_name": "new_name"}
+        remove:   ["column"]
+        convert:  {"column": "N"}        (target type: S, N or BOOL)
+        defaults: {"column": "value"}    (set only where the column is missing)
+
+    Conversions and defaults refer to the column name after renaming.
+
+    Args:
+        spec_file (str): Path to the spec file (.json, .yaml or .yml)
+
+    Returns:
+        dict: Normalized spec with all four sections present
+    """
+    with open(spec_file, 'r') as file:
+        if spec_file.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required for YAML specs. Install it with: pip install pyyaml")
+            raw_spec = yaml.safe_load(file) or {}
+        else:
+            raw_spec = json.load(file)
+
+    unknown_sections = set(raw_spec) - {'rename', 'remove', 'convert', 'defaults'}
+    if unknown_sections:
+        raise ValueError(f"Unknown spec sections: {', '.join(sorted(unknown_sections))}")
+
+    spec = {
+        'rename': dict(raw_spec.get('rename') or {}),
+        'remove': list(raw_spec.get('remove') or []),
+        'convert': dict(raw_spec.get('convert') or {}),
+        'defaults': _to_decimal(dict(raw_spec.get('defaults') or {})),
+    }
+
+    for column, target_type in spec['convert'].items():
+        if target_type not in SUPPORTED_TYPES:
+            raise ValueError(f"Unsupported target type '{target_type}' for column '{column}'. Use one of: {', '.join(SUPPORTED_TYPES)}")
+
+    removed = set(spec['remove'])
+    renamed_to = set(spec['rename'].values())
+    for old_name, new_name in spec['rename'].items():
+        if old_name in removed or new_name in removed:
+            raise ValueError(f"Column '{old_name}' cannot be both renamed and removed")
+    for column in list(spec['convert']) + list(spec['defaults']):
+        if column in removed:
+            raise ValueError(f"Column '{column}' cannot be both removed and converted/defaulted")
+        if column in spec['rename'] and column not in renamed_to:
+            raise ValueError(f"Column '{column}' is renamed; refer to it by its new name in convert/defaults")
+
+    if not any(spec.values()):
+        raise ValueError("Spec is empty, nothing to migrate")
+
+    return spec
+
+
+def convert_attribute(value, target_type):
+    """
+    Convert a low-level DynamoDB attribute value to another scalar type.
+
+    Args:
+        value (dict): Attribute value in client format, e.g. {'S': '42'}
+        target_type (str): Target DynamoDB type (S, N or BOOL)
+
+    Returns:
+        dict: Converted attribute value
+
+    Raises:
+        ValueError: If the value cannot be represented in the target type
+    """
+    source_type, raw = next(iter(value.items()))
+    if source_type == target_type:
+        return value
+
+    if target_type == 'S':
+        if source_type == 'N':
+            return {'S': raw}
+        if source_type == 'BOOL':
+            return {'S': 'true' if raw else 'false'}
+    elif target_type == 'N':
+        if source_type == 'S':
+            try:
+                number = Decimal(raw.strip())
+            except InvalidOperation:
+                raise ValueError(f"'{raw}' is not a number")
+            if not number.is_finite():
+                raise ValueError(f"'{raw}' is not a finite number")
+            return {'N': str(number)}
+        if source_type == 'BOOL':
+            return {'N': '1' if raw else '0'}
+    elif target_type == 'BOOL':
+        if source_type == 'S':
+            return {'BOOL': raw.strip().lower() in TRUE_STRINGS}
+        if source_type == 'N':
+            return {'BOOL': Decimal(raw) != 0}
+
+    raise ValueError(f"Cannot convert type {source_type} to {target_type}")
+
+
+def build_item_update(item, spec, serializer=None):
+    """
+    Build the single UpdateItem expression that applies the whole spec to one item.
+
+    Args:
+        item (dict): Item in low-level client format
+        spec (dict): Spec as returned by load_spec
+        serializer (TypeSerializer, optional): Serializer used for default values
+
+    Returns:
+        dict or None: update_item parameters (UpdateExpression, ExpressionAttributeNames
+        and, when needed, ExpressionAttributeValues), or None if the item needs no change
+    """
+    serializer = serializer or get_type_serializer()
+    names = {}
+    values = {}
+    set_clauses = []
+    remove_clauses = []
+
+    def name_ref(column):
+        ref = f"#a{len(names)}"
+        names[ref] = column
+        return ref
+
+    def value_ref(value):
+        ref = f":v{len(values)}"
+        values[ref] = value
+        return ref
+
+    # Resolve the final value of every touched column, after renaming
+    new_values = {}
+    for old_name, new_name in spec['rename'].items():
+        if old_name in item:
+            new_values[new_name] = item[old_name]
+    # An old name that is also a rename target (chained or swapped renames) is SET with its
+    # new value; removing it too would make DynamoDB reject the overlapping paths
+    for old_name in spec['rename']:
+        if old_name in item and old_name not in new_values:
+            remove_clauses.append(name_ref(old_name))
+
+    for column in spec['remove']:
+        if column in item:
+            remove_clauses.append(name_ref(column))
+
+    for column, target_type in spec['convert'].items():
+        current = new_values.get(column, item.get(column))
+        if current is None or 'NULL' in current:
+            continue
+        converted = convert_attribute(current, target_type)
+        if converted != item.get(column):
+            new_values[column] = converted
+
+    for column, value in new_values.items():
+        set_clauses.append(f"{name_ref(column)} = {value_ref(value)}")
+
+    for column, default in spec['defaults'].items():
+        if column not in item and column not in new_values:
+            ref = name_ref(column)
+            set_clauses.append(f"{ref} = if_not_exists({ref}, {value_ref(serializer.serialize(default))})")
+
+    if not set_clauses and not remove_clauses:
+        return None
+
+    expression = []
+    if set_clauses:
+        expression.append("SET " + ", ".join(set_clauses))
+    if remove_clauses:
+        expression.append("REMOVE " + ", ".join(remove_clauses))
+
+    update = {
+        'UpdateExpression': " ".join(expression),
+        'ExpressionAttributeNames': names,
+    }
+    if values:
+        update['ExpressionAttributeValues'] = values
+    return update
+
+
+def migrate_schema(table_name, spec, aws_endpoint=None, total_segments=8, dry_run=False):
+    """
+    Apply renames, removals, type conversions and default fills in a single table pass.
+
+    The table is read once with a parallel scan and every item that needs a change
+    gets exactly one UpdateItem call, however many columns the spec touches.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        spec (dict): Spec as returned by load_spec
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 8.
+        dry_run (bool, optional): Only count the items that would change. Defaults to False.
+
+    Returns:
+        dict: Counts of scanned, updated, unchanged and failed items
+    """
+    client = get_client('dynamodb', aws_endpoint, max_pool_connections=total_segments)
+
+    metadata = get_table_metadata(table_name, aws_endpoint)
+    key_attributes = metadata['key_attributes']
+    for column in list(spec['rename']) + list(spec['rename'].values()) + spec['remove'] + list(spec['convert']) + list(spec['defaults']):
+        if column in key_attributes:
+            raise ValueError(f"Key attribute '{column}' cannot be changed by a schema migration")
+
+    serializer = get_type_serializer()
+    stats = {'updated': 0, 'unchanged': 0, 'failed': 0}
+    stats_lock = threading.Lock()
+
+    # The hash key must still exist, so items deleted mid-scan are not recreated
+    condition = "attribute_exists(#pk)"
+    build_update = timed('transform', build_item_update)
+
+    def process_page(items):
+        counts = {'updated': 0, 'unchanged': 0, 'failed': 0}
+        for item in items:
+            try:
+                update = build_update(item, spec, serializer)
+            except ValueError as e:
+                key = extract_key(item, metadata)
+                print(f"Error converting item {json.dumps(key)}: {e}")
+                counts['failed'] += 1
+                continue
+
+            if update is None:
+                counts['unchanged'] += 1
+                continue
+
+            if not dry_run:
+                update['ExpressionAttributeNames']['#pk'] = metadata['hash_key']
+                try:
+                    client.update_item(
+                        TableName=table_name,
+                        Key=extract_key(item, metadata),
+                        ConditionExpression=condition,
+                        **update
+                    )
+                except client.exceptions.ConditionalCheckFailedException:
+                    counts['unchanged'] += 1
+                    continue
+                except Exception as e:
+                    key = extract_key(item, metadata)
+                    print(f"Error updating item {json.dumps(key)}: {e}")
+                    counts['failed'] += 1
+                    continue
+            counts['updated'] += 1
+
+        with stats_lock:
+            for name, count in counts.items():
+                stats[name] += count
+            processed = sum(stats.values())
+        print(f"Processed {processed} items ({stats['updated']} {'to update' if dry_run else 'updated'}, {stats['failed']} failed)")
+
+    print(f"Starting schema migration of {table_name} with {total_segments} scan segments")
+    scanned = parallel_scan(table_name, process_page, aws_endpoint, total_segments)
+
+    stats['scanned'] = scanned
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rename, remove, retype and default-fill columns of a DynamoDB table in one pass.')
+    parser.add_argument('-t', '--table_name', type=str, required=True, help='Name of the DynamoDB table')
+    parser.add_argument('-s', '--spec', type=str, required=True, help='Path to the JSON/YAML migration spec')
+    parser.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional)')
+    parser.add_argument('--segments', type=int, default=8, help='Number of parallel scan segments (default: 8)')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many items would change')
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('migrate_schema', args):
+        spec = load_spec(args.spec)
+        stats = migrate_schema(args.table_name, spec, args.aws_endpoint, args.segments, args.dry_run)
+
+        action = 'would be updated' if args.dry_run else 'updated'
+        print(f"Schema migration complete: {stats['scanned']} items scanned, {stats['updated']} {action}, "
+              f"{stats['unchanged']} unchanged, {stats['failed']} failed")
+        return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
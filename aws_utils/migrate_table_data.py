@@ -1,17 +1,21 @@
 import argparse
 import json
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
 
-import boto3
+from aws_utils.batch_write import put_items
+from aws_utils.clients import DEFAULT_MAX_IN_FLIGHT, get_client
+from aws_utils.metrics import add_metrics_arguments, command_metrics, table_item_count
+from aws_utils.process_pool import DEFAULT_PROCESSES, report_progress, run_in_processes, split_segments
+from aws_utils.profiling import add_profile_arguments, profile_command, stage
+from aws_utils.scan_table import scan_segment
 
 
 def scan_table_page(table_name, aws_endpoint=None, limit=100, exclusive_start_key=None):
     """Scan a single page of items from a DynamoDB table."""
-    if aws_endpoint:
-        client = boto3.client('dynamodb', endpoint_url=aws_endpoint)
-    else:
-        client = boto3.client('dynamodb')
+    client = get_client('dynamodb', aws_endpoint)
 
     scan_params = {'TableName': table_name, 'Limit': limit}
     
@@ -23,10 +27,7 @@ def scan_table_page(table_name, aws_endpoint=None, limit=100, exclusive_start_ke
 
 def write_batch_items(table_name, items, aws_endpoint=None):
     """Write a batch of items to a DynamoDB table."""
-    if aws_endpoint:
-        client = boto3.client('dynamodb', endpoint_url=aws_endpoint)
-    else:
-        client = boto3.client('dynamodb')
+    client = get_client('dynamodb', aws_endpoint)
     
     request_items = {
         table_name: [{'PutRequest': {'Item': item}} for item in items]
@@ -35,7 +36,7 @@ def write_batch_items(table_name, items, aws_endpoint=None):
     return client.batch_write_item(RequestItems=request_items)
 
 
-def migrate_table(source_table, dest_table, aws_endpoint=None, batch_size=25, max_items=None):
+def migrate_table(source_table, dest_table, aws_endpoint=None, batch_size=25, max_items=None, progress=None):
     """
     Migrate data from source table to destination table with pagination.
     
@@ -45,11 +46,13 @@ def migrate_table(source_table, dest_table, aws_endpoint=None, batch_size=25, ma
         aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
         batch_size (int, optional): Batch size for writes (max 25). Defaults to 25.
         max_items (int, optional): Maximum number of items to migrate. Defaults to None (all items).
+        progress (callable, optional): Called with the number of items written by each batch. Defaults to None.
         
     Returns:
-        int: Number of items processed
+        tuple: (items written, items that could not be written)
     """
     items_processed = 0
+    items_failed = 0
     batches_processed = 0
     last_key = None
     
@@ -74,19 +77,20 @@ def migrate_table(source_table, dest_table, aws_endpoint=None, batch_size=25, ma
         # Process the items in batches of 25 (DynamoDB batch write limit)
         for i in range(0, len(items), batch_size):
             batch = items[i:i+batch_size]
-            write_batch_items(dest_table, batch, aws_endpoint)
-            items_processed += len(batch)
+            # put_items retries unprocessed items with backoff; only those still left count as failed
+            written, failed = put_items(dest_table, batch, aws_endpoint, serialized=True, progress=progress)
+            items_processed += written
+            items_failed += failed
             batches_processed += 1
             
-            print(f"Processed {items_processed} items ({batches_processed} batches)")
-            
             # Respect the maximum items limit if specified
-            if max_items and items_processed >= max_items:
+            if max_items and items_processed + items_failed >= max_items:
                 print(f"Reached maximum items limit ({max_items})")
-                return items_processed
+                return items_processed, items_failed
             
             # Small pause to avoid hitting rate limits
-            time.sleep(0.1)
+            with stage('sleep'):
+                time.sleep(0.1)
         
         # Get the last evaluated key for pagination
         last_key = response.get('LastEvaluatedKey')
@@ -95,34 +99,168 @@ def migrate_table(source_table, dest_table, aws_endpoint=None, batch_size=25, ma
             print("Migration completed - processed all items")
             break
     
+    if items_failed:
+        print(f"Warning: {items_failed} items could not be written to {dest_table}")
     print(f"Migration completed - processed {items_processed} items in {batches_processed} batches")
-    return items_processed
+    return items_processed, items_failed
+
+
+async def migrate_table_async(source_table, dest_table, aws_endpoint=None, total_segments=16,
+                              max_in_flight=DEFAULT_MAX_IN_FLIGHT, progress=None):
+    """
+    Migrate all items on the asyncio engine: a parallel scan of the source table whose
+    pages are written to the destination as concurrent batches.
+
+    Args:
+        source_table (str): Source DynamoDB table name
+        dest_table (str): Destination DynamoDB table name
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 16.
+        max_in_flight (int, optional): Maximum concurrent requests. Defaults to 256.
+        progress (callable, optional): Called with the number of items written by each batch. Defaults to None.
+
+    Returns:
+        tuple: (written, failed) item counts
+    """
+    from aws_utils.async_engine import AsyncEngine
+
+    totals = {'written': 0, 'failed': 0}
+
+    print(f"Starting async migration from {source_table} to {dest_table} ({total_segments} segments)")
+
+    async with AsyncEngine(aws_endpoint, max_in_flight=max_in_flight) as engine:
+        async def copy_page(items):
+            written, failed = await engine.write_all(dest_table, ({'PutRequest': {'Item': item}} for item in items), progress)
+            totals['written'] += written
+            totals['failed'] += failed
+
+        await engine.scan(source_table, copy_page, total_segments)
+
+    if totals['failed']:
+        print(f"Warning: {totals['failed']} items could not be written")
+    print(f"Migration completed - processed {totals['written']} items")
+    return totals['written'], totals['failed']
+
+
+def _migrate_segments(source_table, dest_table, aws_endpoint, segments, total_segments):
+    """Worker process task: copy a set of scan segments, one thread per segment."""
+    client = get_client('dynamodb', aws_endpoint, max_pool_connections=len(segments))
+    written = 0
+    failed = 0
+
+    def copy_segment(segment):
+        counts = [0, 0]
+
+        def copy_page(items):
+            done, lost = put_items(dest_table, items, aws_endpoint, serialized=True, progress=report_progress)
+            counts[0] += done
+            counts[1] += lost
+
+        scan_segment(client, source_table, segment, total_segments, copy_page)
+        return counts
 
+    with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+        for done, lost in executor.map(copy_segment, segments):
+            written += done
+            failed += lost
+    return written, failed
 
-def main():
+
+def migrate_table_processes(source_table, dest_table, aws_endpoint=None, processes=None, total_segments=None,
+                            progress=None):
+    """
+    Migrate all items with a pool of worker processes, each owning a share of the scan segments.
+
+    Every worker has its own client, so response parsing and request building are
+    spread across cores instead of being capped by one interpreter's GIL. The parent
+    only collects progress and errors.
+
+    Args:
+        source_table (str): Source DynamoDB table name
+        dest_table (str): Destination DynamoDB table name
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        processes (int, optional): Number of worker processes. Defaults to the CPU count.
+        total_segments (int, optional): Number of scan segments. Defaults to 4 per process.
+        progress (callable, optional): Called in the parent with item counts reported by the workers. Defaults to None.
+
+    Returns:
+        tuple: (written, failed). A worker that stopped with an error counts as one failure,
+        as it is not known how many of its items were left unwritten.
+    """
+    processes = processes or DEFAULT_PROCESSES
+    total_segments = max(total_segments or processes * 4, processes)
+    tasks = [(source_table, dest_table, aws_endpoint, segments, total_segments)
+             for segments in split_segments(total_segments, processes)]
+
+    print(f"Starting migration from {source_table} to {dest_table} ({processes} processes, {total_segments} segments)")
+    totals = run_in_processes(_migrate_segments, tasks, processes, progress=progress)
+
+    if totals['failed'] or totals['errors']:
+        print(f"Warning: {totals['failed']} items could not be written, {totals['errors']} workers failed")
+    print(f"Migration completed - processed {totals['written']} items")
+    return totals['written'], totals['failed'] + totals['errors']
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Migrate data from one DynamoDB table to another.')
     parser.add_argument('-s', '--source_table', type=str, help='Source table name', required=True)
     parser.add_argument('-d', '--dest_table', type=str, help='Destination table name', required=True)
     parser.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional, for local development)')
     parser.add_argument('-b', '--batch_size', type=int, default=25, help='Batch size for writes (max 25)')
     parser.add_argument('-m', '--max_items', type=int, help='Maximum number of items to migrate')
-    args = parser.parse_args()
-    
-    # Validate batch size
-    if args.batch_size > 25:
-        print("Warning: Maximum batch size is 25, using 25 instead of", args.batch_size)
-        args.batch_size = 25
-    
-    # Run the migration
-    total_items = migrate_table(
-        args.source_table,
-        args.dest_table,
-        args.aws_endpoint,
-        args.batch_size,
-        args.max_items
-    )
-    
-    print(f"Successfully migrated {total_items} items from {args.source_table} to {args.dest_table}")
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Run on the asyncio engine (requires aiobotocore)')
+    parser.add_argument('-P', '--processes', type=int, help='Copy with this many worker processes, each owning a share of the scan segments')
+    parser.add_argument('--segments', type=int, help='Parallel scan segments in async/process mode (default: 16 async, 4 per process)')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT, help=f'Maximum concurrent requests in async mode (default: {DEFAULT_MAX_IN_FLIGHT})')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('migrate_table', args):
+        if (args.use_async or args.processes) and args.max_items:
+            parser.error("--max_items is not supported with --async or --processes")
+
+        # Validate batch size
+        if args.batch_size > 25:
+            print("Warning: Maximum batch size is 25, using 25 instead of", args.batch_size)
+            args.batch_size = 25
+
+        total = args.max_items or table_item_count(args.source_table, args.aws_endpoint)
+        with command_metrics('migrate_table', args, total) as metrics:
+            if args.processes:
+                total_items, failed = migrate_table_processes(
+                    args.source_table,
+                    args.dest_table,
+                    args.aws_endpoint,
+                    args.processes,
+                    args.segments,
+                    metrics.add
+                )
+            elif args.use_async:
+                import asyncio
+                total_items, failed = asyncio.run(migrate_table_async(
+                    args.source_table,
+                    args.dest_table,
+                    args.aws_endpoint,
+                    args.segments or 16,
+                    args.max_in_flight,
+                    metrics.add
+                ))
+            else:
+                total_items, failed = migrate_table(
+                    args.source_table,
+                    args.dest_table,
+                    args.aws_endpoint,
+                    args.batch_size,
+                    args.max_items,
+                    metrics.add
+                )
+
+        if failed:
+            print(f"Migrated {total_items} items from {args.source_table} to {args.dest_table}, {failed} failed")
+            return 1
+        print(f"Successfully migrated {total_items} items from {args.source_table} to {args.dest_table}")
+        return 0
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,147 @@
+import base64
+import json
+import os
+from collections import deque
+from datetime import datetime, timezone
+from decimal import Decimal
+
+
+def _format_date(value):
+    """Format a $date value as an ISO 8601 UTC string with millisecond precision."""
+    if isinstance(value, str):
+        # Relaxed mode already emits ISO 8601 strings
+        return value
+    if isinstance(value, dict):
+        # Canonical mode and out-of-range dates use milliseconds since the epoch
+        value = value.get('$numberLong', 0)
+    moment = datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _convert_number(raw):
+    """Convert a $numberDouble/$numberDecimal string, keeping non-finite values as strings."""
+    number = Decimal(raw)
+    return number if number.is_finite() else raw
+
+
+def convert_value(value):
+    """
+    Recursively convert an Extended JSON value to types boto3 can write.
+
+    $oid becomes a string, $date an ISO 8601 string, $numberInt/$numberLong an int,
+    $numberDouble/$numberDecimal a Decimal and $binary bytes. Floats become Decimals.
+    Nested documents and arrays are converted in place of their originals.
+
+    Args:
+        value: Value parsed from Extended JSON
+
+    Returns:
+        The converted value
+    """
+    if isinstance(value, dict):
+        if len(value) == 1:
+            (tag, raw), = value.items()
+            if tag == '$oid':
+                return raw
+            if tag == '$date':
+                return _format_date(raw)
+            if tag in ('$numberLong', '$numberInt'):
+                return int(raw)
+            if tag in ('$numberDecimal', '$numberDouble'):
+                return _convert_number(raw)
+        if '$binary' in value:
+            binary = value['$binary']
+            # Canonical v2 format nests the payload, legacy format has it inline
+            payload = binary['base64'] if isinstance(binary, dict) else binary
+            return base64.b64decode(payload)
+        return {k: convert_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [convert_value(v) for v in value]
+    if isinstance(value, float):
+        return Decimal(str(value))
+    return value
+
+
+def convert_document(document, id_field='id'):
+    """
+    Convert one MongoDB document to a DynamoDB item.
+
+    Args:
+        document (dict): Document parsed from Extended JSON
+        id_field (str, optional): Attribute that receives the converted _id. Defaults to 'id'.
+            Pass None to keep _id as is.
+
+    Returns:
+        dict: DynamoDB item
+    """
+    item = convert_value(document)
+    if id_field and '_id' in item:
+        item[id_field] = item.pop('_id')
+    return item
+
+
+def convert_lines(lines, id_field='id'):
+    """
+    Parse and convert a chunk of Extended JSON lines, skipping blank lines.
+
+    Args:
+        lines (list): JSONL lines, one document each
+        id_field (str, optional): Attribute that receives the converted _id. Defaults to 'id'.
+
+    Returns:
+        list: DynamoDB items
+    """
+    return [
+        convert_document(json.loads(line, parse_float=Decimal), id_field)
+        for line in lines if line.strip()
+    ]
+
+
+def _chunks(lines, chunk_size):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_converted(lines, processes=None, chunk_size=1000, id_field='id'):
+    """
+    Convert a stream of Extended JSON lines in a process pool, yielding items in order.
+
+    Only a bounded number of chunks is in flight at once, so arbitrarily large inputs
+    are converted without being held in memory.
+
+    Args:
+        lines (iterable): JSONL lines, e.g. an open file
+        processes (int, optional): Worker processes. Defaults to the number of CPUs.
+            With 1, conversion runs in the calling process.
+        chunk_size (int, optional): Lines sent to a worker at a time. Defaults to 1000.
+        id_field (str, optional): Attribute that receives the converted _id. Defaults to 'id'.
+
+    Yields:
+        dict: DynamoDB items
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for chunk in _chunks(lines, chunk_size):
+            yield from convert_lines(chunk, id_field)
+        return
+
+    # Importing ProcessPoolExecutor loads multiprocessing, so it waits until a pool is needed
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # full_migration runs this from pipeline threads; forking a process that has other
+    # threads can deadlock the child on a lock held at fork time, so workers are spawned
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+        pending = deque()
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(executor.submit(convert_lines, chunk, id_field))
+            if len(pending) >= processes * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_STATE_FILE = "./tmp/mongo_sync_state.json"
+
+# Collections of a full migration share one state file
+_state_lock = threading.Lock()
+
+
+def load_sync_state(state_file=DEFAULT_STATE_FILE):
+    """Load the high-water mark state file, returning an empty state if it doesn't exist yet."""
+    try:
+        with open(state_file, 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def get_watermark(state_file, mongo_db, mongo_collection, field):
+    """
+    Get the stored high-water mark of a collection.
+
+    Args:
+        state_file (str): Path to the state file
+        mongo_db (str): MongoDB database name
+        mongo_collection (str): MongoDB collection name
+        field (str): Watermark field ('_id' or a date field such as 'updated_at')
+
+    Returns:
+        str or None: Last synced value, or None if the collection was never synced on this field
+    """
+    with _state_lock:
+        entry = load_sync_state(state_file).get(mongo_db, {}).get(mongo_collection)
+    if entry and entry.get('field') == field:
+        return entry.get('value')
+    return None
+
+
+def save_watermark(state_file, mongo_db, mongo_collection, field, value):
+    """Atomically record a new high-water mark for a collection."""
+    with _state_lock:
+        state = load_sync_state(state_file)
+        state.setdefault(mongo_db, {})[mongo_collection] = {
+            'field': field,
+            'value': value,
+            'synced_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+        directory = os.path.dirname(state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = f"{state_file}.tmp"
+        with open(temp_file, 'w') as file:
+            json.dump(state, file, indent=2)
+        os.replace(temp_file, state_file)
+
+
+def watermark_query(field, value, overlap_seconds=60):
+    """
+    Build the mongoexport --query selecting documents past a high-water mark.
+
+    The mark is moved back by overlap_seconds, because ObjectIds and timestamps from
+    different writers are not strictly ordered. Re-sending a few documents is harmless,
+    since every import is an upsert.
+
+    Args:
+        field (str): Watermark field ('_id' or a date field)
+        value (str): Last synced value (ObjectId hex or ISO 8601 date)
+        overlap_seconds (int, optional): Safety window. Defaults to 60.
+
+    Returns:
+        dict: Extended JSON query
+    """
+    if field == '_id':
+        # The first 4 bytes of an ObjectId are its creation time in seconds
+        timestamp = max(int(value[:8], 16) - overlap_seconds, 0)
+        return {'_id': {'$gt': {'$oid': f"{timestamp:08x}" + "0" * 16}}}
+
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc) - timedelta(seconds=overlap_seconds)
+    return {field: {'$gt': {'$date': moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"}}}
+
+
+class WatermarkTracker:
+    """
+    Track the highest watermark value among converted items as they stream past.
+
+    Args:
+        field (str): Watermark field in the MongoDB documents
+        id_field (str, optional): Attribute the converter moves _id to. Defaults to 'id'.
+    """
+
+    def __init__(self, field, id_field='id'):
+        self.field = field
+        self.item_field = id_field if field == '_id' else field
+        self.value = None
+        self.count = 0
+
+    def track(self, items):
+        """Yield items unchanged, counting them and remembering the largest watermark value seen."""
+        for item in items:
+            self.count += 1
+            value = item.get(self.item_field)
+            # ObjectId hex strings and uniform ISO 8601 dates both sort lexicographically
+            if isinstance(value, str) and (self.value is None or value > self.value):
+                self.value = value
+            yield item
@@ -1,18 +1,117 @@
 import argparse
+import json
+import shlex
 import subprocess
 import os
 import sys
-import json
-import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from colorama import Fore, Style
+
+from aws_utils.import_json import import_items, import_items_parallel
+from aws_utils.mongo_converter import iter_converted
+from aws_utils.mongo_sync import DEFAULT_STATE_FILE, WatermarkTracker, get_watermark, save_watermark, watermark_query
+from aws_utils.profiling import add_profile_arguments, profile_command
+from aws_utils.rate_limiter import RateLimiter
 
 def ensure_dir(directory):
     """Ensure a directory exists."""
     Path(directory).mkdir(parents=True, exist_ok=True)
 
+def mongoexport_command(mongo_uri, mongo_db, mongo_collection, export_command=None, query=None):
+    """
+    Build the command that exports a collection as JSONL to stdout.
+
+    Args:
+        mongo_uri (str): MongoDB connection URI
+        mongo_db (str): MongoDB database name
+        mongo_collection (str): MongoDB collection name
+        export_command (str, optional): Command to run instead of mongoexport, e.g. a local
+            stub emitting JSONL. {db}, {collection} and {query} are substituted. Defaults to None.
+        query (dict, optional): Extended JSON filter passed as --query. Defaults to None (all documents).
+
+    Returns:
+        list: Command arguments
+    """
+    query_json = json.dumps(query) if query else ''
+    if export_command:
+        return shlex.split(export_command.format(db=mongo_db, collection=mongo_collection,
+                                                 query=shlex.quote(query_json or '{}')))
+    command = [
+        "mongoexport", 
+        f"--uri={mongo_uri}", 
+        f"--db={mongo_db}", 
+        f"--collection={mongo_collection}", 
+        "--authenticationDatabase=admin"
+    ]
+    if query_json:
+        command.append(f"--query={query_json}")
+    return command
+
+def stream_collection_to_dynamo(command, dynamo_table, aws_endpoint=None, workers=None, writers=4,
+                                rate_limiter=None, progress=None, tracker=None):
+    """
+    Pipe an export command's stdout through the converter into parallel batch writers.
+
+    Nothing is written to disk: records are converted and written while the export is
+    still running, so the migration takes about as long as the slower of the two sides.
+
+    Args:
+        command (list): Export command writing Extended JSON lines to stdout
+        dynamo_table (str): DynamoDB table name
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        workers (int, optional): Conversion processes. Defaults to the number of CPUs.
+        writers (int, optional): Batch writer threads. Defaults to 4.
+        rate_limiter (RateLimiter, optional): Shared limiter capping items written per second. Defaults to None.
+        progress (callable, optional): Called with counts of newly written items. Defaults to None.
+        tracker (WatermarkTracker, optional): Counts the streamed items and records their high-water mark. Defaults to None.
+
+    Returns:
+        int: Number of items written
+
+    Raises:
+        subprocess.CalledProcessError: If the export command exits with an error
+    """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, bufsize=1 << 20)
+    try:
+        items = iter_converted(process.stdout, processes=workers)
+        if tracker:
+            items = tracker.track(items)
+        imported = import_items_parallel(dynamo_table, items, aws_endpoint, writers,
+                                         rate_limiter=rate_limiter, progress=progress)
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return imported
+
+def _advance_watermark(tracker, imported, state_file, mongo_db, mongo_collection):
+    """
+    Store the tracked high-water mark once a sync has fully succeeded.
+
+    Items that failed to import may lie anywhere below the mark, so the mark is kept
+    where it was when any item failed, and the next sync retries the whole window.
+    """
+    from colorama import Fore, Style
+
+    if tracker and imported < tracker.count:
+        print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} {tracker.count - imported} items of '{mongo_collection}' were not imported, "
+              f"keeping the previous high-water mark")
+        return
+    if tracker and tracker.value is not None:
+        save_watermark(state_file, mongo_db, mongo_collection, tracker.field, tracker.value)
+        print(f"{Fore.YELLOW}[SYNC]{Style.RESET_ALL} High-water mark for '{mongo_collection}' is now {tracker.field}={tracker.value}")
+
 def mongo_to_dynamo_table(mongo_uri, mongo_db, mongo_collection, dynamo_table, 
-                           temp_dir="./tmp/mongo_export", force=False):
+                           temp_dir="./tmp/mongo_export", force=False, aws_endpoint=None, workers=None,
+                           stream=False, writers=4, export_command=None, rate_limiter=None, progress=None,
+                           incremental=False, watermark_field='_id', state_file=DEFAULT_STATE_FILE, overlap_seconds=60):
     """
     Export a MongoDB collection to a DynamoDB table.
     
@@ -23,10 +122,25 @@ def mongo_to_dynamo_table(mongo_uri, mongo_db, mongo_collection, dynamo_table,
         dynamo_table (str): DynamoDB table name
         temp_dir (str): Directory to store temporary files
         force (bool): Skip confirmation prompt if True
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        workers (int, optional): Conversion processes. Defaults to the number of CPUs.
+        stream (bool, optional): Pipe mongoexport straight into DynamoDB without temp files. Defaults to False.
+        writers (int, optional): Batch writer threads in stream mode. Defaults to 4.
+        export_command (str, optional): Command to run instead of mongoexport. Defaults to None.
+        rate_limiter (RateLimiter, optional): Shared limiter capping items written per second. Defaults to None.
+        progress (callable, optional): Called with counts of newly written items. Defaults to None.
+        incremental (bool, optional): Only export documents past the stored high-water mark
+            and upsert them, then advance the mark. Defaults to False.
+        watermark_field (str, optional): '_id' (catches inserts) or a date field such as
+            'updated_at' (catches inserts and updates). Defaults to '_id'.
+        state_file (str, optional): JSON file holding the high-water marks. Defaults to ./tmp/mongo_sync_state.json.
+        overlap_seconds (int, optional): Safety window re-synced before the mark. Defaults to 60.
         
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if every exported document was imported, False otherwise
     """
+    from colorama import Fore, Style
+
     # Confirm before proceeding
     if not force:
         print(f"This will export data from MongoDB collection '{mongo_collection}' in database '{mongo_db}'")
@@ -35,110 +149,147 @@ def mongo_to_dynamo_table(mongo_uri, mongo_db, mongo_collection, dynamo_table,
         if confirm.lower() != "yes":
             print("Operation cancelled.")
             return False
+
+    query = None
+    # Counts the exported documents, and tracks the high-water mark of incremental syncs
+    tracker = WatermarkTracker(watermark_field)
+    if incremental:
+        watermark = get_watermark(state_file, mongo_db, mongo_collection, watermark_field)
+        if watermark:
+            query = watermark_query(watermark_field, watermark, overlap_seconds)
+            print(f"{Fore.YELLOW}[SYNC]{Style.RESET_ALL} Syncing '{mongo_collection}' documents with {watermark_field} after {watermark}")
+        else:
+            print(f"{Fore.YELLOW}[SYNC]{Style.RESET_ALL} No high-water mark for '{mongo_collection}' yet, syncing everything")
+
+    command = mongoexport_command(mongo_uri, mongo_db, mongo_collection, export_command, query)
+
+    if stream:
+        print(f"{Fore.YELLOW}[STEP]{Style.RESET_ALL} Streaming '{mongo_collection}' from database '{mongo_db}' into DynamoDB table '{dynamo_table}'...")
+        started = time.time()
+        try:
+            imported = stream_collection_to_dynamo(command, dynamo_table, aws_endpoint, workers, writers,
+                                                   rate_limiter, progress, tracker)
+        except subprocess.CalledProcessError as e:
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to export MongoDB collection: {e}")
+            return False
+        except FileNotFoundError:
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {command[0]} command not found. Please install MongoDB tools.")
+            return False
+        except Exception as e:
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to import data to DynamoDB: {e}")
+            return False
+        if imported < tracker.count:
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Streamed {imported} of {tracker.count} items from MongoDB to DynamoDB in {time.time() - started:.1f}s")
+        else:
+            print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Streamed {imported} items from MongoDB to DynamoDB in {time.time() - started:.1f}s!")
+        if incremental:
+            _advance_watermark(tracker, imported, state_file, mongo_db, mongo_collection)
+        return imported == tracker.count
     
     # Create temp directory if it doesn't exist
     ensure_dir(temp_dir)
     
-    # Set JSON file paths
+    # Set JSON file path
     mongo_json_file = os.path.join(temp_dir, f"{mongo_collection}.jsonl")
-    dynamo_json_file = os.path.join(temp_dir, f"{mongo_collection}_dynamo.jsonl")
     
     print(f"{Fore.YELLOW}[STEP]{Style.RESET_ALL} Exporting MongoDB collection '{mongo_collection}' from database '{mongo_db}' to JSONL...")
     
     # Export MongoDB collection to JSONL (each document on a new line)
     try:
-        subprocess.run([
-            "mongoexport", 
-            f"--uri={mongo_uri}", 
-            f"--db={mongo_db}", 
-            f"--collection={mongo_collection}", 
-            f"--out={mongo_json_file}", 
-            "--authenticationDatabase=admin"
-        ], check=True)
+        with open(mongo_json_file, 'w') as export_file:
+            subprocess.run(command, stdout=export_file, check=True)
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to export MongoDB collection: {e}")
         return False
     except FileNotFoundError:
-        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} mongoexport command not found. Please install MongoDB tools.")
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {command[0]} command not found. Please install MongoDB tools.")
         return False
     
     print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Successfully exported to {mongo_json_file}")
     
-    print(f"{Fore.YELLOW}[STEP]{Style.RESET_ALL} Converting MongoDB IDs to DynamoDB format...")
+    print(f"{Fore.YELLOW}[STEP]{Style.RESET_ALL} Converting and importing data to DynamoDB table '{dynamo_table}'...")
     
-    # Check if the mongo_to_dynamo_object command is available
-    # First try as a direct command
+    # Convert Extended JSON in a process pool and write straight to DynamoDB, no intermediate file
     try:
-        # Get the current directory
-        current_dir = os.getcwd()
-        # Change to mongo_to_dynamo_object directory
-        mongo_converter_dir = os.path.join(current_dir, "mongo_to_dynamo_object")
-        
-        # Check if cargo and rust are available
-        if not os.path.exists(mongo_converter_dir):
-            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} mongo_to_dynamo_object directory not found at: {mongo_converter_dir}")
-            return False
-            
-        # Run the cargo command
-        os.chdir(mongo_converter_dir)
-        subprocess.run([
-            "cargo", "run", "--", 
-            "--input", f"../{mongo_json_file}", 
-            "--output", f"../{dynamo_json_file}"
-        ], check=True)
-        # Change back to original directory
-        os.chdir(current_dir)
-    except subprocess.CalledProcessError as e:
-        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to convert MongoDB IDs: {e}")
-        # Change back to original directory if an error occurred
-        if 'current_dir' in locals():
-            os.chdir(current_dir)
-        return False
-    except FileNotFoundError:
-        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} cargo command not found. Please install Rust and Cargo.")
-        # Change back to original directory if an error occurred
-        if 'current_dir' in locals():
-            os.chdir(current_dir)
-        return False
-        
-    print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Successfully converted MongoDB IDs to DynamoDB format")
-    
-    print(f"{Fore.YELLOW}[STEP]{Style.RESET_ALL} Importing data to DynamoDB table '{dynamo_table}'...")
-    
-    # Import the import_json module from our package
-    try:
-        from aws_utils.import_json import import_json
-        
-        # Call the import_json function
-        import_json(
-            table_name=dynamo_table,
-            file_path=dynamo_json_file,
-            jsonl=True
-        )
+        with open(mongo_json_file, 'r') as export_file:
+            items = tracker.track(iter_converted(export_file, processes=workers))
+            imported = import_items(dynamo_table, items, aws_endpoint, rate_limiter, progress)
     except Exception as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to import data to DynamoDB: {e}")
         return False
     
-    print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Successfully imported data from MongoDB to DynamoDB!")
-    print("Temporary files:")
-    print(f"- MongoDB export: {mongo_json_file}")
-    print(f"- DynamoDB import: {dynamo_json_file}")
+    if imported < tracker.count:
+        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Imported {imported} of {tracker.count} items from MongoDB to DynamoDB")
+    else:
+        print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Successfully imported {imported} items from MongoDB to DynamoDB!")
+    print(f"MongoDB export kept at: {mongo_json_file}")
+    if incremental:
+        _advance_watermark(tracker, imported, state_file, mongo_db, mongo_collection)
     
-    return True
+    return imported == tracker.count
+
+def collection_sizes(mongo_uri, mongo_db, collection_names):
+    """
+    Estimate document counts per collection, used to schedule the largest collections first.
 
-def full_migration(mongo_uri, mongo_db, target_env="dev", force=False):
+    Uses pymongo's estimated_document_count (a metadata read, no scan) when pymongo
+    is installed. Without it, or when the estimate fails, a warning with the reason is
+    printed and None is returned.
+
+    Args:
+        mongo_uri (str): MongoDB connection URI
+        mongo_db (str): MongoDB database name
+        collection_names (list): Collections to size
+
+    Returns:
+        dict or None: Estimated document count per collection
+    """
+    from colorama import Fore, Style
+
+    try:
+        from pymongo import MongoClient
+    except ImportError:
+        print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} Collection sizes unknown (pymongo not installed), keeping default order")
+        return None
+
+    try:
+        with MongoClient(mongo_uri, authSource='admin', serverSelectionTimeoutMS=5000) as mongo:
+            database = mongo[mongo_db]
+            return {name: database[name].estimated_document_count() for name in collection_names}
+    except Exception as e:
+        print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} Could not estimate collection sizes ({type(e).__name__}: {e}), keeping default order")
+        return None
+
+def full_migration(mongo_uri, mongo_db, target_env="dev", force=False, concurrency=4, max_write_rate=None,
+                   aws_endpoint=None, stream=False, export_command=None, progress_interval=10,
+                   incremental=False, watermark_field='_id', state_file=DEFAULT_STATE_FILE):
     """
     Perform a full migration of all collections from MongoDB to DynamoDB.
+
+    Collections are migrated concurrently, largest first, so the total time is set by
+    the largest collection instead of the sum of all of them. All pipelines share one
+    write rate limit.
     
     Args:
         mongo_uri (str): MongoDB connection URI
         mongo_db (str): MongoDB database name
         target_env (str): Environment suffix for DynamoDB tables (prod/dev)
         force (bool): Skip confirmation prompts if True
+        concurrency (int, optional): Collections migrated at the same time. Defaults to 4.
+        max_write_rate (float, optional): Global cap on items written per second. Defaults to None (no cap).
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        stream (bool, optional): Stream every collection without temp files. Defaults to False.
+        export_command (str, optional): Command to run instead of mongoexport. Defaults to None.
+        progress_interval (float, optional): Seconds between progress reports. Defaults to 10.
+        incremental (bool, optional): Sync only documents past each collection's high-water mark. Defaults to False.
+        watermark_field (str, optional): '_id' or a date field such as 'updated_at'. Defaults to '_id'.
+        state_file (str, optional): JSON file holding the high-water marks. Defaults to ./tmp/mongo_sync_state.json.
         
     Returns:
         bool: True if successful, False otherwise
     """
+    from colorama import Fore, Style
+
     # Collections to migrate
     collections = [
         ('users', f'tracking_software_users_{target_env}'),
@@ -166,31 +317,83 @@ def full_migration(mongo_uri, mongo_db, target_env="dev", force=False):
         if confirm.lower() != "yes":
             print("Migration cancelled.")
             return False
-    
-    # Track success
-    success_count = 0
-    failed_collections = []
-    
-    # Migrate each collection
-    for mongo_col, dynamo_table in collections:
-        print(f"\n{Fore.YELLOW}[MIGRATING]{Style.RESET_ALL} {mongo_col} → {dynamo_table}")
-        
-        success = mongo_to_dynamo_table(
-            mongo_uri=mongo_uri,
-            mongo_db=mongo_db,
-            mongo_collection=mongo_col,
-            dynamo_table=dynamo_table,
-            force=True  # Skip individual confirmations
-        )
-        
-        if success:
-            success_count += 1
-        else:
-            failed_collections.append(mongo_col)
+
+    # Start the largest collections first so they don't end up running alone at the end
+    sizes = collection_sizes(mongo_uri, mongo_db, [mongo_col for mongo_col, _ in collections])
+    if sizes:
+        collections.sort(key=lambda collection: sizes.get(collection[0], 0), reverse=True)
+
+    rate_limiter = RateLimiter(max_write_rate) if max_write_rate else None
+    # Split conversion processes between the pipelines running at the same time
+    workers = max(1, (os.cpu_count() or 1) // concurrency)
+
+    written = {mongo_col: 0 for mongo_col, _ in collections}
+    status = {mongo_col: 'queued' for mongo_col, _ in collections}
+    status_lock = threading.Lock()
+    finished = threading.Event()
+
+    def make_progress(mongo_col):
+        def progress(count):
+            with status_lock:
+                written[mongo_col] += count
+        return progress
+
+    def migrate(mongo_col, dynamo_table):
+        with status_lock:
+            status[mongo_col] = 'running'
+        print(f"{Fore.YELLOW}[MIGRATING]{Style.RESET_ALL} {mongo_col} → {dynamo_table}")
+        started = time.time()
+        try:
+            success = mongo_to_dynamo_table(
+                mongo_uri=mongo_uri,
+                mongo_db=mongo_db,
+                mongo_collection=mongo_col,
+                dynamo_table=dynamo_table,
+                temp_dir="./tmp/mongo_export",
+                force=True,  # Skip individual confirmations
+                aws_endpoint=aws_endpoint,
+                workers=workers,
+                stream=stream,
+                export_command=export_command,
+                rate_limiter=rate_limiter,
+                progress=make_progress(mongo_col),
+                incremental=incremental,
+                watermark_field=watermark_field,
+                state_file=state_file
+            )
+        except Exception as e:
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {mongo_col}: {e}")
+            success = False
+        with status_lock:
+            status[mongo_col] = 'done' if success else 'failed'
+        print(f"{Fore.CYAN}[FINISHED]{Style.RESET_ALL} {mongo_col}: {written[mongo_col]} items in {time.time() - started:.1f}s ({status[mongo_col]})")
+        return success
+
+    def report_progress():
+        while not finished.wait(progress_interval):
+            with status_lock:
+                running = [f"{name}={written[name]}" for name, state in status.items() if state == 'running']
+                completed = sum(1 for state in status.values() if state in ('done', 'failed'))
+            print(f"{Fore.CYAN}[PROGRESS]{Style.RESET_ALL} {completed}/{len(collections)} collections finished; running: {', '.join(running) or '-'}")
+
+    reporter = threading.Thread(target=report_progress, daemon=True)
+    reporter.start()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(migrate, mongo_col, dynamo_table): mongo_col for mongo_col, dynamo_table in collections}
+            results = {futures[future]: future.result() for future in futures}
+    finally:
+        finished.set()
+        reporter.join()
+
+    success_count = sum(1 for success in results.values() if success)
+    failed_collections = [mongo_col for mongo_col, _ in collections if not results[mongo_col]]
     
     # Print summary
     print("\n" + "="*50)
     print(f"Migration Summary ({success_count}/{len(collections)} successful):")
+    for mongo_col, _ in collections:
+        print(f"  - {mongo_col}: {written[mongo_col]} items ({status[mongo_col]})")
     
     if failed_collections:
         print(f"{Fore.RED}[FAILED COLLECTIONS]{Style.RESET_ALL}")
@@ -204,7 +407,7 @@ def full_migration(mongo_uri, mongo_db, target_env="dev", force=False):
         print(f"{Fore.YELLOW}[PARTIAL SUCCESS]{Style.RESET_ALL} {success_count} of {len(collections)} collections migrated.")
         return False
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='MongoDB to DynamoDB migration utilities.')
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
     
@@ -216,6 +419,14 @@ def main():
     table_parser.add_argument('--dynamo-table', required=True, help='DynamoDB table name')
     table_parser.add_argument('--temp-dir', default='./tmp/mongo_export', help='Directory for temporary files')
     table_parser.add_argument('--force', action='store_true', help='Skip confirmation prompt')
+    table_parser.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional)')
+    table_parser.add_argument('--workers', type=int, help='Conversion processes (default: number of CPUs)')
+    table_parser.add_argument('--stream', action='store_true', help='Pipe mongoexport straight into DynamoDB without temp files')
+    table_parser.add_argument('--writers', type=int, default=4, help='Batch writer threads in stream mode (default: 4)')
+    table_parser.add_argument('--export-command', help='Command to run instead of mongoexport, e.g. a local JSONL stub ({db}, {collection} and {query} are substituted)')
+    table_parser.add_argument('--incremental', action='store_true', help='Only sync documents changed since the last run')
+    table_parser.add_argument('--watermark-field', default='_id', help='High-water mark field: _id (inserts only) or a date field like updated_at (default: _id)')
+    table_parser.add_argument('--state-file', default=DEFAULT_STATE_FILE, help=f'High-water mark state file (default: {DEFAULT_STATE_FILE})')
     
     # Full migration command
     full_parser = subparsers.add_parser('full', help='Perform full migration of all collections')
@@ -223,27 +434,56 @@ def main():
     full_parser.add_argument('--mongo-db', required=True, help='MongoDB database name')
     full_parser.add_argument('--env', choices=['dev', 'prod'], default='dev', help='Target environment (dev/prod)')
     full_parser.add_argument('--force', action='store_true', help='Skip confirmation prompts')
+    full_parser.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional)')
+    full_parser.add_argument('--concurrency', type=int, default=4, help='Collections migrated at the same time (default: 4)')
+    full_parser.add_argument('--max-write-rate', type=float, help='Global cap on items written per second across all collections')
+    full_parser.add_argument('--stream', action='store_true', help='Pipe mongoexport straight into DynamoDB without temp files')
+    full_parser.add_argument('--export-command', help='Command to run instead of mongoexport ({db}, {collection} and {query} are substituted)')
+    full_parser.add_argument('--incremental', action='store_true', help='Only sync documents changed since the last run')
+    full_parser.add_argument('--watermark-field', default='_id', help='High-water mark field: _id (inserts only) or a date field like updated_at (default: _id)')
+    full_parser.add_argument('--state-file', default=DEFAULT_STATE_FILE, help=f'High-water mark state file (default: {DEFAULT_STATE_FILE})')
+    for subparser in (table_parser, full_parser):
+        add_profile_arguments(subparser)
     
-    args = parser.parse_args()
-    
-    if args.command == 'table':
-        mongo_to_dynamo_table(
-            mongo_uri=args.mongo_uri,
-            mongo_db=args.mongo_db,
-            mongo_collection=args.mongo_collection,
-            dynamo_table=args.dynamo_table,
-            temp_dir=args.temp_dir,
-            force=args.force
-        )
-    elif args.command == 'full':
-        full_migration(
-            mongo_uri=args.mongo_uri,
-            mongo_db=args.mongo_db,
-            target_env=args.env,
-            force=args.force
-        )
-    else:
-        parser.print_help()
+    args = parser.parse_args(argv)
+
+    with profile_command('mongo_to_dynamo', args):
+        if args.command == 'table':
+            success = mongo_to_dynamo_table(
+                mongo_uri=args.mongo_uri,
+                mongo_db=args.mongo_db,
+                mongo_collection=args.mongo_collection,
+                dynamo_table=args.dynamo_table,
+                temp_dir=args.temp_dir,
+                force=args.force,
+                aws_endpoint=args.aws_endpoint,
+                workers=args.workers,
+                stream=args.stream,
+                writers=args.writers,
+                export_command=args.export_command,
+                incremental=args.incremental,
+                watermark_field=args.watermark_field,
+                state_file=args.state_file
+            )
+        elif args.command == 'full':
+            success = full_migration(
+                mongo_uri=args.mongo_uri,
+                mongo_db=args.mongo_db,
+                target_env=args.env,
+                force=args.force,
+                concurrency=args.concurrency,
+                max_write_rate=args.max_write_rate,
+                aws_endpoint=args.aws_endpoint,
+                stream=args.stream,
+                export_command=args.export_command,
+                incremental=args.incremental,
+                watermark_field=args.watermark_field,
+                state_file=args.state_file
+            )
+        else:
+            parser.print_help()
+            return 1
+        return 0 if success else 1
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
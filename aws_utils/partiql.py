@@ -0,0 +1,268 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from aws_utils.clients import get_client
+from aws_utils.compression import open_input
+from aws_utils.metrics import add_metrics_arguments, command_metrics
+from aws_utils.profiling import add_profile_arguments, profile_command, stage
+from aws_utils.serializer import deserialize_item, dump_json, serialize_value
+
+BATCH_STATEMENT_LIMIT = 25
+MAX_RETRIES = 8
+DEFAULT_WORKERS = 8
+DEFAULT_ERRORS_FILE = os.path.join('.', 'tmp', 'partiql', 'errors.jsonl')
+
+# Per-statement error codes worth retrying; anything else (ConditionalCheckFailed,
+# ValidationError, DuplicateItem, ...) is final and reported
+RETRYABLE_ERRORS = ('ProvisionedThroughputExceeded', 'ThrottlingError', 'RequestLimitExceeded',
+                    'InternalServerError', 'TransactionConflict')
+
+
+def is_read(statement):
+    """Whether a statement is a SELECT; a BatchExecuteStatement call must be all reads or all writes."""
+    return statement.lstrip().upper().startswith('SELECT')
+
+
+def load_statements(path):
+    """
+    Read PartiQL statements from a file, or from stdin when path is '-'.
+
+    Every line is one statement. A line may also be a JSON object
+    {"statement": "...", "parameters": [...]} for a statement with ? placeholders.
+    Blank lines and lines starting with '--' are skipped, a trailing ';' is dropped.
+
+    Args:
+        path (str): Path to the file, or '-' for stdin
+
+    Returns:
+        list: (statement, parameters) tuples, parameters being a list of plain values or None
+    """
+    file = sys.stdin if path == '-' else open_input(path)
+    statements = []
+    try:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('--'):
+                continue
+            if line.startswith('{'):
+                entry = json.loads(line, parse_float=Decimal)
+                statements.append((entry['statement'], entry.get('parameters')))
+            else:
+                statements.append((line.rstrip(';').rstrip(), None))
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    return statements
+
+
+def load_parameters(path):
+    """
+    Read parameter rows for a statement with ? placeholders.
+
+    JSON lines or a JSON array of arrays, where numbers, booleans, null, lists and
+    objects keep their types; or a .csv file (header row first), whose values are strings.
+
+    Args:
+        path (str): Path to the file, or '-' for stdin
+
+    Returns:
+        list: Parameter lists, one per statement execution
+
+    Raises:
+        ValueError: If the content is not valid JSON, or a row is not an array
+    """
+    if path != '-' and '.csv' in os.path.basename(path):
+        with open_input(path, newline='') as file:
+            rows = csv.reader(file)
+            next(rows, None)
+            return [row for row in rows if row]
+
+    if path == '-':
+        content = sys.stdin.read()
+    else:
+        with open_input(path) as file:
+            content = file.read()
+    # A whole-file array of arrays, however it is formatted; otherwise one array per line
+    try:
+        rows = json.loads(content, parse_float=Decimal)
+    except ValueError:
+        rows = None
+    if not (isinstance(rows, list) and all(isinstance(row, list) for row in rows)):
+        rows = [json.loads(line, parse_float=Decimal) for line in content.splitlines() if line.strip()]
+    for row_num, row in enumerate(rows, 1):
+        if not isinstance(row, list):
+            raise ValueError(f"Parameter row {row_num} is not a JSON array: {row!r}")
+    return rows
+
+
+def build_request(statement, parameters=None, consistent_read=False):
+    """Build one BatchStatementRequest, serializing plain parameter values."""
+    request = {'Statement': statement}
+    if parameters:
+        request['Parameters'] = [serialize_value(value) for value in parameters]
+    if consistent_read and is_read(statement):
+        request['ConsistentRead'] = True
+    return request
+
+
+def execute_batch(client, requests, max_retries=MAX_RETRIES):
+    """
+    Run up to 25 statements with BatchExecuteStatement, retrying throttled statements with backoff.
+
+    Args:
+        client: boto3 DynamoDB client
+        requests (list): BatchStatementRequest dicts, all reads or all writes
+        max_retries (int, optional): Retries for throttled or conflicting statements. Defaults to 8.
+
+    Returns:
+        list: One response per request, in order: {'Item': ...} for reads that found an
+        item, {} for writes, {'Error': {'Code': ..., 'Message': ...}} for failed statements
+    """
+    from botocore.exceptions import ClientError
+
+    results = [None] * len(requests)
+    pending = list(range(len(requests)))
+    for attempt in range(max_retries + 1):
+        try:
+            response = client.batch_execute_statement(Statements=[requests[i] for i in pending])
+        except ClientError as e:
+            # The whole call was rejected (e.g. a malformed statement), so every statement failed
+            error = {'Code': e.response['Error']['Code'], 'Message': e.response['Error']['Message']}
+            for i in pending:
+                results[i] = {'Error': error}
+            return results
+
+        retry = []
+        for i, result in zip(pending, response['Responses']):
+            if result.get('Error', {}).get('Code') in RETRYABLE_ERRORS and attempt < max_retries:
+                retry.append(i)
+            else:
+                results[i] = result
+        if not retry:
+            break
+        pending = retry
+        with stage('backoff'):
+            time.sleep(min(0.05 * 2 ** attempt, 5))
+    return results
+
+
+def execute_statements(requests, aws_endpoint=None, workers=DEFAULT_WORKERS, progress=None):
+    """
+    Run many PartiQL statements in groups of 25 across a thread pool.
+
+    Reads and writes are grouped separately, as BatchExecuteStatement requires. A
+    failing statement never fails its group: every statement gets its own result,
+    including errors such as ConditionalCheckFailed.
+
+    Args:
+        requests (list): BatchStatementRequest dicts, see build_request
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        workers (int, optional): Concurrent BatchExecuteStatement calls. Defaults to 8.
+        progress (callable, optional): Called with the number of statements run by each call. Defaults to None.
+
+    Returns:
+        list: One result per request, in order (see execute_batch)
+    """
+    # One pooled connection per worker thread
+    client = get_client('dynamodb', aws_endpoint, max_pool_connections=workers)
+
+    groups = []
+    for read in (True, False):
+        indexes = [i for i, request in enumerate(requests) if is_read(request['Statement']) == read]
+        groups.extend(indexes[start:start + BATCH_STATEMENT_LIMIT]
+                      for start in range(0, len(indexes), BATCH_STATEMENT_LIMIT))
+
+    results = [None] * len(requests)
+    lock = threading.Lock()
+
+    def run(group):
+        group_results = execute_batch(client, [requests[i] for i in group])
+        with lock:
+            for i, result in zip(group, group_results):
+                results[i] = result
+        if progress:
+            progress(len(group))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(run, group) for group in groups]:
+            future.result()
+    return results
+
+
+def write_errors(path, requests, results):
+    """Write the failed statements with their parameters and error as JSON lines; returns the count."""
+    failed = [(request, result['Error']) for request, result in zip(requests, results) if 'Error' in result]
+    if not failed:
+        return 0
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        for request, error in failed:
+            file.write(json.dumps({
+                'statement': request['Statement'],
+                'parameters': request.get('Parameters'),
+                'code': error.get('Code'),
+                'message': error.get('Message'),
+            }, default=str) + "\n")
+    return len(failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run PartiQL statements in bulk with BatchExecuteStatement.')
+    parser.add_argument('-f', '--file', type=str, help='File of statements, one per line (or JSON lines with statement/parameters); - for stdin.')
+    parser.add_argument('-s', '--statement', type=str, help='Statement with ? placeholders, run once per row of --parameters.')
+    parser.add_argument('-p', '--parameters', type=str, help='Parameter rows for --statement: JSON lines/array of arrays, or a CSV file; - for stdin.')
+    parser.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional).')
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS, help=f'Concurrent BatchExecuteStatement calls (default: {DEFAULT_WORKERS}).')
+    parser.add_argument('--consistent', action='store_true', help='Use strongly consistent reads for SELECT statements.')
+    parser.add_argument('-o', '--output', type=str, help='Write the items returned by SELECT statements as JSON lines to this file.')
+    parser.add_argument('--errors', type=str, default=DEFAULT_ERRORS_FILE, help=f'Write failed statements and their errors to this file (default: {DEFAULT_ERRORS_FILE}).')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if bool(args.file) == bool(args.statement):
+        parser.error("Pass either -f/--file or -s/--statement")
+    if args.statement and not args.parameters:
+        parser.error("-s/--statement needs -p/--parameters")
+
+    with profile_command('partiql', args):
+        if args.file:
+            statements = load_statements(args.file)
+        else:
+            try:
+                rows = load_parameters(args.parameters)
+            except ValueError as e:
+                parser.error(f"cannot read {args.parameters}: {e}")
+            statements = [(args.statement, row) for row in rows]
+        requests = [build_request(statement, parameters, args.consistent) for statement, parameters in statements]
+        print(f"Running {len(requests)} statements in batches of {BATCH_STATEMENT_LIMIT} with {args.workers} workers", file=sys.stderr)
+
+        with command_metrics('partiql', args, total=len(requests)) as metrics:
+            results = execute_statements(requests, args.aws_endpoint, args.workers, metrics.add)
+
+        errors = Counter(result['Error'].get('Code') for result in results if 'Error' in result)
+        if args.output:
+            with open(args.output, 'w') as file:
+                for result in results:
+                    if result.get('Item'):
+                        file.write(dump_json(deserialize_item(result['Item'])) + "\n")
+
+        print(f"Succeeded: {len(results) - sum(errors.values())}, failed: {sum(errors.values())}")
+        if errors:
+            for code, count in errors.most_common():
+                print(f"  {code}: {count}")
+            write_errors(args.errors, requests, results)
+            print(f"Failed statements written to {args.errors}")
+            return 1
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
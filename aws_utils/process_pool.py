@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+DEFAULT_PROCESSES = os.cpu_count() or 1
+
+# Set in each worker process by _init_worker
+_progress_queue = None
+# Items reported by the task running in this worker process
+_task_reported = 0
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def report_progress(count):
+    """Send a count of processed items from a worker process to the parent."""
+    global _task_reported
+    if _progress_queue is not None and count:
+        _task_reported += count
+        _progress_queue.put(count)
+
+
+def _run_task(function, args):
+    """
+    Run one task in a worker process.
+
+    Returns:
+        tuple: ((written, failed), error). When the task raises, error is its message and
+        written is what the task reported before it failed, so those items still count.
+    """
+    global _task_reported
+    _task_reported = 0
+    try:
+        return function(*args), None
+    except Exception as e:
+        return (_task_reported, 0), f"{type(e).__name__}: {e}"
+
+
+def split_segments(total_segments, processes):
+    """
+    Deal scan segments out to worker processes round-robin.
+
+    Args:
+        total_segments (int): Number of scan segments
+        processes (int): Number of worker processes
+
+    Returns:
+        list: One list of segment numbers per process (empty lists are dropped)
+    """
+    return [segments for segments in (list(range(i, total_segments, processes)) for i in range(processes)) if segments]
+
+
+def run_in_processes(function, tasks, processes=None, max_pending=None, progress_interval=10, label='items',
+                     progress=None):
+    """
+    Run CPU-heavy tasks in worker processes while the parent collects progress and errors.
+
+    Workers are started with the 'spawn' method, so each builds its own boto3 clients
+    instead of inheriting the parent's connections. Every task is a tuple of arguments
+    for `function`, which must be a module-level function returning (written, failed)
+    and may call report_progress. Tasks are consumed lazily and at most `max_pending`
+    are queued at once, so a generator over a huge input stays bounded in memory.
+
+    Args:
+        function (callable): Module-level worker function
+        tasks (iterable): Argument tuples, one per task
+        processes (int, optional): Number of worker processes. Defaults to the CPU count.
+        max_pending (int, optional): Tasks queued at once. Defaults to 2 per process.
+        progress_interval (float, optional): Seconds between progress reports. Defaults to 10.
+        label (str, optional): What the progress counts, for the report line. Defaults to 'items'.
+        progress (callable, optional): Called in the parent with the counts reported by the workers,
+            instead of printing the periodic report line. Defaults to None.
+
+    Returns:
+        dict: Totals of written and failed items, and the number of tasks that raised errors.
+        Items a task wrote before raising are included in the written total.
+    """
+    # Only the parent needs these, and only once a process pool is asked for
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    processes = processes or DEFAULT_PROCESSES
+    max_pending = max_pending or processes * 2
+    context = multiprocessing.get_context('spawn')
+    progress_queue = context.Queue()
+    totals = {'written': 0, 'failed': 0, 'errors': 0}
+    progressed = [0]
+    finished = threading.Event()
+    started = time.time()
+
+    def add_progress(count):
+        progressed[0] += count
+        if progress:
+            progress(count)
+
+    def collect_progress():
+        while not finished.is_set():
+            try:
+                add_progress(progress_queue.get(timeout=0.5))
+            except queue.Empty:
+                continue
+        # Counts sent just before the workers exited
+        while True:
+            try:
+                add_progress(progress_queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def report():
+        while not finished.wait(progress_interval):
+            elapsed = time.time() - started
+            print(f"Progress: {progressed[0]} {label} in {elapsed:.0f}s ({progressed[0] / elapsed:.0f}/s)")
+
+    def collect(future):
+        try:
+            (written, failed), error = future.result()
+        except Exception as e:
+            # The worker process itself died (BrokenProcessPool), or the task could not be pickled
+            print(f"Error in worker process: {e}")
+            totals['errors'] += 1
+            return
+        if error:
+            print(f"Error in worker process: {error} (after {written} {label})")
+            totals['errors'] += 1
+        totals['written'] += written
+        totals['failed'] += failed
+
+    threads = [threading.Thread(target=collect_progress, daemon=True)]
+    if progress is None:
+        threads.append(threading.Thread(target=report, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=_init_worker, initargs=(progress_queue,)) as executor:
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(_run_task, function, task))
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        collect(future)
+            for future in pending:
+                collect(future)
+    finally:
+        finished.set()
+        for thread in threads:
+            thread.join()
+
+    return totals
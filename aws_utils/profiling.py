@@ -0,0 +1,270 @@
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from aws_utils.clients import LatencyHook
+
+# Report order of the stages timed by the tools; any other stage name is listed after these
+STAGES = ('scan', 'read', 'deserialize', 'transform', 'serialize', 'write', 'backoff', 'throttle', 'sleep', 'request')
+
+# DynamoDB operations by stage; keys are lowercase without underscores, so both the
+# botocore names ('BatchWriteItem') and the client method names ('batch_write_item') match
+OPERATION_STAGES = {
+    'scan': 'scan',
+    'query': 'scan',
+    'getitem': 'read',
+    'batchgetitem': 'read',
+    'transactgetitems': 'read',
+    'putitem': 'write',
+    'updateitem': 'write',
+    'deleteitem': 'write',
+    'batchwriteitem': 'write',
+    'transactwriteitems': 'write',
+    'executestatement': 'write',
+    'batchexecutestatement': 'write',
+}
+
+PROFILE_MODES = ('stages', 'cprofile', 'sample')
+SAMPLE_INTERVAL = 0.005
+
+# The Profiler of the running command, if --profile was given
+_active = None
+
+
+def operation_stage(operation):
+    """Stage of a DynamoDB operation, e.g. 'write' for 'BatchWriteItem' or 'batch_write_item'."""
+    return OPERATION_STAGES.get(operation.replace('_', '').lower(), 'request')
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.profiler.add(self.name, time.perf_counter() - self.started)
+
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+def stage(name):
+    """
+    Time a block as part of a stage of the running command, e.g. `with stage('backoff'):`.
+
+    When profiling is off this returns a shared no-op context manager, so hot paths
+    can be instrumented unconditionally.
+    """
+    if _active is None:
+        return _NO_STAGE
+    return _Stage(_active, name)
+
+
+def timed(name, function):
+    """
+    Wrap a function so every call is timed as a stage, or return it unchanged when profiling is off.
+
+    Meant for per-item functions such as serialize_item: look the wrapper up once,
+    outside the loop, so there is no cost at all without --profile.
+    """
+    profiler = _active
+    if profiler is None:
+        return function
+
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.add(name, time.perf_counter() - started)
+
+    return wrapper
+
+
+class StackSampler:
+    """
+    Sampling profiler: a background thread records the stacks of all other threads.
+
+    Unlike cProfile it sees every thread (scan segments, batch writers), and its
+    overhead depends on the interval rather than on the number of calls. Stacks are
+    written in the collapsed format ("outer;inner count" per line) read by
+    flamegraph.pl, speedscope and inferno.
+
+    Args:
+        interval (float, optional): Seconds between samples. Defaults to 0.005.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        name = getattr(code, 'co_qualname', code.co_name)
+        return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_label(frame))
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        """Write the collapsed stacks, one "frame;frame;frame count" line per distinct stack."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Per-stage timings of one command run, optionally with a cProfile dump or a flamegraph.
+
+    Stages (scan, read, write, serialize, transform, backoff, throttle, sleep, ...) are
+    timed where the tools do the work; DynamoDB requests are timed from botocore events
+    on the shared clients and include parsing the response. Times are summed over all
+    threads, so with parallel scans or writers a stage can exceed the wall-clock time.
+
+    Args:
+        command (str): Command name, used in the report and the default output path
+        mode (str, optional): 'stages', 'cprofile' (main thread, .prof file for pstats/snakeviz)
+            or 'sample' (all threads, collapsed stacks for flamegraphs). Defaults to 'stages'.
+        output (str, optional): Path of the cProfile or flamegraph file. Defaults to
+            ./tmp/profile/<command>-<timestamp>.prof or .folded.
+    """
+
+    def __init__(self, command, mode='stages', output=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'. Use one of: {', '.join(PROFILE_MODES)}")
+        self.command = command
+        self.mode = mode
+        self.output = output
+        self.totals = {}
+        self.counts = Counter()
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._cprofile = None
+        self._sampler = None
+        self._latency_hook = LatencyHook(lambda operation, seconds: self.add(operation_stage(operation), seconds))
+
+    def add(self, name, seconds, count=1):
+        """Add time spent in a stage."""
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            self.counts[name] += count
+
+    def _default_output(self):
+        extension = 'prof' if self.mode == 'cprofile' else 'folded'
+        return os.path.join('.', 'tmp', 'profile', f"{self.command}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+    def start(self):
+        """Start timing, and make this the profiler that stage() and timed() report to."""
+        global _active
+        _active = self
+        self._latency_hook.register()
+        if self.mode == 'cprofile':
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.mode == 'sample':
+            self._sampler = StackSampler().start()
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self):
+        """Stop timing and write the cProfile or flamegraph file, if any."""
+        global _active
+        self.finished = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self._latency_hook.unregister()
+        if _active is self:
+            _active = None
+
+        if self._cprofile is not None or self._sampler is not None:
+            self.output = self.output or self._default_output()
+            os.makedirs(os.path.dirname(self.output) or '.', exist_ok=True)
+            if self._cprofile is not None:
+                self._cprofile.dump_stats(self.output)
+            else:
+                self._sampler.write(self.output)
+
+    def report(self, stream=None):
+        """Print the stage timings as a table, in pipeline order (scan, ..., write, backoff)."""
+        stream = stream or sys.stderr
+        wall = (self.finished or time.perf_counter()) - self.started
+        with self._lock:
+            totals = dict(self.totals)
+            counts = Counter(self.counts)
+        names = [name for name in STAGES if name in totals] + sorted(set(totals) - set(STAGES))
+
+        stream.write(f"\nProfile of {self.command} ({wall:.2f}s wall clock, stage times summed over threads)\n")
+        stream.write(f"{'stage':<12} {'calls':>10} {'seconds':>10} {'ms/call':>9} {'% wall':>7}\n")
+        for name in names:
+            seconds = totals[name]
+            stream.write(f"{name:<12} {counts[name]:>10} {seconds:>10.3f} {seconds / counts[name] * 1000:>9.3f} "
+                         f"{seconds / wall:>7.1%}\n")
+        if self.mode == 'cprofile':
+            stream.write(f"cProfile stats of the main thread written to {self.output} (python -m pstats, snakeviz)\n")
+        elif self.mode == 'sample':
+            stream.write(f"Sampled stacks written to {self.output} (flamegraph.pl, speedscope or inferno)\n")
+        stream.flush()
+
+
+def add_profile_arguments(parser):
+    """Add the shared --profile/--profile-output options to a command's parser."""
+    parser.add_argument('--profile', nargs='?', const='stages', choices=PROFILE_MODES,
+                        help="Print per-stage timings; 'cprofile' also dumps cProfile stats, 'sample' a flamegraph of all threads")
+    parser.add_argument('--profile-output', type=str, help='Path of the cProfile/flamegraph file (default: ./tmp/profile/<command>-<time>)')
+
+
+@contextlib.contextmanager
+def profile_command(command, args):
+    """
+    Profile the body of a command's main() when --profile was given; a no-op otherwise.
+
+    Args:
+        command (str): Command name
+        args (argparse.Namespace): Parsed arguments with profile and profile_output
+    """
+    # Commands with subparsers only have --profile once a subcommand was given
+    mode = getattr(args, 'profile', None)
+    if not mode:
+        yield None
+        return
+    profiler = Profiler(command, mode, args.profile_output).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.report()
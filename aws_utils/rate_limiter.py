@@ -0,0 +1,39 @@
+import threading
+import time
+
+from aws_utils.profiling import stage
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every writer that must stay under one global rate.
+
+    Args:
+        rate (float): Maximum sustained operations per second
+        burst (float, optional): Bucket size. Defaults to one second worth of operations.
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Block until `amount` operations may proceed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                # Requests larger than the bucket go through once it is full, leaving a debt
+                needed = min(amount, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return
+                wait = (needed - self._tokens) / self.rate
+            with stage('throttle'):
+                time.sleep(wait)
@@ -0,0 +1,64 @@
+import argparse
+import sys
+
+from aws_utils.batch_write import put_items
+from aws_utils.clients import get_client
+from aws_utils.metrics import add_metrics_arguments, command_metrics, table_item_count
+from aws_utils.profiling import add_profile_arguments, profile_command
+
+def remove_column_from_dynamodb(table_name, column_to_remove, aws_endpoint=None, progress=None):
+    client = get_client('dynamodb', aws_endpoint)
+
+    # Scan the table page by page in the low-level format, so items are written back
+    # with BatchWriteItem without being deserialized and serialized again
+    scan_params = {'TableName': table_name}
+    scanned = 0
+    updated = 0
+    failed = 0
+    while True:
+        response = client.scan(**scan_params)
+        items = response.get('Items', [])
+        scanned += len(items)
+
+        changed = []
+        for item in items:
+            if column_to_remove in item:
+                del item[column_to_remove]
+                changed.append(item)
+
+        written, lost = put_items(table_name, changed, aws_endpoint, serialized=True)
+        updated += written
+        failed += lost
+        if lost:
+            print(f"Error updating {lost} items")
+        if progress:
+            progress(len(items))
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    print(f"Found {scanned} items in the table, removed '{column_to_remove}' from {updated}.")
+    if failed:
+        print(f"Failed to remove '{column_to_remove}' from {failed} items.")
+    return updated, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove a column from all items in a DynamoDB table")
+    parser.add_argument("-t", "--table", type=str, help="Name of the DynamoDB table", required=True)
+    parser.add_argument("-c", "--column", type=str, help="Name of the column to remove", required=True)
+    parser.add_argument("-e", "--aws_endpoint", type=str, help="AWS endpoint URL (optional)")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('remove_column', args):
+        with command_metrics('remove_column', args, table_item_count(args.table, args.aws_endpoint)) as metrics:
+            _, failed = remove_column_from_dynamodb(args.table, args.column, args.aws_endpoint, metrics.add)
+        if failed:
+            return 1
+        print("Column removal complete!")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+
+from aws_utils.clients import DEFAULT_MAX_IN_FLIGHT, get_resource
+from aws_utils.metrics import add_metrics_arguments, command_metrics
+from aws_utils.profiling import add_profile_arguments, profile_command, stage
+from aws_utils.table_metadata import extract_key, get_table_metadata
+
+def rename_column(
+    table_name: str,
+    old_column_name: str,
+    new_column_name: str,
+    region: str = "us-east-1",
+    aws_endpoint: str = None,
+    progress=None
+) -> dict:
+    """
+    Rename a column in a DynamoDB table by copying the value to a new column name
+    and then removing the old column.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        old_column_name (str): Name of the column to rename
+        new_column_name (str): New name for the column
+        region (str): AWS region name
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        progress (callable, optional): Called with 1 for every updated item. Defaults to None.
+
+    Returns:
+        dict: Counts of updated and failed items
+    """
+    stats = {'updated': 0, 'failed': 0}
+    dynamodb = get_resource('dynamodb', aws_endpoint, region)
+    table = dynamodb.Table(table_name)
+
+    # Get the table's key schema (hash and range key) from the metadata cache
+    metadata = get_table_metadata(table_name, aws_endpoint, region=region)
+    key_attributes = metadata['key_attributes']
+
+    # Scan the table to get all items
+    response = table.scan()
+    items = response.get('Items', [])
+
+    # Continue scanning if we have more items
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
+        items.extend(response.get('Items', []))
+
+    print(f"Found {len(items)} items to process")
+    print(f"Using key attributes: {key_attributes}")
+
+    # Update each item
+    for item in items:
+        if old_column_name in item:
+            # Create update expression to set new column and remove old one
+            update_expression = "SET #new_column = :old_value REMOVE #old_column"
+            
+            # Create expression attribute names and values
+            expression_attribute_names = {
+                "#new_column": new_column_name,
+                "#old_column": old_column_name
+            }
+            expression_attribute_values = {
+                ":old_value": item[old_column_name]
+            }
+
+            # Create the key dictionary using only the primary key attributes
+            key_dict = extract_key(item, metadata)
+
+            try:
+                table.update_item(
+                    Key=key_dict,
+                    UpdateExpression=update_expression,
+                    ExpressionAttributeNames=expression_attribute_names,
+                    ExpressionAttributeValues=expression_attribute_values
+                )
+                stats['updated'] += 1
+                if progress:
+                    progress(1)
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"Error updating item: {e}")
+                print(f"Item that caused error: {item}")
+            
+            # Add a small delay to avoid throttling
+            with stage('sleep'):
+                time.sleep(0.1)
+
+    return stats
+
+async def rename_column_async(
+    table_name: str,
+    old_column_name: str,
+    new_column_name: str,
+    region: str = "us-east-1",
+    aws_endpoint: str = None,
+    total_segments: int = 16,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    progress=None
+) -> dict:
+    """
+    Rename a column on the asyncio engine. A parallel scan filtered to items that have
+    the old column feeds concurrent UpdateItem calls, without the per-item delay.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        old_column_name (str): Name of the column to rename
+        new_column_name (str): New name for the column
+        region (str): AWS region name
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int): Number of parallel scan segments. Defaults to 16.
+        max_in_flight (int): Maximum concurrent requests. Defaults to 256.
+        progress (callable, optional): Called with the number of items updated by each page. Defaults to None.
+
+    Returns:
+        dict: Counts of updated, condition_failed and failed items
+    """
+    from aws_utils.async_engine import AsyncEngine
+
+    metadata = get_table_metadata(table_name, aws_endpoint, region=region)
+    stats = {'updated': 0, 'condition_failed': 0, 'failed': 0}
+
+    async with AsyncEngine(aws_endpoint, region, max_in_flight) as engine:
+        async def rename_page(items):
+            updates = ({
+                'TableName': table_name,
+                'Key': extract_key(item, metadata),
+                'UpdateExpression': "SET #new_column = :old_value REMOVE #old_column",
+                # Skip items whose old column disappeared since the scan
+                'ConditionExpression': "attribute_exists(#old_column)",
+                'ExpressionAttributeNames': {"#new_column": new_column_name, "#old_column": old_column_name},
+                'ExpressionAttributeValues': {":old_value": item[old_column_name]},
+            } for item in items)
+            page_stats = await engine.update_items(updates)
+            for name, count in page_stats.items():
+                stats[name] += count
+            if progress:
+                progress(page_stats['updated'])
+
+        await engine.scan(
+            table_name,
+            rename_page,
+            total_segments,
+            FilterExpression="attribute_exists(#old_column)",
+            ExpressionAttributeNames={"#old_column": old_column_name}
+        )
+
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rename a column in a DynamoDB table')
+    parser.add_argument('--table-name', required=True, help='Name of the DynamoDB table')
+    parser.add_argument('--old-column-name', required=True, help='Name of the column to rename')
+    parser.add_argument('--new-column-name', required=True, help='New name for the column')
+    parser.add_argument('--region', default='us-east-1', help='AWS region name (default: us-east-1)')
+    parser.add_argument('-e', '--aws_endpoint', help='AWS endpoint URL (optional)')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Rename on the asyncio engine (requires aiobotocore)')
+    parser.add_argument('--segments', type=int, default=16, help='Parallel scan segments in async mode (default: 16)')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT, help=f'Maximum concurrent requests in async mode (default: {DEFAULT_MAX_IN_FLIGHT})')
+    add_metrics_arguments(parser)
+
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('rename_column', args):
+        # Only items that have the old column are counted, so there is no meaningful total
+        with command_metrics('rename_column', args) as metrics:
+            if args.use_async:
+                import asyncio
+                stats = asyncio.run(rename_column_async(
+                    table_name=args.table_name,
+                    old_column_name=args.old_column_name,
+                    new_column_name=args.new_column_name,
+                    region=args.region,
+                    aws_endpoint=args.aws_endpoint,
+                    total_segments=args.segments,
+                    max_in_flight=args.max_in_flight,
+                    progress=metrics.add
+                ))
+            else:
+                stats = rename_column(
+                    table_name=args.table_name,
+                    old_column_name=args.old_column_name,
+                    new_column_name=args.new_column_name,
+                    region=args.region,
+                    aws_endpoint=args.aws_endpoint,
+                    progress=metrics.add
+                )
+        print(f"Renamed column in {stats['updated']} items ({stats['failed']} failed)")
+        return 1 if stats['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
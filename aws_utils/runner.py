@@ -0,0 +1,201 @@
+import argparse
+import importlib
+import shlex
+import sys
+import time
+
+# Runnable commands: console-script name without the 'aws-' prefix -> module with main(argv)
+COMMANDS = {
+    'scan-table': 'aws_utils.scan_table',
+    'wipe-table': 'aws_utils.wipe_table',
+    'crud-table': 'aws_utils.crud_table',
+    'remove-column': 'aws_utils.remove_dynamo_columnn',
+    'migrate-table': 'aws_utils.migrate_table_data',
+    'import-csv': 'aws_utils.import_csv',
+    'import-json': 'aws_utils.import_json',
+    'update-item': 'aws_utils.update_item_key_value',
+    'rename-column': 'aws_utils.rename_column',
+    'export-csv': 'aws_utils.export_to_csv',
+    'mongo-to-dynamo': 'aws_utils.mongo_to_dynamo',
+    'migrate-schema': 'aws_utils.migrate_schema',
+    'partiql': 'aws_utils.partiql',
+}
+
+ALIASES = {
+    'scan': 'scan-table',
+    'wipe': 'wipe-table',
+    'crud': 'crud-table',
+    'migrate': 'migrate-table',
+    'update': 'update-item',
+    'rename': 'rename-column',
+}
+
+PROMPT = 'aws-utils> '
+
+
+def resolve_command(name):
+    """
+    Find the command for a name as written in a script.
+
+    Accepts the console-script name ('aws-scan-table'), the name without the prefix
+    ('scan-table') or a short alias ('scan').
+
+    Returns:
+        str or None: Canonical command name, None if unknown
+    """
+    if name.startswith('aws-'):
+        name = name[len('aws-'):]
+    name = ALIASES.get(name, name)
+    return name if name in COMMANDS else None
+
+
+def run_command(command, argv):
+    """
+    Run one command's main() in this process.
+
+    SystemExit (argparse errors, -h, sys.exit in a command) and exceptions are caught,
+    so one failing step never ends the process. Every main() returns its exit status
+    (0 on success); a main that returns True or False is mapped to 0 or 1.
+
+    Args:
+        command (str): Canonical command name
+        argv (list): Arguments after the command name
+
+    Returns:
+        int: Exit status, 0 on success
+    """
+    main = importlib.import_module(COMMANDS[command]).main
+    program = sys.argv[0]
+    # Usage and error messages name the command, as if it had been started on its own
+    sys.argv[0] = f"aws-{command}"
+    try:
+        result = main(argv)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except EOFError:
+        print(f"aws-{command}: needs confirmation, but the script has no terminal to ask on (pass --force)",
+              file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        raise
+    except Exception as e:
+        print(f"aws-{command}: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        sys.argv[0] = program
+    if isinstance(result, bool):
+        return 0 if result else 1
+    return result if isinstance(result, int) else 0
+
+
+def run_script(lines, keep_going=False, echo=True):
+    """
+    Run a runbook of commands, one per line, in this process.
+
+    Lines are split like a shell would (quotes, escapes); blank lines and lines
+    starting with '#' are skipped. All commands share the process-wide boto3
+    sessions, pooled clients and table metadata cache, so only the first command
+    pays for imports, credential resolution and TLS handshakes.
+
+    Args:
+        lines (iterable): Script lines
+        keep_going (bool, optional): Run the remaining commands after a failure. Defaults to False.
+        echo (bool, optional): Print every command before running it. Defaults to True.
+
+    Returns:
+        dict: Counts of commands run and failed
+    """
+    stats = {'run': 0, 'failed': 0}
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            name, *argv = shlex.split(line)
+        except ValueError as e:
+            print(f"Line {line_num}: cannot parse '{line}': {e}", file=sys.stderr)
+            stats['failed'] += 1
+            if not keep_going:
+                break
+            continue
+
+        if name in ('exit', 'quit'):
+            break
+        command = resolve_command(name)
+        if command is None:
+            print(f"Line {line_num}: unknown command '{name}'. Available: {', '.join(sorted(COMMANDS))}", file=sys.stderr)
+            stats['failed'] += 1
+            if not keep_going:
+                break
+            continue
+
+        if echo:
+            print(f"==> {line}")
+        started = time.perf_counter()
+        status = run_command(command, argv)
+        stats['run'] += 1
+        elapsed = time.perf_counter() - started
+        if status:
+            stats['failed'] += 1
+            print(f"<== aws-{command} failed with status {status} after {elapsed:.2f}s", file=sys.stderr)
+            if not keep_going:
+                break
+        elif echo:
+            print(f"<== done in {elapsed:.2f}s")
+    return stats
+
+
+def _interactive_lines():
+    while True:
+        try:
+            yield input(PROMPT)
+        except EOFError:
+            print()
+            return
+
+
+def run(script=None, keep_going=False, echo=True):
+    """
+    Run a script file, piped commands on stdin, or an interactive prompt when stdin is a terminal.
+
+    Piped scripts are read completely before the first command runs, so a command
+    that asks for confirmation cannot swallow the following lines.
+
+    Returns:
+        int: Exit status, 1 if any command failed
+    """
+    started = time.perf_counter()
+    if script and script != '-':
+        with open(script, 'r') as file:
+            lines = file.readlines()
+    elif sys.stdin.isatty():
+        lines = _interactive_lines()
+        # A failed command should not end an interactive session
+        keep_going = True
+    else:
+        lines = sys.stdin.readlines()
+
+    stats = run_script(lines, keep_going, echo)
+    print(f"Ran {stats['run']} commands in {time.perf_counter() - started:.2f}s ({stats['failed']} failed)")
+    return 1 if stats['failed'] else 0
+
+
+def add_run_arguments(parser):
+    """Add the `run` options to a parser (used by `aws-utils run`)."""
+    parser.add_argument('script', nargs='?', help='File with one command per line (default: stdin, or a prompt on a terminal)')
+    parser.add_argument('-k', '--keep-going', action='store_true', help='Run the remaining commands after a failure')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not echo the commands as they run')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run many aws-utils commands in one process with warm clients.')
+    add_run_arguments(parser)
+    args = parser.parse_args(argv)
+    return run(args.script, args.keep_going, not args.quiet)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
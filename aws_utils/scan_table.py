@@ -1,19 +1,23 @@
 import argparse
 import json
+import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pprint import pprint
 
-import boto3
+from aws_utils.clients import DEFAULT_MAX_IN_FLIGHT, get_client
+from aws_utils.profiling import add_profile_arguments, profile_command
 
 
+def filter_last_days(items, last_days):
+    """Keep items whose 'created_at' ISO 8601 string is within the last `last_days` days."""
+    cutoff_datetime = datetime.now() - timedelta(days=last_days)
+    cutoff_str = cutoff_datetime.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return [item for item in items if item.get('created_at', {}).get('S', '') > cutoff_str]
+
 def scan_table(table_name, aws_endpoint=None, max_items=10000, last_days=None):
-    if aws_endpoint:
-        dynamodb = boto3.resource('dynamodb', endpoint_url=aws_endpoint)
-        client = boto3.client('dynamodb', endpoint_url=aws_endpoint)
-    else:
-        dynamodb = boto3.resource('dynamodb')
-        client = boto3.client('dynamodb')
+    client = get_client('dynamodb', aws_endpoint)
 
     fetched_items = []
     last_evaluated_key = None
@@ -42,14 +46,135 @@ def scan_table(table_name, aws_endpoint=None, max_items=10000, last_days=None):
             break
 
     if last_days is not None:
-        cutoff_datetime = datetime.now() - timedelta(days=last_days)
-        cutoff_str = cutoff_datetime.strftime('%Y-%m-%dT%H:%M:%SZ')
-        fetched_items = [item for item in fetched_items if item.get('created_at', {}).get('S', '') > cutoff_str]
+        fetched_items = filter_last_days(fetched_items, last_days)
     
     return {
         "Items": fetched_items
     }
 
+def scan_segment(client, table_name, segment, total_segments, page_handler, **scan_kwargs):
+    """
+    Scan one segment of a parallel scan, passing every page to page_handler.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the DynamoDB table
+        segment (int): Segment number to scan (0-based)
+        total_segments (int): Total number of segments in the parallel scan
+        page_handler (callable): Called with the list of items of each page
+        **scan_kwargs: Extra parameters passed to client.scan (e.g. ProjectionExpression)
+
+    Returns:
+        int: Number of items scanned in this segment
+    """
+    scan_params = dict(scan_kwargs, TableName=table_name)
+    if total_segments > 1:
+        scan_params['Segment'] = segment
+        scan_params['TotalSegments'] = total_segments
+
+    scanned = 0
+    while True:
+        response = client.scan(**scan_params)
+        items = response.get('Items', [])
+        if items:
+            page_handler(items)
+        scanned += len(items)
+
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if not last_evaluated_key:
+            break
+        scan_params['ExclusiveStartKey'] = last_evaluated_key
+
+    return scanned
+
+def parallel_scan(table_name, page_handler, aws_endpoint=None, total_segments=4, **scan_kwargs):
+    """
+    Scan a whole table with one thread per segment.
+
+    page_handler is called from the segment threads, so it must be thread-safe.
+    Items are returned in the low-level client format ({'S': ...}, {'N': ...}).
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        page_handler (callable): Called with the list of items of each page
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 4.
+        **scan_kwargs: Extra parameters passed to client.scan (e.g. ProjectionExpression)
+
+    Returns:
+        int: Total number of items scanned
+    """
+    # boto3 clients are thread-safe, so a single pooled client is shared by all segments
+    client = get_client('dynamodb', aws_endpoint, max_pool_connections=total_segments)
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        futures = [
+            executor.submit(scan_segment, client, table_name, segment, total_segments, page_handler, **scan_kwargs)
+            for segment in range(total_segments)
+        ]
+        return sum(future.result() for future in futures)
+
+def count_items(table_name, aws_endpoint=None, total_segments=4, consistent_read=False):
+    """
+    Count the items of a table exactly, with a paginated parallel Select='COUNT' scan.
+
+    A single scan call only counts the first 1 MB page, and DescribeTable's ItemCount
+    is refreshed every few hours, so neither is reliable after bulk writes or deletes.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 4.
+        consistent_read (bool, optional): Use strongly consistent reads. Defaults to False.
+
+    Returns:
+        int: Number of items in the table
+    """
+    client = get_client('dynamodb', aws_endpoint, max_pool_connections=total_segments)
+
+    def count_segment(segment):
+        scan_params = {'TableName': table_name, 'Select': 'COUNT', 'ConsistentRead': consistent_read}
+        if total_segments > 1:
+            scan_params['Segment'] = segment
+            scan_params['TotalSegments'] = total_segments
+        count = 0
+        while True:
+            response = client.scan(**scan_params)
+            count += response['Count']
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                return count
+            scan_params['ExclusiveStartKey'] = last_evaluated_key
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        return sum(executor.map(count_segment, range(total_segments)))
+
+async def scan_table_async(table_name, aws_endpoint=None, last_days=None, total_segments=16,
+                           max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+    """
+    Scan a whole table on the asyncio engine, with one coroutine per scan segment.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        last_days (int, optional): Only keep items created in the last X days. Defaults to None.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 16.
+        max_in_flight (int, optional): Maximum concurrent requests. Defaults to 256.
+
+    Returns:
+        dict: {"Items": [...]} in the low-level client format, like scan_table
+    """
+    from aws_utils.async_engine import AsyncEngine
+
+    fetched_items = []
+
+    async with AsyncEngine(aws_endpoint, max_in_flight=max_in_flight) as engine:
+        await engine.scan(table_name, fetched_items.extend, total_segments)
+
+    if last_days is not None:
+        fetched_items = filter_last_days(fetched_items, last_days)
+    return {"Items": fetched_items}
+
 def cluster_and_count(items, cluster_field):
     """Cluster items by a specified field and count the occurrences."""
     cluster_counts = defaultdict(int)
@@ -61,27 +186,53 @@ def cluster_and_count(items, cluster_field):
     
     return cluster_counts
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Scan DynamoDB table entries.')
     parser.add_argument('-t', '--table_name', type=str, help='Name of the table to scan.', required=True)
     parser.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional).')
     parser.add_argument('-m', '--max_items', type=int, help='Maximum number of items to fetch. If not specified, fetches all items.')
     parser.add_argument('-c', '--cluster_by', type=str, help='Cluster by this field and count items by cluster.')
     parser.add_argument('-d', '--last_days', type=int, help='Filter items from the last X days. Assumes a "created_at" field in ISO 8601 format.')
-    args = parser.parse_args()
-    
-    result = scan_table(args.table_name, args.aws_endpoint, args.max_items, args.last_days)
-    print("Number of items fetched: {}".format(len(result['Items'])))
-    
-    if len(result['Items']) > 0 and not args.cluster_by:
-        print("First item:")
-        pprint(json.dumps(result['Items'][0], indent=4))
-    
-    if args.cluster_by:
-        clusters = cluster_and_count(result['Items'], args.cluster_by)
-        print("\nCounts by cluster ({}):".format(args.cluster_by))
-        for key, count in clusters.items():
-            print("{}: {}".format(key, count))
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Run a parallel scan on the asyncio engine (requires aiobotocore).')
+    parser.add_argument('--segments', type=int, default=16, help='Parallel scan segments in async mode (default: 16).')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT, help=f'Maximum concurrent requests in async mode (default: {DEFAULT_MAX_IN_FLIGHT}).')
+    parser.add_argument('--snapshot', action='store_true', help='Read from a local SQLite snapshot of the table, refreshed when older than --snapshot-ttl.')
+    parser.add_argument('--snapshot-ttl', type=float, default=3600, help='Seconds a snapshot is used without refreshing (default: 3600).')
+    parser.add_argument('--refresh-snapshot', action='store_true', help='Rescan the whole table into the snapshot (also picks up deleted items).')
+    parser.add_argument('--watermark-field', default='updated_at', help='Attribute for incremental snapshot refreshes, "" to always rescan fully (default: updated_at).')
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('scan_table', args):
+        if args.snapshot or args.refresh_snapshot:
+            if args.use_async:
+                parser.error("--snapshot cannot be combined with --async")
+            from aws_utils.snapshot_cache import cached_scan
+            result = cached_scan(args.table_name, args.aws_endpoint, args.snapshot_ttl, args.refresh_snapshot,
+                                 args.watermark_field or None)
+            if args.last_days is not None:
+                result['Items'] = filter_last_days(result['Items'], args.last_days)
+            if args.max_items:
+                result['Items'] = result['Items'][:args.max_items]
+        elif args.use_async:
+            if args.max_items:
+                parser.error("--max_items is not supported with --async, which always scans the whole table")
+            import asyncio
+            result = asyncio.run(scan_table_async(args.table_name, args.aws_endpoint, args.last_days, args.segments, args.max_in_flight))
+        else:
+            result = scan_table(args.table_name, args.aws_endpoint, args.max_items, args.last_days)
+        print("Number of items fetched: {}".format(len(result['Items'])))
+
+        if len(result['Items']) > 0 and not args.cluster_by:
+            print("First item:")
+            pprint(json.dumps(result['Items'][0], indent=4))
+
+        if args.cluster_by:
+            clusters = cluster_and_count(result['Items'], args.cluster_by)
+            print("\nCounts by cluster ({}):".format(args.cluster_by))
+            for key, count in clusters.items():
+                print("{}: {}".format(key, count))
+        return 0
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,126 @@
+import base64
+import json
+import math
+from decimal import Decimal
+from functools import lru_cache
+
+
+# boto3 is only imported for the types the fast paths do not handle, so importing
+# this module does not pull in boto3 and botocore
+@lru_cache(maxsize=None)
+def get_type_serializer():
+    """Shared boto3 TypeSerializer, created on first use."""
+    from boto3.dynamodb.types import TypeSerializer
+    return TypeSerializer()
+
+
+@lru_cache(maxsize=None)
+def get_type_deserializer():
+    """Shared boto3 TypeDeserializer, created on first use."""
+    from boto3.dynamodb.types import TypeDeserializer
+    return TypeDeserializer()
+
+
+def serialize_value(value):
+    """
+    Convert a plain Python value to a low-level DynamoDB attribute value.
+
+    str, bool, int, float, Decimal, None, dict and list/tuple are handled directly,
+    which is several times faster than TypeSerializer (no Decimal context round trip
+    per number). Anything else, such as sets or bytes, goes through TypeSerializer.
+
+    Args:
+        value: Value to serialize
+
+    Returns:
+        dict: Attribute value, e.g. {'S': 'abc'}
+
+    Raises:
+        TypeError: If a float or Decimal is NaN or infinite
+    """
+    value_type = type(value)
+    if value_type is str:
+        return {'S': value}
+    if value_type is bool:
+        return {'BOOL': value}
+    if value_type is int:
+        return {'N': str(value)}
+    if value_type is float:
+        if math.isnan(value) or math.isinf(value):
+            raise TypeError(f"Infinity and NaN not supported: {value}")
+        number = repr(value)
+        # Normalize exponent notation the way Decimal renders it (1e+20 -> 1E+20)
+        return {'N': str(Decimal(number)) if 'e' in number else number}
+    if value is None:
+        return {'NULL': True}
+    if value_type is dict:
+        return {'M': {k: serialize_value(v) for k, v in value.items()}}
+    if value_type is list or value_type is tuple:
+        return {'L': [serialize_value(v) for v in value]}
+    if value_type is Decimal:
+        if not value.is_finite():
+            raise TypeError(f"Infinity and NaN not supported: {value}")
+        return {'N': str(value)}
+    return get_type_serializer().serialize(value)
+
+
+def serialize_item(item):
+    """Serialize a plain item dict to the low-level format used by the DynamoDB client."""
+    return {k: serialize_value(v) for k, v in item.items()}
+
+
+def deserialize_value(value):
+    """
+    Convert a low-level attribute value back to Python, as TypeDeserializer does.
+
+    Numbers become Decimal, matching boto3. Sets and binary values go through TypeDeserializer.
+
+    Args:
+        value (dict): Attribute value, e.g. {'N': '42'}
+
+    Returns:
+        The Python value
+    """
+    (value_type, raw), = value.items()
+    if value_type == 'S':
+        return raw
+    if value_type == 'N':
+        return Decimal(raw)
+    if value_type == 'BOOL':
+        return raw
+    if value_type == 'NULL':
+        return None
+    if value_type == 'M':
+        return {k: deserialize_value(v) for k, v in raw.items()}
+    if value_type == 'L':
+        return [deserialize_value(v) for v in raw]
+    return get_type_deserializer().deserialize(value)
+
+
+def deserialize_item(item):
+    """Deserialize a low-level item dict to plain Python values."""
+    return {k: deserialize_value(v) for k, v in item.items()}
+
+
+def _json_default(value):
+    """
+    Encode the values deserialize_item produces that json cannot: numbers, sets and binary.
+
+    Whole numbers become JSON integers. Other numbers become strings ("0.1"), since a
+    float would lose digits that DynamoDB keeps (up to 38).
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    if hasattr(value, 'value'):
+        # boto3 Binary
+        return base64.b64encode(value.value).decode('ascii')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(value):
+    """Encode a deserialized item (or any plain value) as one line of JSON, see _json_default."""
+    return json.dumps(value, default=_json_default)
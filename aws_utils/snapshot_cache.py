@@ -0,0 +1,221 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from aws_utils.scan_table import parallel_scan
+from aws_utils.table_metadata import get_table_metadata, key_token
+
+DEFAULT_SNAPSHOT_TTL = 3600
+DEFAULT_SNAPSHOT_DIR = os.environ.get('AWS_UTILS_SNAPSHOT_DIR', os.path.expanduser('~/.cache/aws-utils/snapshots'))
+DEFAULT_WATERMARK_FIELD = 'updated_at'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY, item TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshot (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _encode_bytes(value):
+    # Binary attributes ('B', 'BS') are the only non-JSON values in the low-level format
+    if isinstance(value, (bytes, bytearray)):
+        return {'$b64': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Cannot store {type(value).__name__} in a snapshot")
+
+
+def _decode_bytes(obj):
+    if len(obj) == 1 and '$b64' in obj:
+        return base64.b64decode(obj['$b64'])
+    return obj
+
+
+def snapshot_path(table_name, aws_endpoint=None, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """Path of the SQLite snapshot of a table; tables behind different endpoints get different files."""
+    endpoint_id = hashlib.sha1(f"{aws_endpoint or 'default'}".encode()).hexdigest()[:12]
+    return os.path.join(snapshot_dir, f"{table_name}-{endpoint_id}.sqlite")
+
+
+def _watermark_value(item, field):
+    """Comparable value of the watermark attribute of an item, None if it has none."""
+    value = item.get(field)
+    if not value:
+        return None
+    if 'N' in value:
+        return float(value['N'])
+    # Uniform ISO 8601 strings sort lexicographically
+    return value.get('S')
+
+
+class TableSnapshot:
+    """
+    Local SQLite copy of a DynamoDB table, for repeated analysis without rescanning.
+
+    Items are stored in the low-level client format, keyed by their primary key, next
+    to the time of the last full scan and the highest watermark (e.g. updated_at) seen.
+
+    Args:
+        path (str): Path of the SQLite file, created if missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def get(self, name, default=None):
+        row = self.connection.execute("SELECT value FROM snapshot WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, name, value):
+        self.connection.execute("INSERT OR REPLACE INTO snapshot (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def age(self):
+        """Seconds since the snapshot was last refreshed, None if it was never completed."""
+        refreshed_at = self.get('refreshed_at')
+        return None if refreshed_at is None else time.time() - refreshed_at
+
+    def items(self):
+        """Yield the stored items, in primary key order."""
+        for (item,) in self.connection.execute("SELECT item FROM items ORDER BY key"):
+            yield json.loads(item, object_hook=_decode_bytes)
+
+    def upsert(self, items, key_attributes):
+        """Insert or replace items by their primary key."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO items (key, item) VALUES (?, ?)",
+            ((key_token(item, key_attributes).decode('utf-8'), json.dumps(item, default=_encode_bytes, separators=(',', ':')))
+             for item in items),
+        )
+
+    def replace(self, items, key_attributes):
+        """Replace all stored items."""
+        self.connection.execute("DELETE FROM items")
+        self.upsert(items, key_attributes)
+
+    def commit(self, watermark_field, watermark, full):
+        now = time.time()
+        self.set('refreshed_at', now)
+        if full:
+            self.set('full_scan_at', now)
+        self.set('watermark_field', watermark_field)
+        self.set('watermark', watermark)
+        self.connection.commit()
+
+
+def _scan(table_name, aws_endpoint, total_segments, **scan_kwargs):
+    pages = []
+    lock = threading.Lock()
+
+    def collect(items):
+        with lock:
+            pages.append(items)
+
+    parallel_scan(table_name, collect, aws_endpoint, total_segments, **scan_kwargs)
+    return [item for page in pages for item in page]
+
+
+def refresh_snapshot(table_name, aws_endpoint=None, watermark_field=DEFAULT_WATERMARK_FIELD, full=False,
+                     total_segments=4, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    Bring the snapshot of a table up to date.
+
+    The first refresh (or one with full=True) scans the whole table. Later refreshes
+    only fetch items whose watermark attribute is past the stored high-water mark,
+    when the table has one. The scan filter still reads (and bills) the whole table,
+    but only changed items are transferred and stored. Deleted items and items
+    without the watermark attribute are only picked up by a full refresh.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        watermark_field (str, optional): Attribute holding the last update time (ISO 8601
+            string or epoch number), or None to always scan fully. Defaults to 'updated_at'.
+        full (bool, optional): Rescan the whole table. Defaults to False.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 4.
+        snapshot_dir (str, optional): Snapshot directory. Defaults to ~/.cache/aws-utils/snapshots
+            (or $AWS_UTILS_SNAPSHOT_DIR).
+
+    Returns:
+        dict: Number of items fetched, whether the refresh was incremental and the new watermark
+    """
+    key_attributes = get_table_metadata(table_name, aws_endpoint)['key_attributes']
+
+    with TableSnapshot(snapshot_path(table_name, aws_endpoint, snapshot_dir)) as snapshot:
+        watermark = snapshot.get('watermark') if snapshot.get('watermark_field') == watermark_field else None
+        incremental = bool(watermark_field and watermark is not None and not full and snapshot.age() is not None)
+
+        scan_kwargs = {}
+        if incremental:
+            value_type = 'N' if isinstance(watermark, (int, float)) else 'S'
+            scan_kwargs = {
+                'FilterExpression': '#watermark > :watermark',
+                'ExpressionAttributeNames': {'#watermark': watermark_field},
+                'ExpressionAttributeValues': {':watermark': {value_type: str(watermark)}},
+            }
+        items = _scan(table_name, aws_endpoint, total_segments, **scan_kwargs)
+
+        if watermark_field:
+            values = [value for value in (_watermark_value(item, watermark_field) for item in items) if value is not None]
+            # Strings and numbers don't compare; go by the type of the first value found
+            values = [value for value in values if type(value) is type(values[0])] if values else []
+            if values:
+                watermark = max(values)
+            elif not incremental:
+                watermark = None
+        if incremental:
+            snapshot.upsert(items, key_attributes)
+        else:
+            snapshot.replace(items, key_attributes)
+        snapshot.commit(watermark_field, watermark, full=not incremental)
+
+    return {'fetched': len(items), 'incremental': incremental, 'watermark': watermark}
+
+
+def cached_scan(table_name, aws_endpoint=None, ttl=DEFAULT_SNAPSHOT_TTL, refresh=False,
+                watermark_field=DEFAULT_WATERMARK_FIELD, total_segments=4, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    Scan a table through its local snapshot.
+
+    Within `ttl` seconds of the last refresh the items come straight from the SQLite
+    file, without touching DynamoDB. After that the snapshot is refreshed first,
+    incrementally when a watermark is known (see refresh_snapshot).
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        ttl (float, optional): Seconds a snapshot is used without refreshing. Defaults to 3600.
+        refresh (bool, optional): Rescan the whole table now. Defaults to False.
+        watermark_field (str, optional): Attribute for incremental refreshes. Defaults to 'updated_at'.
+        total_segments (int, optional): Parallel scan segments for refreshes. Defaults to 4.
+        snapshot_dir (str, optional): Snapshot directory. Defaults to ~/.cache/aws-utils/snapshots.
+
+    Returns:
+        dict: {"Items": [...]} in the low-level client format, like scan_table
+    """
+    path = snapshot_path(table_name, aws_endpoint, snapshot_dir)
+    with TableSnapshot(path) as snapshot:
+        age = snapshot.age()
+
+    if refresh or age is None or age > ttl:
+        result = refresh_snapshot(table_name, aws_endpoint, watermark_field, full=refresh,
+                                  total_segments=total_segments, snapshot_dir=snapshot_dir)
+        kind = 'incremental' if result['incremental'] else 'full'
+        print(f"Snapshot refreshed ({kind} scan, {result['fetched']} items fetched): {path}")
+    else:
+        print(f"Using snapshot from {int(age)}s ago: {path}")
+
+    with TableSnapshot(path) as snapshot:
+        return {"Items": list(snapshot.items())}
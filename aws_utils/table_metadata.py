@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+from aws_utils.clients import get_client
+from aws_utils.serializer import serialize_value
+
+DEFAULT_TTL = 300
+DEFAULT_CACHE_DIR = os.environ.get('AWS_UTILS_CACHE_DIR', os.path.expanduser('~/.cache/aws-utils/tables'))
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _parse_description(table):
+    """Reduce a DescribeTable response to the fields the tools need."""
+    key_schema = {key['KeyType']: key['AttributeName'] for key in table['KeySchema']}
+    throughput = table.get('ProvisionedThroughput', {})
+    billing_mode = table.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED')
+
+    indexes = []
+    for index_type in ('GlobalSecondaryIndexes', 'LocalSecondaryIndexes'):
+        for index in table.get(index_type, []):
+            index_keys = {key['KeyType']: key['AttributeName'] for key in index['KeySchema']}
+            indexes.append({
+                'name': index['IndexName'],
+                'type': 'GSI' if index_type == 'GlobalSecondaryIndexes' else 'LSI',
+                'hash_key': index_keys.get('HASH'),
+                'range_key': index_keys.get('RANGE'),
+                'projection': index.get('Projection', {}).get('ProjectionType'),
+            })
+
+    return {
+        'table_name': table['TableName'],
+        'hash_key': key_schema['HASH'],
+        'range_key': key_schema.get('RANGE'),
+        'key_attributes': [key['AttributeName'] for key in table['KeySchema']],
+        'attribute_types': {a['AttributeName']: a['AttributeType'] for a in table.get('AttributeDefinitions', [])},
+        'indexes': indexes,
+        'billing_mode': billing_mode,
+        'read_capacity': throughput.get('ReadCapacityUnits') if billing_mode == 'PROVISIONED' else None,
+        'write_capacity': throughput.get('WriteCapacityUnits') if billing_mode == 'PROVISIONED' else None,
+        'item_count': table.get('ItemCount', 0),
+        'size_bytes': table.get('TableSizeBytes', 0),
+        'fetched_at': time.time(),
+    }
+
+
+def _disk_path(table_name, aws_endpoint, region, cache_dir):
+    endpoint_id = hashlib.sha1(f"{aws_endpoint or 'default'}|{region or 'default'}".encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{table_name}-{endpoint_id}.json")
+
+
+def _read_disk(path, ttl):
+    try:
+        with open(path, 'r') as file:
+            metadata = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if time.time() - metadata.get('fetched_at', 0) > ttl:
+        return None
+    return metadata
+
+
+def _write_disk(path, metadata):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as file:
+        json.dump(metadata, file)
+    os.replace(temp_path, path)
+
+
+def get_table_metadata(table_name, aws_endpoint=None, ttl=DEFAULT_TTL, disk_cache=False,
+                       cache_dir=DEFAULT_CACHE_DIR, refresh=False, region=None):
+    """
+    Get key schema, attribute types, indexes, billing mode and capacity of a table.
+
+    Results are cached in memory for `ttl` seconds, and optionally on disk so that
+    separate processes share them, so DescribeTable is called once per table
+    rather than once per tool step.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        ttl (float, optional): Seconds a cached description stays valid. Defaults to 300.
+        disk_cache (bool, optional): Also read/write the on-disk cache. Defaults to False.
+        cache_dir (str, optional): On-disk cache directory. Defaults to ~/.cache/aws-utils/tables
+            (or $AWS_UTILS_CACHE_DIR).
+        refresh (bool, optional): Ignore cached entries and call DescribeTable. Defaults to False.
+        region (str, optional): AWS region name. Defaults to None.
+
+    Returns:
+        dict: table_name, hash_key, range_key, key_attributes, attribute_types, indexes,
+        billing_mode, read_capacity, write_capacity, item_count, size_bytes and fetched_at
+    """
+    key = (aws_endpoint, region, table_name)
+    if not refresh:
+        with _cache_lock:
+            metadata = _cache.get(key)
+        if metadata and time.time() - metadata['fetched_at'] <= ttl:
+            return metadata
+        if disk_cache:
+            metadata = _read_disk(_disk_path(table_name, aws_endpoint, region, cache_dir), ttl)
+            if metadata:
+                with _cache_lock:
+                    _cache[key] = metadata
+                return metadata
+
+    client = get_client('dynamodb', aws_endpoint, region)
+    metadata = _parse_description(client.describe_table(TableName=table_name)['Table'])
+    with _cache_lock:
+        _cache[key] = metadata
+    if disk_cache:
+        _write_disk(_disk_path(table_name, aws_endpoint, region, cache_dir), metadata)
+    return metadata
+
+
+def invalidate(table_name=None, aws_endpoint=None, region=None):
+    """Drop cached metadata of one table, or of every table when table_name is None."""
+    with _cache_lock:
+        if table_name is None:
+            _cache.clear()
+        else:
+            _cache.pop((aws_endpoint, region, table_name), None)
+
+
+def extract_key(item, metadata):
+    """Return the primary key (hash and range attributes) of an item."""
+    return {name: item[name] for name in metadata['key_attributes']}
+
+
+def _canonical_number(raw):
+    """Render a number the way DynamoDB returns it, so '5', '5.0' and '05' give the same token."""
+    try:
+        number = Decimal(raw)
+    except InvalidOperation:
+        return raw
+    if not number.is_finite():
+        return raw
+    return format(number.normalize(), 'f')
+
+
+def typed_key(item, metadata):
+    """
+    Build the low-level key of a plain item, with the types of the table's key attributes.
+
+    Values read from text files, such as CSV fields, are strings, so a numeric ('N')
+    key attribute gets its string value as a number, the way the table stores it.
+    Values that are not numbers are left as they are, and fail when written.
+
+    Args:
+        item (dict): Item with plain values
+        metadata (dict): Table metadata as returned by get_table_metadata
+
+    Returns:
+        dict: Key in client format, e.g. {'id': {'N': '42'}}
+    """
+    key = {}
+    for name in metadata['key_attributes']:
+        value = item[name]
+        if metadata['attribute_types'].get(name) == 'N' and isinstance(value, str):
+            try:
+                number = Decimal(value.strip())
+            except InvalidOperation:
+                number = None
+            if number is not None and number.is_finite():
+                value = number
+        key[name] = serialize_value(value)
+    return key
+
+
+def key_token(key, key_attributes):
+    """
+    Build a hashable token from a low-level key, e.g. for BloomFilter or dedupe lookups.
+
+    Numbers are compared by value, so 5 and 5.0 are the same key, as in DynamoDB.
+
+    Args:
+        key (dict): Item or key in low-level client format
+        key_attributes (list): Key attribute names, in key schema order
+
+    Returns:
+        bytes: Token identifying the key
+    """
+    parts = []
+    for name in key_attributes:
+        (value_type, raw), = key[name].items()
+        if isinstance(raw, bytes):
+            raw = raw.hex()
+        elif value_type == 'N':
+            raw = _canonical_number(raw)
+        parts.append(f"{value_type}:{len(raw)}:{raw}")
+    return "|".join(parts).encode('utf-8')
+
+
+def key_projection(metadata):
+    """
+    Build scan parameters that fetch only the primary key attributes.
+
+    Args:
+        metadata (dict): Table metadata as returned by get_table_metadata
+
+    Returns:
+        dict: ProjectionExpression and ExpressionAttributeNames for client.scan/query
+    """
+    names = {f"#k{i}": name for i, name in enumerate(metadata['key_attributes'])}
+    return {
+        'ProjectionExpression': ", ".join(names),
+        'ExpressionAttributeNames': names,
+    }
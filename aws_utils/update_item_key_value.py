@@ -1,5 +1,91 @@
 import argparse
-import boto3
+import csv
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from aws_utils.batch_write import MAX_RETRIES
+from aws_utils.clients import get_client
+from aws_utils.profiling import add_profile_arguments, profile_command, stage
+from aws_utils.serializer import get_type_deserializer, get_type_serializer
+from aws_utils.table_metadata import get_table_metadata
+
+BATCH_GET_LIMIT = 100
+TRUE_STRINGS = ('true', 't', 'yes', 'y', '1')
+
+def to_attribute_value(value, value_type=None, serializer=None):
+    """
+    Convert a plain value to a low-level DynamoDB attribute value.
+
+    Args:
+        value: Value to convert (str from CSV/CLI, or any JSON value)
+        value_type (str, optional): DynamoDB type (S, N, BOOL, etc). Defaults to None (infer from the value).
+        serializer (TypeSerializer, optional): Serializer used when the type is inferred
+
+    Returns:
+        dict: Attribute value, e.g. {'N': '42'}
+    """
+    if value_type is None:
+        return (serializer or get_type_serializer()).serialize(value)
+    if value_type == 'BOOL':
+        if isinstance(value, bool):
+            return {'BOOL': value}
+        return {'BOOL': str(value).lower() in TRUE_STRINGS}
+    return {value_type: str(value)}
+
+def build_key(pk_name, pk_value, pk_type='S', sk_name=None, sk_value=None, sk_type='S'):
+    """
+    Build a low-level DynamoDB key for a simple or composite primary key.
+
+    Args:
+        pk_name (str): Name of the partition key
+        pk_value: Value of the partition key
+        pk_type (str, optional): DynamoDB type of the partition key (S, N or B). Defaults to 'S'.
+        sk_name (str, optional): Name of the sort key, for composite keys. Defaults to None.
+        sk_value (optional): Value of the sort key. Defaults to None.
+        sk_type (str, optional): DynamoDB type of the sort key (S, N or B). Defaults to 'S'.
+
+    Returns:
+        dict: Key in client format, e.g. {'id': {'S': 'abc'}}
+    """
+    key = {pk_name: {pk_type: str(pk_value)}}
+    if sk_name:
+        if sk_value is None:
+            raise ValueError(f"A value for sort key '{sk_name}' is required")
+        key[sk_name] = {sk_type: str(sk_value)}
+    return key
+
+def old_value_candidates(old_value, value_type=None):
+    """
+    List the typed values an expected old value may be stored as.
+
+    With an explicit type there is exactly one candidate. Without one, a value given
+    on the command line is a string that may be stored as S, N or BOOL, so every
+    plausible typing is accepted, matching a plain string comparison.
+
+    Args:
+        old_value: Expected current value
+        value_type (str, optional): DynamoDB type of the value. Defaults to None.
+
+    Returns:
+        list: Attribute values in client format
+    """
+    if value_type is not None or not isinstance(old_value, str):
+        return [to_attribute_value(old_value, value_type)]
+
+    candidates = [{'S': old_value}]
+    try:
+        number = Decimal(old_value.strip())
+        if number.is_finite():
+            candidates.append({'N': str(number)})
+    except InvalidOperation:
+        pass
+    if old_value.strip().lower() in ('true', 'false'):
+        candidates.append({'BOOL': old_value.strip().lower() == 'true'})
+    return candidates
 
 def update_item_key_value(
     table_name, 
@@ -9,10 +95,17 @@ def update_item_key_value(
     new_value,
     old_value=None,
     aws_endpoint=None,
-    value_type=None
+    value_type=None,
+    pk_type='S',
+    sk_name=None,
+    sk_value=None,
+    sk_type='S'
 ):
     """
     Update a specific key value in a DynamoDB item.
+
+    The update is a single conditional UpdateItem call: the item must exist and,
+    if old_value is given, the key must still hold it (or be absent).
     
     Args:
         table_name (str): Name of the DynamoDB table
@@ -23,107 +116,300 @@ def update_item_key_value(
         old_value (str, optional): Current value of the key (for verification). Defaults to None.
         aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
         value_type (str, optional): DynamoDB type (S, N, BOOL, etc). Defaults to None (auto-detect).
+        pk_type (str, optional): DynamoDB type of the primary key (S, N or B). Defaults to 'S'.
+        sk_name (str, optional): Name of the sort key, for tables with a composite key. Defaults to None.
+        sk_value (str, optional): Value of the sort key. Defaults to None.
+        sk_type (str, optional): DynamoDB type of the sort key (S, N or B). Defaults to 'S'.
         
     Returns:
         bool: True if successful, False otherwise
     """
     # Connect to DynamoDB
-    if aws_endpoint:
-        dynamodb = boto3.resource('dynamodb', endpoint_url=aws_endpoint)
-        client = boto3.client('dynamodb', endpoint_url=aws_endpoint)
-    else:
-        dynamodb = boto3.resource('dynamodb')
-        client = boto3.client('dynamodb')
-    
-    # For the boto3 resource API
-    table = dynamodb.Table(table_name)
-    
-    # First, get the item to verify it exists
+    client = get_client('dynamodb', aws_endpoint)
+
+    key = build_key(pk_name, pk_value, pk_type, sk_name, sk_value, sk_type)
+    names = {'#pk': pk_name, '#k': key_name}
+    values = {':new_val': to_attribute_value(new_value, value_type)}
+    condition = "attribute_exists(#pk)"
+    if old_value is not None:
+        old_refs = []
+        for i, candidate in enumerate(old_value_candidates(old_value, value_type)):
+            values[f":old_val{i}"] = candidate
+            old_refs.append(f":old_val{i}")
+        condition += f" AND (attribute_not_exists(#k) OR #k IN ({', '.join(old_refs)}))"
+
     try:
-        response = table.get_item(Key={pk_name: pk_value})
-    except Exception as e:
-        print(f"❌ Error accessing item: {str(e)}")
-        return False
-    
-    if 'Item' not in response:
-        print(f"❌ Error: Item with {pk_name}={pk_value} not found in {table_name}")
+        response = client.update_item(
+            TableName=table_name,
+            Key=key,
+            UpdateExpression="SET #k = :new_val",
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+            ReturnValues="UPDATED_OLD",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+    except client.exceptions.ConditionalCheckFailedException as e:
+        item = e.response.get('Item')
+        if item is None:
+            print(f"❌ Error: Item with {pk_name}={pk_value} not found in {table_name}")
+        else:
+            current_value = get_type_deserializer().deserialize(item[key_name])
+            print(f"❌ Error: Current value of '{key_name}' is '{current_value}', not '{old_value}'")
         return False
-    
-    item = response['Item']
-    
-    # Check if the old value matches (if old_value was provided)
-    if old_value is not None and key_name in item and str(item[key_name]) != str(old_value):
-        print(f"❌ Error: Current value of '{key_name}' is '{item[key_name]}', not '{old_value}'")
+    except Exception as e:
+        print(f"❌ Error updating item: {str(e)}")
         return False
-    
-    # If value_type is specified, we'll use the DynamoDB client API
-    if value_type:
-        # Convert the new value to the appropriate DynamoDB format
-        if value_type == 'N':
-            typed_value = {'N': str(new_value)}
-        elif value_type == 'S':
-            typed_value = {'S': str(new_value)}
-        elif value_type == 'BOOL':
-            typed_value = {'BOOL': new_value.lower() in ('true', 't', 'yes', 'y', '1')}
+
+    previous = response.get('Attributes', {}).get(key_name)
+    current_value = get_type_deserializer().deserialize(previous) if previous else "None"
+    type_note = f" with type {value_type}" if value_type else ""
+    print(f"✅ Successfully updated {key_name} from '{current_value}' to '{new_value}'{type_note}")
+    return True
+
+def load_update_rows(file_path, default_key_name=None):
+    """
+    Load bulk update rows from a CSV or JSONL file.
+
+    Each row needs a 'pk' and a 'new' value, and may carry 'sk' (sort key value),
+    'key' (attribute to update, defaults to default_key_name) and 'old' (expected current value).
+    Files ending in .jsonl/.ndjson are read as JSONL, anything else as CSV with a header row.
+
+    Args:
+        file_path (str): Path to the CSV or JSONL file
+        default_key_name (str, optional): Attribute to update when a row has no 'key'
+
+    Returns:
+        list: Row dicts with pk, sk, key, old and new entries
+    """
+    with open(file_path, 'r', newline='') as file:
+        if file_path.endswith(('.jsonl', '.ndjson')):
+            raw_rows = [json.loads(line, parse_float=Decimal) for line in file if line.strip()]
         else:
-            typed_value = {value_type: str(new_value)}
-        
+            # Empty CSV cells mean "not provided"
+            raw_rows = [{k: v for k, v in row.items() if v != ''} for row in csv.DictReader(file)]
+
+    rows = []
+    for line_num, raw in enumerate(raw_rows, 1):
+        key_name = raw.get('key', default_key_name)
+        if 'pk' not in raw or 'new' not in raw or key_name is None:
+            raise ValueError(f"Row {line_num} needs 'pk', 'new' and 'key' (or -k): {raw}")
+        rows.append({
+            'pk': raw['pk'],
+            'sk': raw.get('sk'),
+            'key': key_name,
+            'old': raw.get('old'),
+            'new': raw['new'],
+        })
+    return rows
+
+def batch_get_items(client, table_name, keys, projection_names=None, unprocessed=None, max_retries=MAX_RETRIES):
+    """
+    Fetch items with BatchGetItem, 100 keys per call, retrying unprocessed keys with backoff.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the DynamoDB table
+        keys (list): Low-level key dicts (must be unique)
+        projection_names (iterable, optional): Attribute names to fetch. Defaults to None (whole items).
+        unprocessed (list, optional): Receives the keys still unprocessed after all retries, which
+            were neither found nor confirmed missing. Defaults to None.
+        max_retries (int, optional): Retries for unprocessed keys per call. Defaults to 8.
+
+    Returns:
+        list: Items found, in low-level client format
+    """
+    projection = {}
+    if projection_names:
+        names = {f"#p{i}": name for i, name in enumerate(sorted(set(projection_names)))}
+        projection = {'ProjectionExpression': ", ".join(names), 'ExpressionAttributeNames': names}
+    items = []
+    leftover = []
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        request_items = {table_name: dict(projection, Keys=keys[start:start + BATCH_GET_LIMIT])}
+        for attempt in range(max_retries + 1):
+            response = client.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+            if attempt < max_retries:
+                with stage('backoff'):
+                    time.sleep(min(0.05 * 2 ** attempt, 5))
+        if request_items:
+            leftover.extend(request_items[table_name]['Keys'])
+    if leftover:
+        print(f"Error: {len(leftover)} keys still unprocessed after {max_retries} retries")
+        if unprocessed is not None:
+            unprocessed.extend(leftover)
+    return items
+
+def batch_update_item_key_values(
+    table_name,
+    pk_name,
+    rows,
+    aws_endpoint=None,
+    value_type=None,
+    max_workers=32
+):
+    """
+    Update many items from a list of (pk, key, old, new) rows in one process.
+
+    Items are verified in bulk with BatchGetItem, then updated from a thread pool.
+    Every update is conditional on the value read during verification, so an item
+    changed by someone else in between is reported instead of overwritten.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        pk_name (str): Name of the partition key (e.g., 'id')
+        rows (list): Rows as returned by load_update_rows
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        value_type (str, optional): DynamoDB type of old/new values. Defaults to None (infer from the value).
+        max_workers (int, optional): Number of concurrent update threads. Defaults to 32.
+
+    Returns:
+        dict: Counts of updated, not_found, mismatched and failed rows
+    """
+    # One pooled connection per worker thread
+    client = get_client('dynamodb', aws_endpoint, max_pool_connections=max_workers)
+
+    metadata = get_table_metadata(table_name, aws_endpoint)
+    attribute_types = metadata['attribute_types']
+    key_names = metadata['key_attributes']
+    if metadata['hash_key'] != pk_name:
+        raise ValueError(f"Primary key '{pk_name}' does not match schema key '{metadata['hash_key']}'")
+    sk_name = metadata['range_key']
+
+    def key_for(row):
+        if sk_name and row['sk'] is None:
+            raise ValueError(f"Table has sort key '{sk_name}', but row for pk={row['pk']} has no 'sk'")
+        return build_key(pk_name, row['pk'], attribute_types[pk_name],
+                         sk_name, row['sk'], attribute_types.get(sk_name, 'S'))
+
+    def key_id(key):
+        return json.dumps(key, sort_keys=True)
+
+    keyed_rows = [(key_for(row), row) for row in rows]
+    unique_keys = list({key_id(key): key for key, _ in keyed_rows}.values())
+    print(f"Verifying {len(unique_keys)} items with BatchGetItem...")
+    unprocessed = []
+    found = batch_get_items(client, table_name, unique_keys, key_names + [row['key'] for row in rows], unprocessed)
+    items_by_key = {key_id({k: item[k] for k in key_names}): item for item in found}
+    unverified = {key_id(key) for key in unprocessed}
+
+    deserializer = get_type_deserializer()
+    serializer = get_type_serializer()
+    stats = {'updated': 0, 'not_found': 0, 'mismatched': 0, 'failed': 0}
+    stats_lock = threading.Lock()
+
+    def count(outcome):
+        with stats_lock:
+            stats[outcome] += 1
+
+    def update_row(key, row, current_item):
+        key_name = row['key']
+        current = current_item.get(key_name)
+        if row['old'] is not None and current is not None and str(deserializer.deserialize(current)) != str(row['old']):
+            count('mismatched')
+            return
+
+        names = {'#pk': pk_name, '#k': key_name}
+        values = {':new_val': to_attribute_value(row['new'], value_type, serializer)}
+        if current is None:
+            condition = "attribute_exists(#pk) AND attribute_not_exists(#k)"
+        else:
+            condition = "#k = :old_val"
+            values[':old_val'] = current
+
         try:
-            # Use the client API to update with typed value
-            response = client.update_item(
+            client.update_item(
                 TableName=table_name,
-                Key={pk_name: {'S': str(pk_value)}},
-                UpdateExpression=f"SET {key_name} = :new_val",
-                ExpressionAttributeValues={':new_val': typed_value},
-                ReturnValues="UPDATED_NEW"
-            )
-            current_value = item.get(key_name, "None")
-            print(f"✅ Successfully updated {key_name} from '{current_value}' to '{new_value}' with type {value_type}")
-            return True
-        except Exception as e:
-            print(f"❌ Error updating item: {str(e)}")
-            return False
-    else:
-        # Use the simpler resource API
-        try:
-            response = table.update_item(
-                Key={pk_name: pk_value},
-                UpdateExpression=f"SET {key_name} = :new_val",
-                ExpressionAttributeValues={':new_val': new_value},
-                ReturnValues="UPDATED_NEW"
+                Key=key,
+                UpdateExpression="SET #k = :new_val",
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
             )
-            current_value = item.get(key_name, "None")
-            print(f"✅ Successfully updated {key_name} from '{current_value}' to '{new_value}'")
-            print(f"Updated values: {response.get('Attributes', {})}")
-            return True
+            count('updated')
+        except client.exceptions.ConditionalCheckFailedException:
+            count('mismatched')
         except Exception as e:
-            print(f"❌ Error updating item: {str(e)}")
-            return False
+            print(f"❌ Error updating {key_name} for {json.dumps(key)}: {str(e)}")
+            count('failed')
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for key, row in keyed_rows:
+            current_item = items_by_key.get(key_id(key))
+            if key_id(key) in unverified:
+                # Never read, so it cannot be updated conditionally
+                count('failed')
+                continue
+            if current_item is None:
+                count('not_found')
+                continue
+            futures.append(executor.submit(update_row, key, row, current_item))
+        for future in futures:
+            future.result()
+
+    return stats
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Update a specific key value in a DynamoDB item')
     parser.add_argument('-t', '--table', required=True, help='DynamoDB table name')
     parser.add_argument('-p', '--primary_key_name', required=True, help='Primary key name (e.g. "id")')
-    parser.add_argument('-v', '--primary_key_value', required=True, help='Primary key value')
-    parser.add_argument('-k', '--key_name', required=True, help='Name of the key to update')
+    parser.add_argument('-v', '--primary_key_value', help='Primary key value')
+    parser.add_argument('-k', '--key_name', help='Name of the key to update')
     parser.add_argument('-o', '--old_value', help='Current value of the key (for verification, optional)')
-    parser.add_argument('-n', '--new_value', required=True, help='New value to set')
+    parser.add_argument('-n', '--new_value', help='New value to set')
     parser.add_argument('-e', '--aws_endpoint', help='AWS endpoint URL (optional)')
     parser.add_argument('-T', '--type', choices=['S', 'N', 'BOOL', 'M', 'L', 'SS', 'NS', 'BS'],
                        help='DynamoDB attribute type (S=string, N=number, etc.)')
+    parser.add_argument('--pk_type', choices=['S', 'N', 'B'], default='S', help='DynamoDB type of the primary key (default: S)')
+    parser.add_argument('-s', '--sort_key_name', help='Sort key name, for tables with a composite key')
+    parser.add_argument('--sort_key_value', help='Sort key value')
+    parser.add_argument('--sk_type', choices=['S', 'N', 'B'], default='S', help='DynamoDB type of the sort key (default: S)')
+    parser.add_argument('-f', '--file', help='CSV/JSONL file of pk,sk,key,old,new rows for bulk updates')
+    parser.add_argument('-w', '--workers', type=int, default=32, help='Concurrent update threads in bulk mode (default: 32)')
     
-    args = parser.parse_args()
-    
-    update_item_key_value(
-        table_name=args.table,
-        pk_name=args.primary_key_name,
-        pk_value=args.primary_key_value,
-        key_name=args.key_name,
-        new_value=args.new_value,
-        old_value=args.old_value,
-        aws_endpoint=args.aws_endpoint,
-        value_type=args.type
-    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('update_item', args):
+        if args.file:
+            rows = load_update_rows(args.file, args.key_name)
+            started = time.time()
+            stats = batch_update_item_key_values(
+                table_name=args.table,
+                pk_name=args.primary_key_name,
+                rows=rows,
+                aws_endpoint=args.aws_endpoint,
+                value_type=args.type,
+                max_workers=args.workers
+            )
+            elapsed = time.time() - started
+            print(f"✅ Updated {stats['updated']} of {len(rows)} rows in {elapsed:.1f}s "
+                  f"({stats['not_found']} not found, {stats['mismatched']} old value mismatches, {stats['failed']} failed)")
+            return 0 if stats['updated'] == len(rows) else 1
+
+        if args.primary_key_value is None or args.key_name is None or args.new_value is None:
+            parser.error("-v/--primary_key_value, -k/--key_name and -n/--new_value are required unless -f/--file is given")
+
+        updated = update_item_key_value(
+            table_name=args.table,
+            pk_name=args.primary_key_name,
+            pk_value=args.primary_key_value,
+            key_name=args.key_name,
+            new_value=args.new_value,
+            old_value=args.old_value,
+            aws_endpoint=args.aws_endpoint,
+            value_type=args.type,
+            pk_type=args.pk_type,
+            sk_name=args.sort_key_name,
+            sk_value=args.sort_key_value,
+            sk_type=args.sk_type
+        )
+        return 0 if updated else 1
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,10 +1,83 @@
-import boto3
 import argparse
-import time
 import sys
 import json
+import threading
 
-def delete_table_entries(table_name, aws_endpoint=None, verbose=False, primary_key=None):
+from aws_utils.batch_write import delete_keys
+from aws_utils.clients import DEFAULT_MAX_IN_FLIGHT, get_client
+from aws_utils.metrics import add_metrics_arguments, command_metrics, table_item_count
+from aws_utils.profiling import add_profile_arguments, profile_command
+from aws_utils.scan_table import count_items, parallel_scan
+from aws_utils.table_metadata import extract_key, get_table_metadata, key_projection
+
+def delete_all_keys(table_name, metadata, aws_endpoint=None, total_segments=16, progress=None):
+    """
+    Delete every item with a paginated, keys-only parallel scan.
+
+    Each scan segment deletes its own pages as it goes (BatchWriteItem, 25 keys per
+    call, full hash and range key), so the table is emptied at the combined
+    throughput of all segments.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        metadata (dict): Table metadata as returned by get_table_metadata
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        total_segments (int, optional): Parallel scan segments, each deleting its pages. Defaults to 16.
+        progress (callable, optional): Called with the number of items deleted by each batch. Defaults to None.
+
+    Returns:
+        tuple: (deleted, failed) item counts
+    """
+    lock = threading.Lock()
+    totals = {'deleted': 0, 'failed': 0}
+
+    def delete_page(items):
+        deleted, failed = delete_keys(table_name, [extract_key(item, metadata) for item in items], aws_endpoint,
+                                      progress=progress)
+        with lock:
+            totals['deleted'] += deleted
+            totals['failed'] += failed
+
+    parallel_scan(table_name, delete_page, aws_endpoint, total_segments, **key_projection(metadata))
+    return totals['deleted'], totals['failed']
+
+async def delete_keys_async(table_name, metadata, aws_endpoint=None, verbose=False, total_segments=16,
+                            max_in_flight=DEFAULT_MAX_IN_FLIGHT, progress=None):
+    """
+    Delete every item on the asyncio engine: a keys-only parallel scan whose pages
+    are deleted as concurrent BatchWriteItem calls.
+
+    Args:
+        table_name (str): Name of the DynamoDB table
+        metadata (dict): Table metadata as returned by get_table_metadata
+        aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
+        verbose (bool, optional): Enable verbose output. Defaults to False.
+        total_segments (int, optional): Number of parallel scan segments. Defaults to 16.
+        max_in_flight (int, optional): Maximum concurrent requests. Defaults to 256.
+        progress (callable, optional): Called with the number of items deleted by each batch. Defaults to None.
+
+    Returns:
+        int: Number of items deleted
+    """
+    from aws_utils.async_engine import AsyncEngine
+
+    totals = {'deleted': 0, 'failed': 0}
+
+    async with AsyncEngine(aws_endpoint, max_in_flight=max_in_flight) as engine:
+        async def delete_page(items):
+            requests = ({'DeleteRequest': {'Key': extract_key(item, metadata)}} for item in items)
+            deleted, failed = await engine.write_all(table_name, requests, progress)
+            totals['deleted'] += deleted
+            totals['failed'] += failed
+
+        await engine.scan(table_name, delete_page, total_segments, **key_projection(metadata))
+
+    if totals['failed']:
+        print(f"Error: failed to delete {totals['failed']} items")
+    return totals['deleted']
+
+def delete_table_entries(table_name, aws_endpoint=None, verbose=False, primary_key=None, use_async=False,
+                         total_segments=16, max_in_flight=DEFAULT_MAX_IN_FLIGHT, progress=None):
     """
     Delete all entries from a DynamoDB table with verification of items deleted.
     
@@ -13,49 +86,39 @@ def delete_table_entries(table_name, aws_endpoint=None, verbose=False, primary_k
         aws_endpoint (str, optional): AWS endpoint URL. Defaults to None.
         verbose (bool, optional): Enable verbose output. Defaults to False.
         primary_key (str, optional): Primary key name. If not provided, will be auto-detected.
+        use_async (bool, optional): Delete on the asyncio engine (requires aiobotocore). Defaults to False.
+        total_segments (int, optional): Parallel scan segments. Defaults to 16.
+        max_in_flight (int, optional): Maximum concurrent requests in async mode. Defaults to 256.
+        progress (callable, optional): Called with the number of items deleted by each batch. Defaults to None.
         
     Returns:
         tuple: (success, initial_count, deleted_count, remaining_count)
     """
-    # Set up DynamoDB resources
-    if aws_endpoint:
-        dynamodb = boto3.resource('dynamodb', endpoint_url=aws_endpoint)
-        client = boto3.client('dynamodb', endpoint_url=aws_endpoint)
-    else:
-        dynamodb = boto3.resource('dynamodb')
-        client = boto3.client('dynamodb')
+    # Set up DynamoDB client
+    client = get_client('dynamodb', aws_endpoint)
     
-    table = dynamodb.Table(table_name)
-    
-    # Get the primary key name from the table description if not provided
+    # Get the key schema from the (cached) table description
+    try:
+        metadata = get_table_metadata(table_name, aws_endpoint)
+    except Exception as e:
+        print(f"Error accessing table {table_name}: {str(e)}")
+        return (False, 0, 0, 0)
+
+    schema_key = metadata['hash_key']
     key_name = primary_key
     if key_name is None:
-        try:
-            response = client.describe_table(TableName=table_name)
-            key_name = response['Table']['KeySchema'][0]['AttributeName']
-            if verbose:
-                print(f"Auto-detected primary key: {key_name}")
-        except Exception as e:
-            print(f"Error accessing table {table_name}: {str(e)}")
-            return (False, 0, 0, 0)
+        key_name = schema_key
+        if verbose:
+            print(f"Auto-detected primary key: {key_name}")
     
     # Verify primary key is in the schema
-    try:
-        response = client.describe_table(TableName=table_name)
-        schema_key = response['Table']['KeySchema'][0]['AttributeName']
-        if schema_key != key_name:
-            print(f"Error: Primary key '{key_name}' does not match schema key '{schema_key}'")
-            return (False, 0, 0, 0)
-    except Exception as e:
-        print(f"Error verifying primary key schema: {str(e)}")
+    if schema_key != key_name:
+        print(f"Error: Primary key '{key_name}' does not match schema key '{schema_key}'")
+        return (False, 0, 0, 0)
     
-    # Count items before deletion
+    # Count items before deletion (every page, not just the first 1 MB)
     try:
-        count_response = client.scan(
-            TableName=table_name,
-            Select='COUNT'
-        )
-        initial_count = count_response['Count']
+        initial_count = count_items(table_name, aws_endpoint)
         if verbose:
             print(f"Initial item count: {initial_count}")
     except Exception as e:
@@ -87,73 +150,30 @@ def delete_table_entries(table_name, aws_endpoint=None, verbose=False, primary_k
     # Delete all items
     deleted_count = 0
     try:
-        # Scan and delete in batches
-        last_evaluated_key = None
-        
-        while True:
-            # Scan parameters
-            scan_params = {'TableName': table_name}
-            if last_evaluated_key:
-                scan_params['ExclusiveStartKey'] = last_evaluated_key
-            
-            scan_response = client.scan(**scan_params)
-            items = scan_response.get('Items', [])
-            
-            if not items:
-                break
-                
-            # Delete items in batches
-            with table.batch_writer() as batch:
-                for item in items:
-                    if key_name not in item:
-                        if verbose:
-                            print(f"Warning: Item missing primary key '{key_name}', skipping")
-                            print(f"Item: {json.dumps(item, default=str)}")
-                        continue
-                    
-                    try:
-                        batch.delete_item(Key={key_name: item[key_name][list(item[key_name].keys())[0]]})
-                        deleted_count += 1
-                        
-                        if verbose and deleted_count % 100 == 0:
-                            print(f"Deleted {deleted_count} items so far...")
-                    except Exception as e:
-                        print(f"Error deleting item: {str(e)}")
-                        print(f"Item key: {key_name} = {item[key_name]}")
-                        if verbose:
-                            print(f"Full item: {json.dumps(item, default=str)}")
-            
-            # Check for more items
-            last_evaluated_key = scan_response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
-                
-            # Small pause to avoid throttling
-            time.sleep(0.1)
-            
+        if use_async:
+            import asyncio
+            deleted_count = asyncio.run(delete_keys_async(
+                table_name, metadata, aws_endpoint, verbose, total_segments, max_in_flight, progress
+            ))
+        else:
+            deleted_count, failed = delete_all_keys(table_name, metadata, aws_endpoint, total_segments, progress)
+            if failed:
+                print(f"Error: failed to delete {failed} items")
+
     except Exception as e:
         print(f"Error deleting items from table {table_name}: {str(e)}")
         # Try to get the current count to see how many were deleted
         try:
-            count_response = client.scan(
-                TableName=table_name,
-                Select='COUNT'
-            )
-            current_count = count_response['Count']
+            current_count = count_items(table_name, aws_endpoint, consistent_read=True)
             deleted_count = initial_count - current_count
         except:
             pass
             
         return (False, initial_count, deleted_count, initial_count - deleted_count)
     
-    # Verify all items were deleted by checking the count again
+    # Verify all items were deleted by counting again, with consistent reads that see every delete
     try:
-        time.sleep(1)  # Give DynamoDB a moment to process
-        count_response = client.scan(
-            TableName=table_name,
-            Select='COUNT'
-        )
-        remaining_count = count_response['Count']
+        remaining_count = count_items(table_name, aws_endpoint, consistent_read=True)
         
         if verbose:
             print(f"Remaining item count: {remaining_count}")
@@ -167,37 +187,48 @@ def delete_table_entries(table_name, aws_endpoint=None, verbose=False, primary_k
         
     return (True, initial_count, deleted_count, 0)
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Delete all entries from DynamoDB table.')
     parser.add_argument('-t', '--table_name', type=str, required=True, help='Name of the table to delete entries from.')
     parser.add_argument('-e', '--aws_endpoint', type=str, help='AWS endpoint URL (optional).')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output.')
     parser.add_argument('--force', action='store_true', help='Skip confirmation prompt.')
     parser.add_argument('--pk', type=str, default='id', help='Primary key name. Defaults to "id" if not specified.')
-    args = parser.parse_args()
-    
-    if not args.force:
-        print(f"WARNING: You are about to delete ALL items from the table '{args.table_name}'")
-        confirmation = input("Are you sure you want to proceed? (yes/no): ")
-        if confirmation.lower() != "yes":
-            print("Operation cancelled.")
-            sys.exit(0)
-    
-    success, initial_count, deleted_count, remaining_count = delete_table_entries(
-        args.table_name, 
-        args.aws_endpoint,
-        args.verbose,
-        args.pk
-    )
-    
-    if success:
-        if remaining_count > 0:
-            print(f"Warning: Attempted to wipe {args.table_name}. {deleted_count} items deleted, but {remaining_count} items still remain.")
-        else:
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Delete on the asyncio engine (requires aiobotocore).')
+    parser.add_argument('--segments', type=int, default=16, help='Parallel scan segments, each deleting its pages (default: 16).')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT, help=f'Maximum concurrent requests in async mode (default: {DEFAULT_MAX_IN_FLIGHT}).')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profile_command('wipe_table', args):
+        if not args.force:
+            print(f"WARNING: You are about to delete ALL items from the table '{args.table_name}'")
+            confirmation = input("Are you sure you want to proceed? (yes/no): ")
+            if confirmation.lower() != "yes":
+                print("Operation cancelled.")
+                return 0
+
+        with command_metrics('wipe_table', args, table_item_count(args.table_name, args.aws_endpoint)) as metrics:
+            success, initial_count, deleted_count, remaining_count = delete_table_entries(
+                args.table_name,
+                args.aws_endpoint,
+                args.verbose,
+                args.pk,
+                args.use_async,
+                args.segments,
+                args.max_in_flight,
+                metrics.add
+            )
+
+        if success:
+            if remaining_count > 0:
+                print(f"Warning: Attempted to wipe {args.table_name}. {deleted_count} items deleted, but {remaining_count} items still remain.")
+                return 1
             print(f"Success: Wiped {args.table_name}. {deleted_count} items deleted.")
-    else:
+            return 0
         print(f"Error: Failed to wipe {args.table_name} completely. Only {deleted_count} of {initial_count} items were deleted.")
-        sys.exit(1)
+        return 1
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
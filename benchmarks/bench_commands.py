@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the bulk commands against DynamoDB Local or a moto server.
+
+Each command runs in a fresh subprocess, so peak RSS and CPU time are its own.
+A run only counts when the command handled every item (the generated items, or for
+commands on a populated table the items it holds); an incomplete run is reported as
+failed, not saved with its items/s. Request latencies are measured with the same hook
+as --metrics-json (clients.LatencyHook), which sees the boto3 clients of the worker
+itself: the *_processes and *_async commands send their requests from child processes
+or aiobotocore and report no latencies. Results are written as JSON and can be
+compared with an earlier run:
+
+    java -Djava.library.path=./DynamoDBLocal_lib -jar DynamoDBLocal.jar -inMemory
+    python benchmarks/bench_commands.py -n 50000 -w 12 -o results/after.json --compare results/before.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from bench_serializer import make_item
+
+SOURCE_TABLE = 'aws-utils-bench-source'
+DEST_TABLE = 'aws-utils-bench-dest'
+
+# Command name -> state the source table must be in before it runs
+COMMANDS = {
+    'import_json': 'empty',
+    'import_json_processes': 'empty',
+    'import_csv': 'empty',
+    'scan_table': 'populated',
+    'migrate_table': 'populated',
+    'migrate_table_processes': 'populated',
+    'migrate_table_async': 'populated',
+    'wipe_table': 'populated',
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def peak_rss_bytes():
+    """
+    Peak resident memory of this process and its finished children.
+
+    On Linux ru_maxrss survives exec, so a worker would report the RSS of the
+    benchmark parent (and its moto server); VmHWM belongs to the new process only.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB on Linux
+    if sys.platform == 'darwin':
+        return max(own, children)
+    try:
+        with open('/proc/self/status', 'r') as status:
+            own = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        pass
+    return max(own, children) * 1024
+
+
+def run_command(name, config):
+    """
+    Run one command in this process (the benchmark worker).
+
+    Returns:
+        int: Number of items the command wrote, read or deleted
+    """
+    endpoint = config['endpoint']
+    processes = config['processes']
+    if name == 'import_json':
+        from aws_utils.import_json import filter_and_import_json_to_dynamodb
+        return filter_and_import_json_to_dynamodb(SOURCE_TABLE, config['jsonl_file'], is_jsonl=True, aws_endpoint=endpoint)[0]
+    if name == 'import_json_processes':
+        from aws_utils.import_json import filter_and_import_json_to_dynamodb
+        return filter_and_import_json_to_dynamodb(SOURCE_TABLE, config['jsonl_file'], is_jsonl=True,
+                                                  aws_endpoint=endpoint, processes=processes)[0]
+    if name == 'import_csv':
+        from aws_utils.import_csv import filter_and_import_csv_to_dynamodb
+        return filter_and_import_csv_to_dynamodb(SOURCE_TABLE, config['csv_file'], aws_endpoint=endpoint)[0]
+    if name == 'scan_table':
+        from aws_utils.scan_table import scan_table
+        return len(scan_table(SOURCE_TABLE, endpoint, max_items=config['expected'])['Items'])
+    if name == 'migrate_table':
+        from aws_utils.migrate_table_data import migrate_table
+        return migrate_table(SOURCE_TABLE, DEST_TABLE, endpoint)[0]
+    if name == 'migrate_table_processes':
+        from aws_utils.migrate_table_data import migrate_table_processes
+        return migrate_table_processes(SOURCE_TABLE, DEST_TABLE, endpoint, processes)[0]
+    if name == 'migrate_table_async':
+        import asyncio
+        from aws_utils.migrate_table_data import migrate_table_async
+        return asyncio.run(migrate_table_async(SOURCE_TABLE, DEST_TABLE, endpoint))[0]
+    if name == 'wipe_table':
+        from aws_utils.wipe_table import delete_table_entries
+        # The key attribute is read from the table description, as the command does without --pk
+        _, _, deleted, _ = delete_table_entries(SOURCE_TABLE, endpoint)
+        return deleted
+    raise ValueError(f"Unknown command '{name}'")
+
+
+def worker(name, config):
+    """Benchmark worker entry point: run one command and print its measurements as JSON."""
+    from aws_utils.clients import LatencyHook
+
+    latencies = []
+    LatencyHook(lambda operation, seconds: latencies.append(seconds)).register()
+
+    wall_started = time.perf_counter()
+    items = run_command(name, config)
+    seconds = time.perf_counter() - wall_started
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_seconds = usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+    latencies.sort()
+
+    result = {
+        'seconds': round(seconds, 3),
+        'items': items,
+        'expected_items': config['expected'],
+        'complete': items == config['expected'],
+        'items_per_second': round(items / seconds, 1),
+        'requests': len(latencies),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+            'p99': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+            'mean': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+        },
+        'peak_rss_mb': round(peak_rss_bytes() / 2 ** 20, 1),
+        'cpu_seconds': round(cpu_seconds, 2),
+        'cpu_utilization': round(cpu_seconds / seconds, 2),
+    }
+    print('BENCH_RESULT ' + json.dumps(result))
+
+
+def write_inputs(directory, items, width, seed):
+    """Write the synthetic JSONL and CSV inputs; CSV rows hold the same ids, flattened to strings."""
+    rng = random.Random(seed)
+    jsonl_file = os.path.join(directory, 'items.jsonl')
+    csv_file = os.path.join(directory, 'items.csv')
+    with open(jsonl_file, 'w') as jsonl, open(csv_file, 'w', newline='') as csv_out:
+        writer = None
+        for _ in range(items):
+            item = make_item(rng, width)
+            jsonl.write(json.dumps(item) + '\n')
+            row = {key: json.dumps(value) if not isinstance(value, str) else value for key, value in item.items()}
+            if writer is None:
+                writer = csv.DictWriter(csv_out, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+    return jsonl_file, csv_file
+
+
+def reset_table(client, table_name):
+    """Drop and recreate an on-demand table keyed by 'id'."""
+    try:
+        client.delete_table(TableName=table_name)
+        client.get_waiter('table_not_exists').wait(TableName=table_name)
+    except client.exceptions.ResourceNotFoundException:
+        pass
+    client.create_table(
+        TableName=table_name,
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST',
+    )
+    client.get_waiter('table_exists').wait(TableName=table_name)
+
+
+def populate(table_name, jsonl_file, endpoint):
+    from decimal import Decimal
+    from aws_utils.batch_write import put_items
+
+    with open(jsonl_file, 'r') as file:
+        put_items(table_name, (json.loads(line, parse_float=Decimal) for line in file), endpoint)
+
+
+def start_moto(port):
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit("moto is not installed. Install it with: pip install 'moto[server]'")
+    server = ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    return server, f"http://localhost:{port}"
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file):
+    with open(baseline_file, 'r') as file:
+        baseline = json.load(file)['results']
+    print(f"\nCompared with {baseline_file}:")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = result['items_per_second'] / before['items_per_second']
+        print(f"{name:<26} {before['items_per_second']:>10,.0f} -> {result['items_per_second']:>10,.0f} items/s ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the bulk commands against a local DynamoDB stand-in.')
+    parser.add_argument('-e', '--aws_endpoint', type=str, default='http://localhost:8000', help='DynamoDB Local/moto endpoint (default: http://localhost:8000)')
+    parser.add_argument('--moto', action='store_true', help='Start an in-process moto server instead of using --aws_endpoint')
+    parser.add_argument('--moto-port', type=int, default=5055, help='Port of the moto server (default: 5055)')
+    parser.add_argument('-n', '--items', type=int, default=10000, help='Items in the synthetic table (default: 10000)')
+    parser.add_argument('-w', '--width', type=int, default=12, help='Attributes per item (default: 12)')
+    parser.add_argument('-c', '--commands', nargs='*', choices=list(COMMANDS), default=list(COMMANDS), help='Commands to run (default: all)')
+    parser.add_argument('-P', '--processes', type=int, default=4, help='Worker processes for the *_processes commands (default: 4)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic data (default: 42)')
+    parser.add_argument('-o', '--output', type=str, help='Result file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', type=str, help='Earlier result file to compare items/s with')
+    parser.add_argument('--worker', type=str, help=argparse.SUPPRESS)
+    parser.add_argument('--config', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Local stand-ins accept any credentials, but boto3 still needs some
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+    if args.worker:
+        worker(args.worker, json.loads(args.config))
+        return
+
+    server = None
+    endpoint = args.aws_endpoint
+    if args.moto:
+        server, endpoint = start_moto(args.moto_port)
+
+    from aws_utils.clients import get_client
+    from aws_utils.scan_table import count_items
+    client = get_client('dynamodb', endpoint)
+    started_at = datetime.now(timezone.utc).isoformat()
+    results = {}
+    failed = {}
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl_file, csv_file = write_inputs(directory, args.items, args.width, args.seed)
+            config = {
+                'endpoint': endpoint,
+                'items': args.items,
+                'processes': args.processes,
+                'jsonl_file': jsonl_file,
+                'csv_file': csv_file,
+            }
+
+            for name in args.commands:
+                reset_table(client, SOURCE_TABLE)
+                reset_table(client, DEST_TABLE)
+                expected = args.items
+                if COMMANDS[name] == 'populated':
+                    populate(SOURCE_TABLE, jsonl_file, endpoint)
+                    expected = count_items(SOURCE_TABLE, endpoint, consistent_read=True)
+
+                print(f"Running {name} ({expected} items)...")
+                completed = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--worker', name,
+                     '--config', json.dumps(dict(config, expected=expected))],
+                    capture_output=True, text=True
+                )
+                lines = [line for line in completed.stdout.splitlines() if line.startswith('BENCH_RESULT ')]
+                if completed.returncode != 0 or not lines:
+                    failed[name] = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'no result'
+                    print(f"  failed: {failed[name]}")
+                    continue
+                result = json.loads(lines[-1][len('BENCH_RESULT '):])
+                if not result['complete']:
+                    failed[name] = f"incomplete: {result['items']} of {expected} items"
+                    print(f"  failed: {failed[name]}")
+                    continue
+                results[name] = result
+                latency = result['latency_ms']
+                print(f"  {result['items_per_second']:>10,.0f} items/s  p50 {latency['p50']} ms  p99 {latency['p99']} ms  "
+                      f"rss {result['peak_rss_mb']} MB  cpu {result['cpu_seconds']} s")
+
+            for table_name in (SOURCE_TABLE, DEST_TABLE):
+                client.delete_table(TableName=table_name)
+    finally:
+        if server:
+            server.stop()
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                         datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump({
+            'started_at': started_at,
+            'endpoint': 'moto' if args.moto else endpoint,
+            'items': args.items,
+            'width': args.width,
+            'processes': args.processes,
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'results': results,
+            'failed': failed,
+        }, file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    if failed:
+        sys.exit(f"{len(failed)} commands failed: {', '.join(failed)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time and `-h` latency of every console script.
+
+Each command module is imported in a fresh interpreter with `python -X importtime`,
+so the numbers match what a cron job or shell loop pays per invocation. The run
+fails (exit status 1) when a module exceeds the import budget or pulls in one of
+the heavy modules that must only be imported on first use, so it can guard CI.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just to parse arguments; each costs tens to hundreds of milliseconds
+LAZY_MODULES = ('boto3', 'botocore', 'aiobotocore', 'colorama', 'zstandard', 'pkg_resources', 'asyncio',
+                'multiprocessing')
+
+IMPORT_SCRIPT = """
+import json, sys
+import {module}
+print(json.dumps(sorted(name for name in {lazy!r} if name in sys.modules)))
+"""
+
+HELP_SCRIPT = """
+import sys
+from {module} import main
+sys.argv = [{name!r}, '-h']
+main()
+"""
+
+
+def console_scripts():
+    """(command, module) pairs of the console_scripts declared in setup.py."""
+    with open(os.path.join(ROOT, 'setup.py')) as file:
+        return re.findall(r'"([\w-]+)=([\w.]+):main"', file.read())
+
+
+def run_python(code, extra_args=()):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *extra_args, '-c', code], capture_output=True, text=True, env=env)
+    return result, time.perf_counter() - started
+
+
+def measure_import(module, repeat):
+    """
+    Import a module `repeat` times in fresh interpreters.
+
+    Returns:
+        dict: Median cumulative import time (ms), the slowest imports by self time,
+            and the lazy modules that were loaded; None if the module cannot be imported
+    """
+    times = []
+    self_times = {}
+    loaded = []
+    for _ in range(repeat):
+        result, _ = run_python(IMPORT_SCRIPT.format(module=module, lazy=LAZY_MODULES), ['-X', 'importtime'])
+        if result.returncode != 0:
+            return None
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        for line in result.stderr.splitlines():
+            match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)', line)
+            if not match:
+                continue
+            self_us, cumulative_us, _, name = match.groups()
+            self_times[name] = max(self_times.get(name, 0), int(self_us))
+            if name == module:
+                times.append(int(cumulative_us) / 1000)
+    slowest = sorted(self_times.items(), key=lambda entry: entry[1], reverse=True)[:5]
+    return {
+        'import_ms': round(statistics.median(times), 1),
+        'slowest': [(name, round(us / 1000, 1)) for name, us in slowest],
+        'lazy_loaded': loaded,
+    }
+
+
+def measure_help(command, module, repeat, baseline):
+    """Median wall time of `<command> -h` above a bare interpreter start, in ms."""
+    times = []
+    for _ in range(repeat):
+        result, elapsed = run_python(HELP_SCRIPT.format(module=module, name=command))
+        if result.returncode != 0:
+            return None
+        times.append(elapsed)
+    return round((statistics.median(times) - baseline) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the startup cost of every aws-utils command.')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per command, the median is reported (default: 5)')
+    parser.add_argument('-b', '--budget-ms', type=float, default=100.0, help='Maximum import time per command module in ms (default: 100)')
+    parser.add_argument('-o', '--output', type=str, help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    baseline = statistics.median(run_python('pass')[1] for _ in range(args.repeat))
+    print(f"Interpreter start: {baseline * 1000:.1f} ms (subtracted from -h times)")
+    print(f"{'command':<22} {'import ms':>10} {'-h ms':>8}  slowest imports (self ms)")
+
+    results = {}
+    failures = []
+    for command, module in console_scripts():
+        measured = measure_import(module, args.repeat)
+        if measured is None:
+            print(f"{command:<22} {'cannot import ' + module:>10}")
+            continue
+        measured['help_ms'] = measure_help(command, module, args.repeat, baseline)
+        results[command] = measured
+
+        slowest = ', '.join(f"{name} {ms}" for name, ms in measured['slowest'][:3])
+        help_ms = f"{measured['help_ms']:.1f}" if measured['help_ms'] is not None else 'error'
+        print(f"{command:<22} {measured['import_ms']:>10.1f} {help_ms:>8}  {slowest}")
+
+        if measured['import_ms'] > args.budget_ms:
+            failures.append(f"{command}: import takes {measured['import_ms']} ms (budget {args.budget_ms} ms)")
+        if measured['lazy_loaded']:
+            failures.append(f"{command}: imports {', '.join(measured['lazy_loaded'])} at startup")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump({'baseline_ms': round(baseline * 1000, 1), 'budget_ms': args.budget_ms, 'commands': results},
+                      file, indent=2)
+
+    if failures:
+        print("\nOver budget:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nAll commands import within {args.budget_ms:.0f} ms without loading {', '.join(LAZY_MODULES)}")
+
+
+if __name__ == '__main__':
+    main()
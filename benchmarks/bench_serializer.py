@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: aws_utils.serializer vs boto3's TypeSerializer/TypeDeserializer."""
+
+import argparse
+import random
+import string
+import time
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from aws_utils.serializer import deserialize_item, serialize_item
+
+
+def make_item(rng, width):
+    """Build a synthetic item shaped like our JSON imports."""
+    item = {'id': ''.join(rng.choices(string.hexdigits, k=24))}
+    for i in range(width):
+        kind = i % 6
+        if kind == 0:
+            item[f"s{i}"] = ''.join(rng.choices(string.ascii_letters, k=16))
+        elif kind == 1:
+            item[f"n{i}"] = rng.randint(0, 10 ** 9)
+        elif kind == 2:
+            item[f"f{i}"] = rng.random() * 1000
+        elif kind == 3:
+            item[f"b{i}"] = rng.random() < 0.5
+        elif kind == 4:
+            item[f"l{i}"] = [rng.randint(0, 100) for _ in range(4)]
+        else:
+            item[f"m{i}"] = {'name': 'x' * 8, 'count': rng.randint(0, 100), 'note': None}
+    return item
+
+
+def to_decimals(value):
+    """TypeSerializer rejects floats, so the baseline gets Decimal values as boto3 requires."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_decimals(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_decimals(v) for v in value]
+    return value
+
+
+def timed(label, func, items, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<34} {len(items) / best:>12,.0f} items/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the fast serializer with boto3 TypeSerializer.')
+    parser.add_argument('-n', '--items', type=int, default=20000, help='Number of synthetic items (default: 20000)')
+    parser.add_argument('-w', '--width', type=int, default=12, help='Attributes per item (default: 12)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per case, best is reported (default: 3)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    items = [make_item(rng, args.width) for _ in range(args.items)]
+    decimal_items = [to_decimals(item) for item in items]
+
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+    low_level = [serialize_item(item) for item in items]
+
+    print(f"{args.items} items, {args.width + 1} attributes each")
+    boto_ser = timed("boto3 TypeSerializer", lambda item: {k: serializer.serialize(v) for k, v in item.items()}, decimal_items, args.repeat)
+    fast_ser = timed("aws_utils serialize_item", serialize_item, items, args.repeat)
+    boto_de = timed("boto3 TypeDeserializer", lambda item: {k: deserializer.deserialize(v) for k, v in item.items()}, low_level, args.repeat)
+    fast_de = timed("aws_utils deserialize_item", deserialize_item, low_level, args.repeat)
+    print(f"serialize speedup:   {boto_ser / fast_ser:.1f}x")
+    print(f"deserialize speedup: {boto_de / fast_de:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,10 +6,14 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=[
-        "boto3>=1.26.0",
+        "boto3>=1.28.0",
         "argparse",
         "colorama",
     ],
+    extras_require={
+        "async": ["aiobotocore>=2.5"],
+        "zstd": ["zstandard"],
+    },
     entry_points={
         "console_scripts": [
             "aws-scan-table=aws_utils.scan_table:main",
@@ -23,6 +27,8 @@ setup(
             "aws-export-csv=aws_utils.export_to_csv:main",
             "aws-import-json=aws_utils.import_json:main",
             "aws-mongo-to-dynamo=aws_utils.mongo_to_dynamo:main",
+            "aws-migrate-schema=aws_utils.migrate_schema:main",
+            "aws-partiql=aws_utils.partiql:main",
             "aws-utils=aws_utils.list_utils:main",
         ],
     },
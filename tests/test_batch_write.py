@@ -0,0 +1,53 @@
+import pytest
+
+from aws_utils import batch_write
+from aws_utils.batch_write import BATCH_WRITE_LIMIT, dedupe_batch, dedupe_requests
+
+
+def put(key, value):
+    return {'PutRequest': {'Item': {'id': {'S': key}, 'v': {'N': str(value)}}}}
+
+
+def values(requests):
+    return [(r['PutRequest']['Item']['id']['S'], r['PutRequest']['Item']['v']['N']) for r in requests]
+
+
+def test_last_occurrence_replaces_the_first_in_place():
+    stats = {}
+    requests = [put('a', 1), put('b', 2), put('a', 3)]
+    assert values(dedupe_requests(requests, ['id'], 'last', stats)) == [('a', '3'), ('b', '2')]
+    assert stats['duplicates'] == 1
+
+
+def test_first_occurrence_wins():
+    requests = [put('a', 1), put('b', 2), put('a', 3)]
+    assert values(dedupe_requests(requests, ['id'], 'first')) == [('a', '1'), ('b', '2')]
+
+
+def test_numbers_are_compared_by_value():
+    requests = [{'PutRequest': {'Item': {'id': {'N': raw}}}} for raw in ('1', '1.0')]
+    assert len(list(dedupe_requests(requests, ['id'], 'last'))) == 1
+
+
+def test_repeats_in_different_batches_are_kept():
+    requests = [put('a', 0)] + [put(str(i), i) for i in range(1, BATCH_WRITE_LIMIT)] + [put('a', 99)]
+    deduped = list(dedupe_requests(requests, ['id'], 'last'))
+    assert len(deduped) == len(requests)
+
+
+def test_delete_requests_and_requests_without_key():
+    delete = {'DeleteRequest': {'Key': {'id': {'S': 'a'}}}}
+    keyless = {'PutRequest': {'Item': {'other': {'S': 'x'}}}}
+    assert list(dedupe_requests([put('a', 1), delete, keyless, keyless], ['id'], 'last')) == [delete, keyless, keyless]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        list(dedupe_requests([], ['id'], 'middle'))
+
+
+def test_dedupe_batch_looks_up_the_key_schema(monkeypatch):
+    monkeypatch.setattr(batch_write, 'get_table_metadata', lambda table_name, aws_endpoint=None: {'key_attributes': ['id']})
+    stats = {}
+    assert values(dedupe_batch('t', [put('a', 1), put('a', 2)], 'last', stats=stats)) == [('a', '2')]
+    assert stats['duplicates'] == 1
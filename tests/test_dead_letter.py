@@ -0,0 +1,59 @@
+import os
+
+from aws_utils.dead_letter import (MAX_MESSAGE_LENGTH, UNPROCESSED, DeadLetterWriter, default_dead_letter_path,
+                                   load_dead_letters, open_dead_letter)
+
+PUT = {'PutRequest': {'Item': {
+    'id': {'S': 'a'},
+    'blob': {'B': b'\x00\xff'},
+    'blobs': {'BS': [b'\x01', b'\x02']},
+    'nested': {'M': {'list': {'L': [{'B': b'\x03'}, {'N': '1'}]}}},
+}}}
+DELETE = {'DeleteRequest': {'Key': {'id': {'S': 'b'}}}}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'dlq' / 'table.jsonl')
+    with DeadLetterWriter(path) as dead_letter:
+        dead_letter.write('my-table', [PUT], 'ValidationException', 'Item size has exceeded the maximum allowed size')
+        dead_letter.write('my-table', [DELETE], UNPROCESSED)
+        assert dead_letter.count == 2
+
+    records = list(load_dead_letters(path))
+    assert [record['request'] for record in records] == [PUT, DELETE]
+    assert [record['error'] for record in records] == ['ValidationException', UNPROCESSED]
+    assert records[0]['table'] == 'my-table'
+
+
+def test_appends_across_writers(tmp_path):
+    path = str(tmp_path / 'table.jsonl')
+    for _ in range(2):
+        with DeadLetterWriter(path) as dead_letter:
+            dead_letter.write('t', [DELETE], UNPROCESSED)
+    assert len(list(load_dead_letters(path))) == 2
+
+
+def test_long_messages_are_truncated(tmp_path):
+    path = str(tmp_path / 'table.jsonl')
+    with DeadLetterWriter(path) as dead_letter:
+        dead_letter.write('t', [DELETE], 'ValidationException', 'x' * 1000)
+    record, = load_dead_letters(path)
+    assert len(record['message']) == MAX_MESSAGE_LENGTH
+
+
+def test_empty_write_creates_no_file(tmp_path):
+    path = str(tmp_path / 'table.jsonl')
+    with DeadLetterWriter(path) as dead_letter:
+        dead_letter.write('t', [], UNPROCESSED)
+    assert not os.path.exists(path)
+
+
+def test_open_dead_letter_without_path():
+    with open_dead_letter(None) as dead_letter:
+        assert dead_letter is None
+
+
+def test_default_path_is_per_table_and_run():
+    path = default_dead_letter_path('my-table')
+    assert os.path.dirname(path) == os.path.join('.', 'tmp', 'dlq')
+    assert os.path.basename(path).startswith('my-table-') and path.endswith('.jsonl')
@@ -0,0 +1,24 @@
+from aws_utils.existing_keys import BloomFilter
+from aws_utils.table_metadata import key_token
+
+
+def test_no_false_negatives():
+    key_filter = BloomFilter(1000)
+    tokens = [key_token({'id': {'S': str(i)}}, ['id']) for i in range(1000)]
+    for token in tokens:
+        key_filter.add(token)
+    assert all(token in key_filter for token in tokens)
+
+
+def test_false_positive_rate():
+    key_filter = BloomFilter(2000, error_rate=0.01)
+    for i in range(2000):
+        key_filter.add(f"present-{i}".encode())
+    false_positives = sum(f"absent-{i}".encode() in key_filter for i in range(10000))
+    # 1% target; allow for the variance of 10000 lookups
+    assert false_positives < 200
+
+
+def test_empty_filter():
+    key_filter = BloomFilter(0)
+    assert b'anything' not in key_filter
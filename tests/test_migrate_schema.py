@@ -0,0 +1,53 @@
+import re
+
+import pytest
+
+from aws_utils.migrate_schema import build_item_update
+
+
+def spec(**sections):
+    return {'rename': {}, 'remove': [], 'convert': {}, 'defaults': {}, **sections}
+
+
+def apply_update(item, update):
+    """Apply a SET/REMOVE UpdateExpression built by build_item_update to an item."""
+    if update is None:
+        return dict(item)
+    names = update['ExpressionAttributeNames']
+    values = update.get('ExpressionAttributeValues', {})
+    sets = re.search(r'SET (.*?)(?: REMOVE |$)', update['UpdateExpression'])
+    removes = re.search(r'REMOVE (.*)$', update['UpdateExpression'])
+    set_refs = [clause.split(' = ') for clause in sets.group(1).split(', ')] if sets else []
+    remove_refs = removes.group(1).split(', ') if removes else []
+    paths = [names[ref] for ref, _ in set_refs] + [names[ref] for ref in remove_refs]
+    assert len(paths) == len(set(paths)), 'overlapping document paths'
+
+    result = dict(item)
+    for ref in remove_refs:
+        result.pop(names[ref])
+    for ref, value in set_refs:
+        result[names[ref]] = values[value]
+    return result
+
+
+@pytest.mark.parametrize('item, expected', [
+    ({'a': {'S': '1'}, 'b': {'S': '2'}}, {'b': {'S': '1'}, 'c': {'S': '2'}}),
+    ({'a': {'S': '1'}}, {'b': {'S': '1'}}),
+    ({'b': {'S': '2'}}, {'c': {'S': '2'}}),
+])
+def test_chained_renames(item, expected):
+    assert apply_update(item, build_item_update(item, spec(rename={'a': 'b', 'b': 'c'}))) == expected
+
+
+@pytest.mark.parametrize('item, expected', [
+    ({'a': {'S': '1'}, 'b': {'S': '2'}}, {'a': {'S': '2'}, 'b': {'S': '1'}}),
+    ({'a': {'S': '1'}}, {'b': {'S': '1'}}),
+])
+def test_swapped_renames(item, expected):
+    assert apply_update(item, build_item_update(item, spec(rename={'a': 'b', 'b': 'a'}))) == expected
+
+
+def test_rename_then_convert():
+    item = {'id': {'S': 'x'}, 'age_str': {'S': '42'}}
+    update = build_item_update(item, spec(rename={'age_str': 'age'}, convert={'age': 'N'}))
+    assert apply_update(item, update) == {'id': {'S': 'x'}, 'age': {'N': '42'}}
@@ -0,0 +1,44 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from aws_utils.migrate_table_data import migrate_table
+from aws_utils.scan_table import count_items
+
+ITEMS = 120
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        client = boto3.client('dynamodb', region_name='us-east-1')
+        for name in ('source', 'dest'):
+            client.create_table(
+                TableName=name,
+                KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+                AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+                BillingMode='PAY_PER_REQUEST',
+            )
+        for i in range(ITEMS):
+            client.put_item(TableName='source', Item={'id': {'S': str(i)}, 'n': {'N': str(i)}})
+        yield client
+
+
+def test_migrates_every_page(tables, monkeypatch):
+    # The 0.1 s pause between batches only slows the test down
+    monkeypatch.setattr('aws_utils.migrate_table_data.time.sleep', lambda seconds: None)
+    progress = []
+
+    # Pages of 25 items, so the copy spans several scan pages
+    assert migrate_table('source', 'dest', batch_size=25, progress=progress.append) == (ITEMS, 0)
+    assert count_items('dest') == ITEMS
+    assert sum(progress) == ITEMS
+
+
+def test_max_items(tables, monkeypatch):
+    monkeypatch.setattr('aws_utils.migrate_table_data.time.sleep', lambda seconds: None)
+    assert migrate_table('source', 'dest', batch_size=25, max_items=50) == (50, 0)
+    assert count_items('dest') == 50
@@ -0,0 +1,63 @@
+import json
+from decimal import Decimal
+
+from aws_utils.mongo_converter import convert_document, convert_lines, convert_value, iter_converted
+
+
+def test_canonical_extended_json():
+    document = {
+        '_id': {'$oid': '5f1d7c2e9b1e8a3d4c2b1a0f'},
+        'created': {'$date': {'$numberLong': '1600000000123'}},
+        'count': {'$numberInt': '7'},
+        'big': {'$numberLong': '9007199254740993'},
+        'price': {'$numberDecimal': '19.990'},
+        'ratio': {'$numberDouble': '0.5'},
+    }
+    assert convert_document(document) == {
+        'id': '5f1d7c2e9b1e8a3d4c2b1a0f',
+        'created': '2020-09-13T12:26:40.123Z',
+        'count': 7,
+        'big': 9007199254740993,
+        'price': Decimal('19.990'),
+        'ratio': Decimal('0.5'),
+    }
+
+
+def test_relaxed_dates_are_kept():
+    assert convert_value({'$date': '2024-01-02T03:04:05.678Z'}) == '2024-01-02T03:04:05.678Z'
+
+
+def test_non_finite_doubles_stay_strings():
+    assert convert_value({'$numberDouble': 'NaN'}) == 'NaN'
+    assert convert_value({'$numberDouble': '-Infinity'}) == '-Infinity'
+
+
+def test_binary_formats():
+    assert convert_value({'$binary': {'base64': 'AAE=', 'subType': '00'}}) == b'\x00\x01'
+    assert convert_value({'$binary': 'AAE=', '$type': '00'}) == b'\x00\x01'
+
+
+def test_nested_values_and_floats():
+    value = {'a': [{'$oid': 'x'}, 1.25, {'b': {'$numberInt': '1'}}], 'c': 'plain'}
+    assert convert_value(value) == {'a': ['x', Decimal('1.25'), {'b': 1}], 'c': 'plain'}
+
+
+def test_id_field():
+    assert convert_document({'_id': {'$oid': 'x'}}, id_field='pk') == {'pk': 'x'}
+    assert convert_document({'_id': {'$oid': 'x'}}, id_field=None) == {'_id': 'x'}
+
+
+def test_convert_lines_skips_blank_lines():
+    lines = [json.dumps({'_id': {'$oid': 'a'}, 'n': 1.5}), '', '  \n', json.dumps({'_id': {'$oid': 'b'}})]
+    assert convert_lines(lines) == [{'id': 'a', 'n': Decimal('1.5')}, {'id': 'b'}]
+
+
+def test_iter_converted_keeps_order():
+    lines = [json.dumps({'_id': {'$oid': str(i)}}) for i in range(25)]
+    assert [item['id'] for item in iter_converted(lines, processes=1, chunk_size=4)] == [str(i) for i in range(25)]
+
+
+def test_iter_converted_in_worker_processes():
+    lines = [json.dumps({'_id': {'$oid': str(i)}, 'n': {'$numberInt': str(i)}}) for i in range(50)]
+    items = list(iter_converted(lines, processes=2, chunk_size=7))
+    assert [item['n'] for item in items] == list(range(50))
@@ -0,0 +1,132 @@
+import io
+from decimal import Decimal
+
+import pytest
+
+from aws_utils import partiql
+from aws_utils.partiql import (BATCH_STATEMENT_LIMIT, build_request, execute_batch, execute_statements, is_read,
+                               load_parameters, load_statements)
+
+
+class FakeClient:
+    """Records BatchExecuteStatement calls; statements containing 'fail' get an error result."""
+
+    def __init__(self, throttle_once=()):
+        self.calls = []
+        self.throttle_once = set(throttle_once)
+
+    def batch_execute_statement(self, Statements):
+        self.calls.append([request['Statement'] for request in Statements])
+        responses = []
+        for request in Statements:
+            statement = request['Statement']
+            if statement in self.throttle_once:
+                self.throttle_once.discard(statement)
+                responses.append({'Error': {'Code': 'ThrottlingError', 'Message': 'slow down'}})
+            elif 'fail' in statement:
+                responses.append({'Error': {'Code': 'ConditionalCheckFailed', 'Message': 'no'}})
+            elif is_read(statement):
+                responses.append({'Item': {'statement': {'S': statement}}})
+            else:
+                responses.append({})
+        return {'Responses': responses}
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(partiql.time, 'sleep', lambda seconds: None)
+
+
+def write_file(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+@pytest.mark.parametrize('content', [
+    '[[1, "a"], [2.5, "b"]]',
+    '[ [1, "a"],\n  [2.5, "b"]\n]\n',
+    '[1, "a"]\n\n[2.5, "b"]\n',
+])
+def test_load_parameters_json_formats(tmp_path, content):
+    assert load_parameters(write_file(tmp_path, 'params.json', content)) == [[1, 'a'], [Decimal('2.5'), 'b']]
+
+
+def test_load_parameters_single_json_line(tmp_path):
+    assert load_parameters(write_file(tmp_path, 'params.jsonl', '[1, "a"]\n')) == [[1, 'a']]
+
+
+def test_load_parameters_csv(tmp_path):
+    path = write_file(tmp_path, 'params.csv', 'status,id\nactive,1\n\ndone,2\n')
+    assert load_parameters(path) == [['active', '1'], ['done', '2']]
+
+
+def test_load_parameters_stdin(monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO('[[true, null]]'))
+    assert load_parameters('-') == [[True, None]]
+
+
+@pytest.mark.parametrize('content', ['{"a": 1}\n', '[1, 2]\n{"a": 1}\n', 'not json\n'])
+def test_load_parameters_rejects_rows_that_are_not_arrays(tmp_path, content):
+    with pytest.raises(ValueError):
+        load_parameters(write_file(tmp_path, 'params.jsonl', content))
+
+
+def test_load_statements(tmp_path):
+    path = write_file(tmp_path, 'fixes.sql', '-- comment\n\nDELETE FROM "t" WHERE id = \'a\';\n'
+                                            '{"statement": "UPDATE \\"t\\" SET n = ? WHERE id = ?", "parameters": [1.5, "b"]}\n')
+    assert load_statements(path) == [
+        ('DELETE FROM "t" WHERE id = \'a\'', None),
+        ('UPDATE "t" SET n = ? WHERE id = ?', [Decimal('1.5'), 'b']),
+    ]
+
+
+def test_build_request():
+    assert build_request('UPDATE "t" SET n = ? WHERE id = ?', [1, 'a']) == {
+        'Statement': 'UPDATE "t" SET n = ? WHERE id = ?',
+        'Parameters': [{'N': '1'}, {'S': 'a'}],
+    }
+    assert build_request(' select * from "t"', consistent_read=True)['ConsistentRead'] is True
+    assert 'ConsistentRead' not in build_request('DELETE FROM "t"', consistent_read=True)
+
+
+def test_execute_statements_groups_reads_and_writes(monkeypatch, no_backoff):
+    client = FakeClient()
+    monkeypatch.setattr(partiql, 'get_client', lambda *args, **kwargs: client)
+    statements = [f'SELECT * FROM "t" WHERE id = {i}' if i % 3 == 0 else f'UPDATE "t" SET n = {i}' for i in range(90)]
+    statements[10] = 'UPDATE "t" SET fail = 1'
+    progress = []
+
+    results = execute_statements([build_request(s) for s in statements], workers=4, progress=progress.append)
+
+    assert all(len(call) <= BATCH_STATEMENT_LIMIT for call in client.calls)
+    assert all(len({is_read(s) for s in call}) == 1 for call in client.calls)
+    assert sorted(s for call in client.calls for s in call) == sorted(statements)
+    assert sum(progress) == len(statements)
+    # One result per statement, in input order
+    for statement, result in zip(statements, results):
+        if 'fail' in statement:
+            assert result['Error']['Code'] == 'ConditionalCheckFailed'
+        elif is_read(statement):
+            assert result['Item']['statement']['S'] == statement
+        else:
+            assert result == {}
+
+
+def test_execute_batch_retries_throttled_statements(no_backoff):
+    client = FakeClient(throttle_once={'UPDATE b'})
+    results = execute_batch(client, [build_request('UPDATE a'), build_request('UPDATE b')])
+    assert results == [{}, {}]
+    assert client.calls == [['UPDATE a', 'UPDATE b'], ['UPDATE b']]
+
+
+def test_execute_batch_gives_up_after_max_retries(no_backoff):
+    class AlwaysThrottled(FakeClient):
+        def batch_execute_statement(self, Statements):
+            self.calls.append(Statements)
+            return {'Responses': [{'Error': {'Code': 'ThrottlingError', 'Message': 'slow down'}}] * len(Statements)}
+
+    client = AlwaysThrottled()
+    results = execute_batch(client, [build_request('UPDATE a')], max_retries=2)
+    assert results[0]['Error']['Code'] == 'ThrottlingError'
+    assert len(client.calls) == 3
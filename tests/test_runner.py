@@ -0,0 +1,97 @@
+import sys
+import types
+
+import pytest
+
+from aws_utils import runner
+
+
+@pytest.fixture
+def fake_command(monkeypatch):
+    """Register a 'fake' command whose main() runs the given behaviour and records its argv."""
+    calls = []
+    module = types.ModuleType('fake_command')
+
+    def install(behaviour):
+        def main(argv=None):
+            calls.append(argv)
+            return behaviour(argv)
+        module.main = main
+        return calls
+
+    monkeypatch.setitem(sys.modules, 'fake_command', module)
+    monkeypatch.setitem(runner.COMMANDS, 'fake', 'fake_command')
+    return install
+
+
+def raise_(error):
+    raise error
+
+
+@pytest.mark.parametrize('result, status', [(0, 0), (1, 1), (2, 2), (None, 0), (True, 0), (False, 1)])
+def test_run_command_maps_results(fake_command, result, status):
+    fake_command(lambda argv: result)
+    assert runner.run_command('fake', []) == status
+
+
+@pytest.mark.parametrize('error, status', [
+    (SystemExit(0), 0),
+    (SystemExit(None), 0),
+    (SystemExit(2), 2),
+    (SystemExit('fatal'), 1),
+    (RuntimeError('boom'), 1),
+    (EOFError(), 1),
+])
+def test_run_command_catches_exits_and_errors(fake_command, error, status):
+    fake_command(lambda argv: raise_(error))
+    assert runner.run_command('fake', []) == status
+
+
+def test_run_command_restores_argv0(fake_command):
+    seen = []
+    fake_command(lambda argv: seen.append(sys.argv[0]))
+    program = sys.argv[0]
+    runner.run_command('fake', ['-x'])
+    assert seen == ['aws-fake'] and sys.argv[0] == program
+
+
+def test_keyboard_interrupt_stops_the_runner(fake_command):
+    fake_command(lambda argv: raise_(KeyboardInterrupt()))
+    with pytest.raises(KeyboardInterrupt):
+        runner.run_command('fake', [])
+
+
+def test_script_stops_at_first_failure(fake_command):
+    calls = fake_command(lambda argv: 1 if argv == ['fail'] else 0)
+    stats = runner.run_script(['fake ok', '# comment', '', 'fake fail', 'fake never'], echo=False)
+    assert stats == {'run': 2, 'failed': 1}
+    assert calls == [['ok'], ['fail']]
+
+
+def test_script_keep_going(fake_command):
+    calls = fake_command(lambda argv: 1 if argv == ['fail'] else 0)
+    stats = runner.run_script(['fake fail', 'unknown-command', 'fake "quoted arg"'], keep_going=True, echo=False)
+    assert stats == {'run': 2, 'failed': 2}
+    assert calls == [['fail'], ['quoted arg']]
+
+
+def test_script_counts_unparseable_lines(fake_command):
+    fake_command(lambda argv: 0)
+    assert runner.run_script(['fake "unterminated'], echo=False) == {'run': 0, 'failed': 1}
+
+
+def test_exit_ends_the_script(fake_command):
+    calls = fake_command(lambda argv: 0)
+    runner.run_script(['fake a', 'exit', 'fake b'], echo=False)
+    assert calls == [['a']]
+
+
+@pytest.mark.parametrize('name, command', [
+    ('aws-scan-table', 'scan-table'),
+    ('scan-table', 'scan-table'),
+    ('scan', 'scan-table'),
+    ('aws-wipe', 'wipe-table'),
+    ('nope', None),
+])
+def test_resolve_command(name, command):
+    assert runner.resolve_command(name) == command
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from aws_utils.serializer import deserialize_item, deserialize_value, dump_json, serialize_item, serialize_value
+
+ITEM = {
+    'id': 'abc',
+    'count': 42,
+    'price': Decimal('19.99'),
+    'ratio': 0.25,
+    'active': True,
+    'deleted': False,
+    'missing': None,
+    'tags': ['a', 1, None],
+    'nested': {'level': {'deep': Decimal('-1.5E+3')}},
+    'empty_map': {},
+    'empty_list': [],
+}
+
+
+def test_serialize_matches_boto3():
+    serializer = TypeSerializer()
+    expected = {k: serializer.serialize(Decimal(str(v)) if isinstance(v, float) else v) for k, v in ITEM.items()}
+    assert serialize_item(ITEM) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1e20, {'N': '1E+20'}),
+    (1.5e-7, {'N': '1.5E-7'}),
+    (-0.5, {'N': '-0.5'}),
+    (True, {'BOOL': True}),
+    (0, {'N': '0'}),
+])
+def test_serialize_value_numbers_and_bools(value, expected):
+    assert serialize_value(value) == expected
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), Decimal('NaN'), Decimal('-Infinity')])
+def test_serialize_rejects_non_finite_numbers(value):
+    with pytest.raises(TypeError):
+        serialize_value(value)
+
+
+def test_serialize_falls_back_to_boto3_for_sets_and_binary():
+    serialized = serialize_value({'a', 'b'})
+    assert list(serialized) == ['SS'] and sorted(serialized['SS']) == ['a', 'b']
+    assert serialize_value(b'\x00\x01') == {'B': b'\x00\x01'}
+
+
+def test_deserialize_matches_boto3():
+    deserializer = TypeDeserializer()
+    low_level = serialize_item(ITEM)
+    assert deserialize_item(low_level) == {k: deserializer.deserialize(v) for k, v in low_level.items()}
+
+
+def test_round_trip():
+    item = dict(ITEM, ratio=Decimal('0.25'))
+    assert deserialize_item(serialize_item(item)) == item
+
+
+def test_deserialize_sets_and_binary():
+    assert deserialize_value({'NS': ['1', '2.5']}) == {Decimal('1'), Decimal('2.5')}
+    assert deserialize_value({'B': b'xyz'}) == b'xyz'
+
+
+def test_dump_json_keeps_decimal_digits():
+    assert dump_json({'n': Decimal('3'), 'x': Decimal('0.1000000000000000000000000001')}) == \
+        '{"n": 3, "x": "0.1000000000000000000000000001"}'
+
+
+def test_dump_json_encodes_sets_and_binary():
+    assert dump_json({'s': {'b', 'a'}, 'b': b'\x00\xff'}) == '{"s": ["a", "b"], "b": "AP8="}'
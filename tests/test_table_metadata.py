@@ -0,0 +1,53 @@
+from aws_utils.table_metadata import extract_key, key_projection, key_token, typed_key
+
+METADATA = {
+    'key_attributes': ['user_id', 'sort'],
+    'attribute_types': {'user_id': 'N', 'sort': 'S'},
+}
+
+
+def test_key_token_identifies_keys():
+    key = {'user_id': {'N': '1'}, 'sort': {'S': 'a'}}
+    item = dict(key, other={'S': 'x'})
+    assert key_token(key, METADATA['key_attributes']) == key_token(item, METADATA['key_attributes'])
+    assert key_token(key, METADATA['key_attributes']) != key_token({'user_id': {'N': '1'}, 'sort': {'S': 'b'}},
+                                                                   METADATA['key_attributes'])
+
+
+def test_key_token_compares_numbers_by_value():
+    tokens = {key_token({'id': {'N': raw}}, ['id']) for raw in ('5', '5.0', '05', '5E+0')}
+    assert len(tokens) == 1
+    assert key_token({'id': {'N': '100'}}, ['id']) == key_token({'id': {'N': '1E+2'}}, ['id'])
+
+
+def test_key_token_keeps_types_and_boundaries_apart():
+    assert key_token({'id': {'N': '1'}}, ['id']) != key_token({'id': {'S': '1'}}, ['id'])
+    # Length prefixes keep 'a|b' + 'c' apart from 'a' + 'b|c'
+    assert key_token({'h': {'S': 'a|b'}, 'r': {'S': 'c'}}, ['h', 'r']) != \
+        key_token({'h': {'S': 'a'}, 'r': {'S': 'b|c'}}, ['h', 'r'])
+
+
+def test_key_token_binary_keys():
+    assert key_token({'id': {'B': b'\x00\x01'}}, ['id']) == b'B:4:0001'
+
+
+def test_typed_key_converts_strings_of_numeric_keys():
+    assert typed_key({'user_id': '42', 'sort': '7', 'name': 'x'}, METADATA) == \
+        {'user_id': {'N': '42'}, 'sort': {'S': '7'}}
+    assert key_token(typed_key({'user_id': ' 42.0 ', 'sort': 'a'}, METADATA), METADATA['key_attributes']) == \
+        key_token({'user_id': {'N': '42'}, 'sort': {'S': 'a'}}, METADATA['key_attributes'])
+
+
+def test_typed_key_leaves_invalid_numbers_alone():
+    assert typed_key({'user_id': 'abc', 'sort': 'a'}, METADATA)['user_id'] == {'S': 'abc'}
+    assert typed_key({'user_id': 'NaN', 'sort': 'a'}, METADATA)['user_id'] == {'S': 'NaN'}
+    assert typed_key({'user_id': 3, 'sort': 'a'}, METADATA)['user_id'] == {'N': '3'}
+
+
+def test_extract_key_and_projection():
+    item = {'user_id': {'N': '1'}, 'sort': {'S': 'a'}, 'other': {'S': 'x'}}
+    assert extract_key(item, METADATA) == {'user_id': {'N': '1'}, 'sort': {'S': 'a'}}
+    assert key_projection(METADATA) == {
+        'ProjectionExpression': '#k0, #k1',
+        'ExpressionAttributeNames': {'#k0': 'user_id', '#k1': 'sort'},
+    }